@@ -0,0 +1,45 @@
+"""
+Metrics Middleware - Request latency and in-flight gauge for every HTTP route
+
+Plain ASGI middleware (no per-request task or body buffering, unlike
+BaseHTTPMiddleware), so streamed responses are timed until their last chunk.
+Requests are labelled with the matched route template, not the raw path, to
+keep the number of label values bounded.
+"""
+
+import time
+
+from app.services import metrics
+
+# Scrapes of /metrics itself are not recorded
+_SKIP_PATHS = {"/metrics"}
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_flight = metrics.http_in_flight.labels()
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            metrics.http_request_seconds.labels(
+                scope["method"], getattr(route, "path", "unmatched"), status
+            ).observe(time.perf_counter() - started)
@@ -2,16 +2,31 @@
 Chat API routes
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Header, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import asyncio
 import base64
+import json
+import math
 
+from app.services.admission import AdmissionRejected, AdmissionTicket
 from app.services.chat_service import (
+    DEFAULT_REQUEST_TIMEOUT_SECONDS,
+    MAX_REQUEST_TIMEOUT_SECONDS,
+    MIN_REQUEST_TIMEOUT_SECONDS,
+    RATE_LIMIT_TRUST_PROXY,
+    chat_admission,
+    get_stats,
+    ip_rate_limiter,
+    session_rate_limiter,
     process_text_message,
+    stream_text_message,
 )
-from app.services import voice_service
+from app.services.deadline import Deadline
+from app.services import faq_service, metrics, voice_service
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -23,8 +38,9 @@ class ChatMessage(BaseModel):
 class TextChatRequest(BaseModel):
     message: str
     sessionId: str
-    conversationHistory: Optional[List[ChatMessage]] = None
+    conversationHistory: Optional[List[ChatMessage]] = None  # Legacy: the server keeps session history
     preferredModel: Optional[str] = None  # Allow client to request specific model
+    timeoutSeconds: Optional[float] = None  # Time budget; X-Request-Timeout header takes precedence
 
 
 class TextChatResponse(BaseModel):
@@ -36,32 +52,180 @@ class TextChatResponse(BaseModel):
     model_config = {"protected_namespaces": ()}  # Allow model_ prefix to avoid warning
 
 
+# How often to check whether the client is still connected while an answer is generated
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+def _request_deadline(request: TextChatRequest, timeout_header: Optional[str]) -> Deadline:
+    return Deadline.from_request(
+        header_value=timeout_header,
+        field_value=request.timeoutSeconds,
+        default_seconds=DEFAULT_REQUEST_TIMEOUT_SECONDS,
+        max_seconds=MAX_REQUEST_TIMEOUT_SECONDS,
+        min_seconds=MIN_REQUEST_TIMEOUT_SECONDS,
+    )
+
+
+def _client_ip(http_request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = http_request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return http_request.client.host if http_request.client else ""
+
+
+def _too_many_requests(detail: str, retry_after: str) -> HTTPException:
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": retry_after})
+
+
+def _check_rate_limits(request: TextChatRequest, http_request: Request) -> None:
+    """Per-IP and per-session token buckets; raises 429 when either is empty."""
+    for limiter, key, scope in (
+        (ip_rate_limiter, _client_ip(http_request), "client"),
+        (session_rate_limiter, request.sessionId, "session"),
+    ):
+        wait = limiter.check(key)
+        if wait:
+            raise _too_many_requests(f"Too many requests for this {scope}", str(max(1, math.ceil(wait))))
+
+
+async def _admit(deadline: Deadline) -> AdmissionTicket:
+    """Wait for a chat slot (at most the remaining deadline); 429 with Retry-After when shed."""
+    try:
+        return await chat_admission.acquire(max_wait=deadline.remaining())
+    except AdmissionRejected as e:
+        raise _too_many_requests(str(e), e.retry_after_header)
+
+
+async def _cancel_on_disconnect(http_request: Request, work: asyncio.Task) -> bool:
+    """
+    Wait for work to finish, cancelling it if the client disconnects first.
+    Returns False if the client went away (the work has been cancelled).
+    """
+    while True:
+        done, _ = await asyncio.wait({work}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return True
+        if await http_request.is_disconnected():
+            work.cancel()
+            try:
+                await work
+            except (asyncio.CancelledError, Exception):
+                pass
+            return False
+
+
 @router.post("/text", response_model=TextChatResponse)
-async def text_chat(request: TextChatRequest):
+async def text_chat(
+    request: TextChatRequest,
+    http_request: Request,
+    x_request_timeout: Optional[str] = Header(None),
+):
     """
     Process a text chat message and return AI response.
+    If the client disconnects before the answer is ready, the agent run is
+    cancelled and its thread deleted right away.
+    Rate-limited or shed requests get 429 with a Retry-After header.
     """
+    _check_rate_limits(request, http_request)
+    # Clicked suggestions and FAQ questions rank higher in autocomplete
+    faq_service.record_use(request.message)
     try:
         # Convert Pydantic models to dictionaries
         history = None
         if request.conversationHistory:
             history = [msg.dict() for msg in request.conversationHistory]
+        deadline = _request_deadline(request, x_request_timeout)
 
-        # Process the message
-        result = process_text_message(
-            message=request.message,
-            session_id=request.sessionId,
-            conversation_history=history,
-            preferred_model=request.preferredModel,
-        )
+        # Queue for a slot, then process the message (a disconnect cancels either)
+        async def answer() -> Dict[str, Any]:
+            ticket = await _admit(deadline)
+            try:
+                return await process_text_message(
+                    message=request.message,
+                    session_id=request.sessionId,
+                    conversation_history=history,
+                    preferred_model=request.preferredModel,
+                    deadline=deadline,
+                )
+            finally:
+                ticket.release()
 
+        work = asyncio.create_task(answer())
+        if not await _cancel_on_disconnect(http_request, work):
+            print(f"Client disconnected, cancelled chat for session {request.sessionId}")
+            return Response(status_code=499)
+
+        result = work.result()
+        metrics.chat_responses.labels(result.get("model_used") or "error").inc()
         return TextChatResponse(**result)
 
+    except HTTPException:
+        raise
     except Exception as e:
+        metrics.count_error("chat_router")
         print(f"Error in text chat: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/text/stream")
+async def text_chat_stream(
+    request: TextChatRequest,
+    http_request: Request,
+    x_request_timeout: Optional[str] = Header(None),
+):
+    """
+    Process a text chat message and stream the AI response as server-sent events.
+    Emits "token" events while the agent is generating, then a final "done"
+    (or "error") event with the full response, suggestions and model_used.
+    A client disconnect closes the stream, which cancels the agent run.
+    Admission happens before the stream starts, so shed requests get a plain
+    429 with Retry-After instead of an error event.
+    """
+    _check_rate_limits(request, http_request)
+    faq_service.record_use(request.message)
+    history = None
+    if request.conversationHistory:
+        history = [msg.dict() for msg in request.conversationHistory]
+    deadline = _request_deadline(request, x_request_timeout)
+    ticket = await _admit(deadline)
+
+    async def event_source():
+        try:
+            async for event in stream_text_message(
+                message=request.message,
+                session_id=request.sessionId,
+                conversation_history=history,
+                preferred_model=request.preferredModel,
+                deadline=deadline,
+            ):
+                if event["event"] != "token":
+                    metrics.chat_responses.labels(event["data"].get("model_used") or "error").inc()
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            ticket.release()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering so tokens flush immediately
+        },
+        # Also frees the slot if the stream is never iterated (client gone before the first byte)
+        background=BackgroundTask(ticket.release),
+    )
+
+
+@router.get("/stats")
+async def chat_stats():
+    """
+    Counters for the chat pipeline: thread/semantic caches, request
+    coalescing, hedging, the circuit breaker and agent run stage timings.
+    """
+    return get_stats()
+
+
 # @router.get("/models")
 # async def list_models():
 #     """
@@ -92,12 +256,14 @@ async def transcribe_audio(
         audio_data = await audio.read()
 
         # Transcribe audio
-        transcription = await voice_service.transcribe_audio(audio_data, sessionId)
+        with metrics.time_stage("transcription"):
+            transcription = await voice_service.transcribe_audio(audio_data, sessionId)
 
         return {"transcription": transcription}
     except HTTPException:
         raise
     except Exception as e:
+        metrics.count_error("transcription")
         print(f"Error transcribing audio: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -1,26 +1,137 @@
 """
 FAQ API routes
-TODO: Add rate limiting
-TODO: Implement vector database similarity search
-TODO: Add result ranking and relevance scoring
-TODO: Cache common search queries
+
+Responses are pre-serialized JSON with strong ETags; a matching
+If-None-Match gets a 304 without a body.
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Any
+import os
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from typing import List, Dict, Any, Optional
 
-from app.services import faq_service
+from app.services import faq_service, metrics
+from app.services.http_cache import CachedBody
 
 router = APIRouter()
 
+# FAQ content only changes on deploy/reload, so clients and proxies may reuse it briefly
+FAQ_CACHE_MAX_AGE = int(os.environ.get("FAQ_CACHE_MAX_AGE", "300"))
+
+# Token for POST /faq/reload (X-Admin-Token header); the endpoint is disabled when unset
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+_locale_query = Query(faq_service.DEFAULT_LOCALE, description="Locale (en, de, uk, fr, tr); unknown locales fall back to en")
+
+
+def _cached_json(request: Request, cached: CachedBody) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": f"public, max-age={FAQ_CACHE_MAX_AGE}"}
+    if cached.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
 
 @router.get("/search")
-async def search_faqs(q: str = Query("", description="Search query")):
-    """Search FAQs by query string"""
+@router.get("/faq/search")
+async def search_faqs(
+    request: Request,
+    q: str = Query("", description="Search query"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of results"),
+    mode: str = Query("lexical", pattern="^(lexical|semantic|hybrid)$", description="lexical, semantic or hybrid"),
+    locale: str = _locale_query,
+):
+    """
+    Search FAQs by query string; results are ranked by relevance and carry a score.
+    Semantic and hybrid modes fall back to lexical if the embedding model is not
+    installed or fails to load (e.g. offline without a cached model).
+    """
     try:
-        results = faq_service.search_faqs(q)
-        return {"results": results}
+        if mode != "lexical" and not faq_service.semantic_search_available():
+            mode = "lexical"
+        locale = faq_service.get_locale(locale).locale
+        version = faq_service.get_catalog().version
+        cached = faq_service.search_response_cache.get((version, locale, mode, q.strip(), limit))
+        if cached is None and mode != "lexical":
+            try:
+                with metrics.time_stage(f"faq_search_{mode}"):
+                    search = faq_service.semantic_search if mode == "semantic" else faq_service.hybrid_search
+                    results = await search(q, limit=limit or 10, locale=locale)
+                cached = faq_service.search_response_cache.put(
+                    (version, locale, mode, q.strip(), limit),
+                    CachedBody.from_obj({"results": results, "mode": mode, "locale": locale}),
+                )
+            except Exception as e:
+                metrics.count_error("faq_semantic")
+                print(f"Semantic FAQ search failed, using lexical search: {e}")
+                mode = "lexical"
+                cached = faq_service.search_response_cache.get((version, locale, mode, q.strip(), limit))
+        if cached is None:
+            with metrics.time_stage("faq_search_lexical"):
+                results = faq_service.search_faqs(q, limit=limit, locale=locale)
+            cached = faq_service.search_response_cache.put(
+                (version, locale, mode, q.strip(), limit),
+                CachedBody.from_obj({"results": results, "mode": mode, "locale": locale}),
+            )
+        return _cached_json(request, cached)
     except Exception as e:
+        metrics.count_error("faq")
         print(f"Error searching FAQs: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+
+@router.post("/faq/reload")
+async def reload_faqs(force: bool = False, x_admin_token: str = Header("")):
+    """Re-read the FAQ data file in this worker (the file watch covers all workers)."""
+    if not ADMIN_TOKEN or not secrets.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    try:
+        return await faq_service.reload(force=force)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        metrics.count_error("faq")
+        print(f"Error reloading FAQs: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/faq")
+async def list_faqs(request: Request, locale: str = _locale_query):
+    """All FAQs of a locale."""
+    return _cached_json(request, faq_service.cached_response(locale, "faqs"))
+
+
+@router.get("/faq/categories")
+async def list_categories(request: Request, locale: str = _locale_query):
+    """Categories of a locale (display name and locale-independent key)."""
+    return _cached_json(request, faq_service.cached_response(locale, "categories"))
+
+
+@router.get("/faq/categories/{category}")
+async def faqs_by_category(request: Request, category: str, locale: str = _locale_query):
+    """FAQs of one category, by display name or category key."""
+    cached = faq_service.cached_response(locale, "category", category)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return _cached_json(request, cached)
+
+
+@router.get("/faq/suggest")
+async def suggest(
+    prefix: str = Query("", max_length=200, description="What the user has typed so far"),
+    limit: int = Query(8, ge=1, le=50, description="Maximum number of completions"),
+    locale: str = _locale_query,
+):
+    """Typeahead completions from FAQ questions, tags and suggested questions, most popular first."""
+    locale = faq_service.get_locale(locale).locale
+    return {"prefix": prefix, "locale": locale, "suggestions": faq_service.suggest(prefix, limit=limit, locale=locale)}
+
+
+@router.get("/faq/{faq_id}")
+async def get_faq(request: Request, faq_id: str, locale: str = _locale_query):
+    """A single FAQ by id."""
+    cached = faq_service.cached_response(locale, "faq", faq_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="FAQ not found")
+    faq_service.record_view(faq_id, locale)
+    return _cached_json(request, cached)
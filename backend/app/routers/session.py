@@ -1,32 +1,56 @@
 """
 Session API routes
-TODO: Implement proper session management
-TODO: Store sessions in database (Redis, PostgreSQL, etc.)
-TODO: Add session expiration and cleanup
+Sessions and their recent turns are kept server-side (see session_store),
+so chat requests only need the sessionId.
 TODO: Track session metadata for analytics (with privacy considerations)
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import uuid
-from datetime import datetime
+from typing import List
 
-router = APIRouter()
+from app.services import chat_service
+from app.services.session_store import session_store
+
+router = APIRouter(prefix="/session", tags=["session"])
 
 
 class SessionResponse(BaseModel):
     sessionId: str
 
 
+class SessionTurn(BaseModel):
+    role: str
+    content: str
+
+
+class SessionHistoryResponse(BaseModel):
+    sessionId: str
+    history: List[SessionTurn]
+
+
 @router.post("", response_model=SessionResponse)
 async def create_session():
     """Create a new session ID"""
-    # Generate a simple session ID
-    # In production, use a cryptographically secure random generator
-    session_id = f"session_{int(datetime.now().timestamp() * 1000)}_{uuid.uuid4().hex[:12]}"
-
-    # TODO: Store session in database with metadata
-    # TODO: Set expiration time
-
+    session_id = await session_store.create_session()
     return SessionResponse(sessionId=session_id)
 
+
+@router.get("/{session_id}", response_model=SessionHistoryResponse)
+async def get_session(session_id: str):
+    """Return the session's recent turns (e.g. to restore a chat after reload)"""
+    history = await session_store.get_history(session_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return SessionHistoryResponse(sessionId=session_id, history=history)
+
+
+@router.delete("/{session_id}")
+async def end_session(session_id: str):
+    """Forget the session, its history and its agent thread"""
+    # The thread holds the whole conversation: drop it even if the stored session already expired
+    chat_service.forget_session(session_id)
+    deleted = await session_store.delete_session(session_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"deleted": True}
@@ -0,0 +1,182 @@
+"""
+Admission - Load shedding and rate limits for expensive (agent-backed) requests
+
+- AdmissionController: at most max_concurrent requests run at once; the rest
+  wait in a bounded FIFO queue. A request is rejected right away when the
+  queue is full or when its estimated queue time (queue position x average
+  service time / concurrency) exceeds the queue-wait limit or its own
+  deadline, instead of queueing only to time out later. Rejections carry a
+  Retry-After estimate.
+- RateLimiter: token buckets per key (session id, client IP) with LRU-bounded
+  state; disabled when the rate is 0.
+
+Only the chat endpoints go through admission; cheap routes (FAQ, sessions)
+never queue behind agent work.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from app.services import metrics
+
+
+class AdmissionRejected(Exception):
+    """Raised instead of admitting a request; retry_after is the suggested wait in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Server busy ({reason}), retry in {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+_rejections = metrics.REGISTRY.counter("admission_rejected", "Requests rejected by admission control", ["reason"])
+
+
+class AdmissionTicket:
+    """A held concurrency slot; release() is idempotent so it can be called from several cleanup paths."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._admitted_at = time.perf_counter()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(time.perf_counter() - self._admitted_at)
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, queue-time-aware FIFO queue."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_queue: int = 64,
+        max_queue_wait: float = 10.0,
+        initial_service_time: float = 5.0,
+        smoothing: float = 0.1,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.smoothing = smoothing
+        self._service_time = initial_service_time  # EWMA of how long admitted requests hold a slot
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.rejected = 0
+
+    def estimated_wait(self, ahead: Optional[int] = None) -> float:
+        """Expected queue time for a request with `ahead` requests queued before it."""
+        if ahead is None:
+            ahead = len(self._waiters)
+        return (ahead + 1) * self._service_time / self.max_concurrent
+
+    async def acquire(self, max_wait: Optional[float] = None) -> AdmissionTicket:
+        """Take a slot, waiting in the queue if needed; raises AdmissionRejected."""
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return self._admit()
+
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full", self.estimated_wait())
+        budget = self.max_queue_wait if max_wait is None else min(self.max_queue_wait, max_wait)
+        estimate = self.estimated_wait()
+        if estimate > budget:
+            raise self._reject("queue_wait", estimate)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(budget):
+                await future
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release(None)
+            else:
+                future.cancel()
+                if future in self._waiters:
+                    self._waiters.remove(future)
+            if isinstance(e, TimeoutError):
+                raise self._reject("queue_timeout", self.estimated_wait()) from None
+            raise
+        finally:
+            metrics.observe_stage("admission_queue_wait", time.perf_counter() - started)
+        return self._admit()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "service_time_seconds": self._service_time,
+            "estimated_wait_seconds": self.estimated_wait() if self._active >= self.max_concurrent else 0.0,
+        }
+
+    def _admit(self) -> AdmissionTicket:
+        self.admitted += 1
+        return AdmissionTicket(self)
+
+    def _reject(self, reason: str, retry_after: float) -> AdmissionRejected:
+        self.rejected += 1
+        _rejections.labels(reason).inc()
+        return AdmissionRejected(reason, retry_after)
+
+    def _release(self, service_time: Optional[float]) -> None:
+        if service_time is not None:
+            self._service_time += self.smoothing * (service_time - self._service_time)
+        # Hand the slot straight to the next waiter (FIFO) so newcomers can't jump the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+
+class RateLimiter:
+    """Token bucket per key: `rate_per_minute` sustained, bursts up to `burst`."""
+
+    def __init__(self, name: str, rate_per_minute: float = 0.0, burst: int = 0, max_keys: int = 10000):
+        self.name = name
+        self.enabled = rate_per_minute > 0
+        self.rate = rate_per_minute / 60.0
+        self.burst = float(burst or max(1, math.ceil(rate_per_minute / 6)))
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, updated)
+
+        self.limited = 0
+
+    def check(self, key: str) -> float:
+        """Take a token for key. Returns 0 if allowed, else the seconds until one is available."""
+        if not self.enabled or not key:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1.0:
+            self._buckets[key] = (tokens - 1.0, now)
+            wait = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            self.limited += 1
+            _rejections.labels(f"rate_limit_{self.name}").inc()
+            wait = (1.0 - tokens) / self.rate
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> Dict[str, float]:
+        return {"enabled": self.enabled, "tracked_keys": len(self._buckets), "limited": self.limited}
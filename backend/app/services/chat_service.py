@@ -3,128 +3,786 @@ Chat Service - LLM integration for text chat using Azure AI Agent
 """
 
 import os
-import traceback
+import asyncio
 import time
-from typing import List, Dict, Any, Optional
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
+import traceback
+from contextlib import aclosing, asynccontextmanager
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
+from azure.ai.projects.aio import AIProjectClient
+from azure.ai.agents.models import AgentStreamEvent, MessageDeltaChunk, ThreadRun, TruncationObject
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.identity.aio import DefaultAzureCredential
+
+from app.services.admission import AdmissionController, RateLimiter
+from app.services.deadline import Deadline, DeadlineExceeded
+from app.services import embeddings, faq_service, metrics
+from app.services.fake_agent import FakeProjectClient
+from app.services.faq_fast_path import FaqFastPath, FaqMatch
+from app.services.history import HistoryCompactor
+from app.services.resilience import CircuitBreaker, CircuitOpenError, Hedger
+from app.services.run_waiter import AgentRunTimeout, RunTimingLog, RunTimings, create_run_waiter
+from app.services.semantic_cache import CacheLookup, SemanticCache
+from app.services.session_store import SessionRevision, session_store
+from app.services.single_flight import SingleFlight
+from app.services.suggestions import SuggestionEngine
+from app.services.thread_cache import ThreadCache
+from app.services.warmup import Warmup
 
 # --- Configuration ---
 azure_agent_id = os.environ.get("AZURE_ASSISTANT_ID")
-project_endpoint = "https://safetalkfinal.services.ai.azure.com/api/projects/SafeTalkFinal"
+project_endpoint = os.environ.get(
+    "AZURE_PROJECT_ENDPOINT",
+    "https://safetalkfinal.services.ai.azure.com/api/projects/SafeTalkFinal",
+)
+
+# "azure" (default) or "fake" (in-process stand-in for offline load tests, see fake_agent.py)
+AGENT_BACKEND = os.environ.get("AGENT_BACKEND", "azure").lower()
+
+# Maximum number of agent runs in flight at once (per worker process)
+MAX_CONCURRENT_RUNS = int(os.environ.get("AGENT_MAX_CONCURRENT_RUNS", "16"))
+
+# How to wait for run completion: "stream" (event-driven), "adaptive" or "fixed" polling
+RUN_WAITER_STRATEGY = os.environ.get("AGENT_RUN_WAITER", "stream")
+RUN_TIMEOUT_SECONDS = float(os.environ.get("AGENT_RUN_TIMEOUT_SECONDS", "120"))
+LOG_RUN_TIMINGS = os.environ.get("AGENT_LOG_TIMINGS", "false").lower() == "true"
+
+# Per-request time budget when the client doesn't send one, and the bounds for client budgets
+DEFAULT_REQUEST_TIMEOUT_SECONDS = float(os.environ.get("CHAT_DEFAULT_TIMEOUT_SECONDS", "60"))
+MIN_REQUEST_TIMEOUT_SECONDS = float(os.environ.get("CHAT_MIN_TIMEOUT_SECONDS", "1"))
+MAX_REQUEST_TIMEOUT_SECONDS = float(os.environ.get("CHAT_MAX_TIMEOUT_SECONDS", str(RUN_TIMEOUT_SECONDS)))
+
+# Warm-up steps at startup (see warmup.py); the model load can be skipped to save memory
+WARMUP_LOAD_MODELS = os.environ.get("WARMUP_LOAD_MODELS", "true").lower() == "true"
+# First wait before a failed required warm-up step is retried; doubles up to the max
+WARMUP_RETRY_SECONDS = float(os.environ.get("WARMUP_RETRY_SECONDS", "5"))
+WARMUP_MAX_RETRY_SECONDS = float(os.environ.get("WARMUP_MAX_RETRY_SECONDS", "300"))
+
+# Scope of the token the agent client requests for Azure AI Foundry projects
+AZURE_AI_SCOPE = "https://ai.azure.com/.default"
+
+# Agent client and credential are built on first use (or by the startup warm-up),
+# so importing this module needs neither credentials nor network access
+credential: Optional[DefaultAzureCredential] = None
+client = None
+AGENT_ID = azure_agent_id or ("fake-agent" if AGENT_BACKEND == "fake" else None)
+
+
+def get_client():
+    """The shared agent client, created on first use."""
+    global client, credential
+    if client is None:
+        if AGENT_BACKEND == "fake":
+            # Offline stand-in with simulated latencies and failures; no Azure credentials needed
+            client = FakeProjectClient()
+        else:
+            if not AGENT_ID:
+                raise ValueError("AZURE_ASSISTANT_ID environment variable is not set")
+            credential = DefaultAzureCredential()
+            # One shared aiohttp transport so every agent call reuses the same connection pool
+            client = AIProjectClient(
+                endpoint=project_endpoint,
+                credential=credential,
+                transport=AioHttpTransport(),
+            )
+    return client
+
+
+run_waiter = create_run_waiter(RUN_WAITER_STRATEGY, timeout=RUN_TIMEOUT_SECONDS)
+
+# Stage timings of recent agent calls (create, queue wait, run, fetch, delete)
+run_timings = RunTimingLog()
+
+# Bounds in-flight agent runs; extra requests wait here instead of piling onto Azure.
+# Created lazily so it binds to the running event loop.
+_run_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_run_semaphore() -> asyncio.Semaphore:
+    global _run_semaphore
+    if _run_semaphore is None:
+        _run_semaphore = asyncio.Semaphore(MAX_CONCURRENT_RUNS)
+    return _run_semaphore
+
+
+_runs_in_flight = metrics.REGISTRY.gauge("agent_runs_in_flight", "Agent runs holding a run slot").labels()
+_runs_waiting = metrics.REGISTRY.gauge("agent_runs_waiting", "Agent runs waiting for a run slot").labels()
+
+
+@asynccontextmanager
+async def _run_slot() -> AsyncIterator[None]:
+    """Hold one of the MAX_CONCURRENT_RUNS slots (time spent waiting is a metrics stage)."""
+    _runs_waiting.inc()
+    try:
+        with metrics.time_stage("agent_slot_wait"):
+            await _get_run_semaphore().acquire()
+    finally:
+        _runs_waiting.dec()
+    _runs_in_flight.inc()
+    try:
+        yield
+    finally:
+        _runs_in_flight.dec()
+        _get_run_semaphore().release()
+
+
+async def _create_empty_thread() -> str:
+    thread = await get_client().agents.threads.create()
+    return thread.id
+
 
-if not azure_agent_id:
-    raise ValueError("AZURE_ASSISTANT_ID environment variable is not set")
+async def _delete_thread(thread_id: str) -> None:
+    await get_client().agents.threads.delete(thread_id)
 
-# Initialize Client
-client = AIProjectClient(
-    endpoint=project_endpoint,
-    credential=DefaultAzureCredential()
+
+# Per-session thread reuse + warm pool of empty threads for first turns
+thread_cache = ThreadCache(
+    create_thread=_create_empty_thread,
+    delete_thread=_delete_thread,
+    ttl_seconds=float(os.environ.get("AGENT_THREAD_TTL_SECONDS", "1800")),
+    max_sessions=int(os.environ.get("AGENT_THREAD_CACHE_SIZE", "1000")),
+    pool_size=int(os.environ.get("AGENT_THREAD_POOL_SIZE", "4")),
+    reap_interval=float(os.environ.get("AGENT_THREAD_REAP_INTERVAL", "60")),
+)
+
+
+# Conversation history sent to new threads is packed into a token budget;
+# older turns become a rolling per-session summary
+history_compactor = HistoryCompactor(
+    token_budget=int(os.environ.get("HISTORY_TOKEN_BUDGET", "1024")),
+    summary_token_budget=int(os.environ.get("HISTORY_SUMMARY_TOKEN_BUDGET", "256")),
+    max_sessions=int(os.environ.get("AGENT_THREAD_CACHE_SIZE", "1000")),
+)
+
+# Reused session threads grow with every turn; the agent only reads the most recent
+# messages, within a prompt token limit (0 = no limit)
+THREAD_LAST_MESSAGES = int(os.environ.get("AGENT_THREAD_LAST_MESSAGES", "8"))
+THREAD_MAX_PROMPT_TOKENS = int(os.environ.get("AGENT_THREAD_MAX_PROMPT_TOKENS", "20000"))
+_thread_truncation = TruncationObject(type="last_messages", last_messages=THREAD_LAST_MESSAGES)
+
+
+# Answers for paraphrased single-turn questions, keyed by embedding similarity
+answer_cache = SemanticCache(
+    threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+    max_entries=int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", "2048")),
+    ttl_seconds=float(os.environ.get("SEMANTIC_CACHE_TTL_SECONDS", "3600")),
+    enabled=os.environ.get("SEMANTIC_CACHE_ENABLED", "true").lower() == "true",
 )
 
-AGENT_ID = azure_agent_id
+# Messages that are essentially a curated FAQ question get its answer without the agent
+faq_fast_path = FaqFastPath(
+    min_lexical=float(os.environ.get("FAQ_FAST_PATH_MIN_OVERLAP", "0.75")),
+    min_similarity=float(os.environ.get("FAQ_FAST_PATH_MIN_SIMILARITY", "0.9")),
+    enabled=os.environ.get("FAQ_FAST_PATH_ENABLED", "true").lower() == "true",
+)
+
+
+# Identical concurrent single-turn questions share one agent run
+coalescer = SingleFlight()
+
+
+# Tail-latency hedging: a second run starts if the first is slower than the recent p95
+hedger = Hedger(
+    enabled=os.environ.get("AGENT_HEDGE_ENABLED", "false").lower() == "true",
+    quantile=float(os.environ.get("AGENT_HEDGE_QUANTILE", "0.95")),
+    min_delay=float(os.environ.get("AGENT_HEDGE_MIN_DELAY_SECONDS", "2.0")),
+)
+
+# Fail fast (and answer from the FAQ) while the agent backend is degraded
+circuit_breaker = CircuitBreaker(
+    failure_threshold=float(os.environ.get("AGENT_BREAKER_FAILURE_RATE", "0.5")),
+    min_calls=int(os.environ.get("AGENT_BREAKER_MIN_CALLS", "10")),
+    window_seconds=float(os.environ.get("AGENT_BREAKER_WINDOW_SECONDS", "60")),
+    open_seconds=float(os.environ.get("AGENT_BREAKER_OPEN_SECONDS", "30")),
+)
+
+
+# Load shedding for the chat endpoints: a bounded queue in front of agent-backed work.
+# Requests whose expected queue time exceeds the limit (or their deadline) get 429.
+chat_admission = AdmissionController(
+    max_concurrent=int(os.environ.get("CHAT_MAX_CONCURRENT", str(2 * MAX_CONCURRENT_RUNS))),
+    max_queue=int(os.environ.get("CHAT_MAX_QUEUE", "64")),
+    max_queue_wait=float(os.environ.get("CHAT_MAX_QUEUE_WAIT_SECONDS", "10")),
+)
+
+# Optional token-bucket rate limits for chat requests (0 = disabled)
+session_rate_limiter = RateLimiter(
+    "session",
+    rate_per_minute=float(os.environ.get("RATE_LIMIT_SESSION_PER_MINUTE", "0")),
+    burst=int(os.environ.get("RATE_LIMIT_SESSION_BURST", "0")),
+)
+ip_rate_limiter = RateLimiter(
+    "ip",
+    rate_per_minute=float(os.environ.get("RATE_LIMIT_IP_PER_MINUTE", "0")),
+    burst=int(os.environ.get("RATE_LIMIT_IP_BURST", "0")),
+)
+# Use the first X-Forwarded-For address as the client IP (only behind a trusted proxy)
+RATE_LIMIT_TRUST_PROXY = os.environ.get("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+
+
+async def _warm_credential() -> str:
+    # DefaultAzureCredential walks its chain on the first token request; do that now
+    get_client()
+    token = await credential.get_token(AZURE_AI_SCOPE)
+    return f"token valid for {int(token.expires_on - time.time())}s"
+
+
+async def _warm_agent() -> str:
+    # Opens the pooled connection (TLS handshake) and checks the agent id
+    agent = await get_client().agents.get_agent(AGENT_ID)
+    return f"agent {agent.id}"
+
+
+async def _warm_thread_pool() -> str:
+    pooled = await thread_cache.fill_pool()
+    if thread_cache.pool_size and not pooled:
+        raise RuntimeError("could not pre-create any agent thread")
+    return f"{pooled} pooled threads"
+
+
+async def _warm_embedding_model() -> str:
+    await asyncio.to_thread(embeddings.get_model)
+    return embeddings.MODEL_NAME
+
 
-def call_llm_with_history(messages: List[Dict[str, str]]) -> str:
+async def _warm_tokenizer() -> str:
+    if await asyncio.to_thread(embeddings.get_tokenizer) is None:
+        raise RuntimeError("tokenizer unavailable; history token counts are estimated")
+    return embeddings.MODEL_NAME
+
+
+warmup = Warmup(retry_seconds=WARMUP_RETRY_SECONDS, max_retry_seconds=WARMUP_MAX_RETRY_SECONDS)
+warmup.register("credential", _warm_credential, enabled=AGENT_BACKEND != "fake")
+warmup.register("agent", _warm_agent, after=["credential"])
+warmup.register("thread_pool", _warm_thread_pool, required=False, after=["agent"])
+warmup.register(
+    "embedding_model", _warm_embedding_model, required=False,
+    enabled=lambda: WARMUP_LOAD_MODELS and answer_cache.enabled,
+)
+warmup.register(
+    "faq_embeddings", faq_service.load_embeddings, required=False,
+    enabled=lambda: WARMUP_LOAD_MODELS and faq_service.semantic_search_available(), after=["embedding_model"],
+)
+warmup.register(
+    "tokenizer", _warm_tokenizer, required=False,
+    enabled=WARMUP_LOAD_MODELS, after=["embedding_model"],
+)
+
+
+async def close_client() -> None:
+    """Delete cached threads, then close the shared agent client and credential (called on app shutdown)."""
+    await warmup.stop()
+    await thread_cache.stop()
+    if client is not None:
+        await client.close()
+    if credential is not None:
+        await credential.close()
+
+
+async def call_llm_with_history(
+    messages: List[Dict[str, str]],
+    session_id: Optional[str] = None,
+    revision: Optional[SessionRevision] = None,
+) -> str:
+    """
+    Optimized: Reduced context window & event-driven/adaptive run completion.
+    Fully async: waiting yields to the event loop instead of blocking the worker.
+
+    messages is the conversation history followed by the new user message.
+    With a session_id the session's cached thread is reused: a new thread gets
+    the compacted history, later turns append only the new user message. The
+    thread is only reused if it has seen the session's revision (the state the
+    history was loaded at); otherwise another worker answered in between.
+    """
+    if session_id is None:
+        messages = await _prompt_messages(messages, session_id)
+        async with _run_slot():
+            return await _run_agent(messages)
+
+    async with thread_cache.lease(session_id, revision) as lease:
+        new_messages = await _prompt_messages(messages, session_id) if lease.is_new else messages[-1:]
+        async with _run_slot():
+            return await _run_agent_on_thread(lease.thread_id, new_messages)
+
+
+async def call_agent_guarded(
+    messages: List[Dict[str, str]],
+    session_id: Optional[str] = None,
+    revision: Optional[SessionRevision] = None,
+) -> str:
     """
-    Optimized: Reduced context window & Aggressive polling for lowest latency.
+    call_llm_with_history behind the circuit breaker, with optional hedging.
+    Raises CircuitOpenError without touching the backend while the circuit is open.
     """
-    thread = None
+    if not circuit_breaker.allow():
+        raise CircuitOpenError("Agent backend circuit is open")
+
+    started = time.perf_counter()
+    try:
+        response_text = await hedger.run(
+            primary=lambda: call_llm_with_history(messages, session_id=session_id, revision=revision),
+            # The hedge uses a throwaway thread: a session thread allows only one active run
+            backup=lambda: call_llm_with_history(messages),
+        )
+    except asyncio.CancelledError:
+        circuit_breaker.record_abandoned()
+        raise
+    except Exception as e:
+        circuit_breaker.record_failure(timeout=isinstance(e, AgentRunTimeout))
+        raise
+
+    circuit_breaker.record_success()
+    hedger.observe(time.perf_counter() - started)
+    return response_text
+
+
+async def _run_agent(messages: List[Dict[str, str]]) -> str:
+    """Run the agent on a throwaway thread that is deleted afterwards."""
+    timings = RunTimings()
+    thread_id = None
+    run = None
     try:
         # 1. OPTIMIZATION: One Single API Call
-        run = client.agents.create_thread_and_run(
+        started = time.perf_counter()
+        run = await get_client().agents.create_thread_and_run(
             agent_id=AGENT_ID,
             thread={
                 "messages": messages
             }
         )
-        
+        timings.create = time.perf_counter() - started
+        # Remember the thread for cleanup (also on failure, so threads never leak)
         thread_id = run.thread_id
-        
-        # 2. OPTIMIZATION: Aggressive Polling for Speed
-        # Poll very frequently to catch completion ASAP
-        poll_count = 0
-        while run.status in ["queued", "in_progress", "requires_action"]:
-            # Ultra-fast polling: 0.05s for first 40 checks (2 seconds), then 0.2s
-            # This gives us 20 checks per second initially
-            sleep_time = 0.05 if poll_count < 40 else 0.2
-            time.sleep(sleep_time)
-            
-            run = client.agents.runs.get(thread_id=thread_id, run_id=run.id)
-            poll_count += 1
-            
-            # Safety: break after 2 minutes
-            if poll_count > 600:
-                raise Exception("Agent run timeout after 2 minutes")
-            
-        if run.status != "completed":
-            raise Exception(f"Agent run failed with status: {run.status}")
-        
-        # 3. Retrieve Response
-        response_pager = client.agents.messages.list(
-            thread_id=thread_id,
-            order="desc", 
-            limit=1
-        )
-        
-        messages_list = list(response_pager)
-        response_text = ""
-        
-        if messages_list:
-            last_msg = messages_list[0]
-            if last_msg.role == "assistant":
-                for content_part in last_msg.content:
-                    if hasattr(content_part, 'text'):
-                         response_text += content_part.text.value
-                    elif isinstance(content_part, dict) and 'text' in content_part:
-                         response_text += content_part['text']['value']
-
-        if not response_text:
-            raise Exception("Empty response from Agent")
-            
-        # Store thread object for cleanup
-        thread = type('obj', (object,), {'id': thread_id})
-            
-        return response_text
+
+        # 2. Wait for completion (strategy is configurable, see run_waiter)
+        run = await run_waiter.wait(get_client().agents, run, timings)
+        return await _fetch_response(run, timings)
+
+    except asyncio.CancelledError:
+        # Client gone or deadline passed: stop the run so it frees agent capacity
+        if run is not None:
+            await asyncio.shield(_abandon_run(run.thread_id, run.id))
+        raise
 
     except Exception as e:
+        metrics.count_error("agent")
         print(f"❌ Azure Agent Error: {str(e)}")
         traceback.print_exc()
         raise e
     
     finally:
         # 4. Cleanup
-        if thread:
+        if thread_id:
+            started = time.perf_counter()
             try:
-                client.agents.threads.delete(thread.id)
+                await get_client().agents.threads.delete(thread_id)
             except Exception:
                 pass
+            timings.delete = time.perf_counter() - started
+        _record_timings(timings)
+
+
+async def _run_agent_on_thread(thread_id: str, new_messages: List[Dict[str, str]]) -> str:
+    """Run the agent on an existing (cached) thread, appending only new messages."""
+    timings = RunTimings()
+    run_ids: List[str] = []
+    try:
+        # 1. OPTIMIZATION: Messages are added as part of the run request itself
+        started = time.perf_counter()
+        if run_waiter.streams_runs:
+            # 2. Event-driven: the run completes when its terminal event arrives
+            stream = await get_client().agents.runs.stream(
+                thread_id=thread_id,
+                agent_id=AGENT_ID,
+                additional_messages=new_messages,
+                truncation_strategy=_thread_truncation,
+                max_prompt_tokens=THREAD_MAX_PROMPT_TOKENS or None,
+            )
+            timings.create = time.perf_counter() - started
+            run = await run_waiter.wait_stream(
+                stream, timings, on_run=lambda r: run_ids.append(r.id) if not run_ids else None
+            )
+        else:
+            run = await get_client().agents.runs.create(
+                thread_id=thread_id,
+                agent_id=AGENT_ID,
+                additional_messages=new_messages,
+                truncation_strategy=_thread_truncation,
+                max_prompt_tokens=THREAD_MAX_PROMPT_TOKENS or None,
+            )
+            run_ids.append(run.id)
+            timings.create = time.perf_counter() - started
+            # 2. Poll for completion
+            run = await run_waiter.wait(get_client().agents, run, timings)
+
+        return await _fetch_response(run, timings)
+
+    except asyncio.CancelledError:
+        # Client gone or deadline passed: stop the run; the thread cache drops the thread
+        if run_ids:
+            await asyncio.shield(_abandon_run(thread_id, run_ids[0]))
+        raise
+
+    except Exception as e:
+        metrics.count_error("agent")
+        print(f"❌ Azure Agent Error: {str(e)}")
+        traceback.print_exc()
+        raise e
+
+    finally:
+        _record_timings(timings)
+
+
+async def _abandon_run(thread_id: str, run_id: str) -> None:
+    """Cancel a run nobody is waiting for any more."""
+    try:
+        await get_client().agents.runs.cancel(thread_id=thread_id, run_id=run_id)
+        print(f"Cancelled abandoned agent run {run_id}")
+    except Exception:
+        pass
+
+
+def _record_timings(timings: RunTimings) -> None:
+    run_timings.record(timings)
+    for stage in RunTimingLog.STAGES:
+        metrics.observe_stage(f"agent_{stage}", getattr(timings, stage))
+    if LOG_RUN_TIMINGS:
+        stages = ", ".join(
+            f"{stage}={value * 1000:.0f}ms"
+            for stage, value in timings.as_dict().items()
+            if isinstance(value, float)
+        )
+        print(f"Agent run timings [{timings.strategy}, {timings.polls} polls]: {stages}")
+
+
+async def _fetch_response(run, timings: RunTimings) -> str:
+    """Fetch the assistant's reply for a finished run."""
+    if run.status != "completed":
+        raise Exception(f"Agent run failed with status: {run.status}")
+    
+    # 3. Retrieve Response
+    started = time.perf_counter()
+    response_pager = get_client().agents.messages.list(
+        thread_id=run.thread_id,
+        order="desc", 
+        limit=1
+    )
+    
+    messages_list = [msg async for msg in response_pager]
+    timings.fetch = time.perf_counter() - started
+    response_text = ""
+    
+    if messages_list:
+        last_msg = messages_list[0]
+        if last_msg.role == "assistant":
+            for content_part in last_msg.content:
+                if hasattr(content_part, 'text'):
+                     response_text += content_part.text.value
+                elif isinstance(content_part, dict) and 'text' in content_part:
+                     response_text += content_part['text']['value']
+
+    if not response_text:
+        raise Exception("Empty response from Agent")
+        
+    return response_text
+
+
+async def stream_llm_with_history(
+    messages: List[Dict[str, str]],
+    session_id: Optional[str] = None,
+    revision: Optional[SessionRevision] = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of call_llm_with_history: yields text deltas as the
+    agent produces them instead of polling until the run has completed.
+    """
+    if session_id is None:
+        messages = await _prompt_messages(messages, session_id)
+        async with _run_slot():
+            thread = await get_client().agents.threads.create()
+            try:
+                async for delta in _stream_agent_on_thread(thread.id, messages):
+                    yield delta
+            finally:
+                try:
+                    await get_client().agents.threads.delete(thread.id)
+                except Exception:
+                    pass
+        return
+
+    async with thread_cache.lease(session_id, revision) as lease:
+        new_messages = await _prompt_messages(messages, session_id) if lease.is_new else messages[-1:]
+        async with _run_slot():
+            async for delta in _stream_agent_on_thread(lease.thread_id, new_messages):
+                yield delta
+
+
+async def _stream_agent_on_thread(thread_id: str, new_messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+    """
+    Stream one run's text deltas. The run gets the run waiter's timeout, as
+    polled runs do: past it, the run is cancelled and AgentRunTimeout raised.
+    """
+    run_id = None
+    finished = False
+    started = time.perf_counter()
+    timeout_at = started + run_waiter.timeout
+    try:
+        try:
+            stream = await asyncio.wait_for(
+                get_client().agents.runs.stream(
+                    thread_id=thread_id,
+                    agent_id=AGENT_ID,
+                    additional_messages=new_messages,
+                    truncation_strategy=_thread_truncation,
+                    max_prompt_tokens=THREAD_MAX_PROMPT_TOKENS or None,
+                ),
+                timeout=run_waiter.timeout,
+            )
+        except asyncio.TimeoutError:
+            raise AgentRunTimeout(f"Agent run timeout after {run_waiter.timeout:.0f} seconds")
+        metrics.observe_stage("agent_create", time.perf_counter() - started)
+        received_text = False
+        async with stream as event_handler:
+            events = aiter(event_handler)
+            while True:
+                try:
+                    event_type, event_data, _ = await asyncio.wait_for(
+                        anext(events), timeout=max(0.0, timeout_at - time.perf_counter())
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    if run_id:
+                        await asyncio.shield(_abandon_run(thread_id, run_id))
+                    raise AgentRunTimeout(f"Agent run timeout after {run_waiter.timeout:.0f} seconds")
+                if isinstance(event_data, MessageDeltaChunk):
+                    if event_data.text:
+                        if not received_text:
+                            metrics.observe_stage("agent_first_token", time.perf_counter() - started)
+                        received_text = True
+                        yield event_data.text
+                elif isinstance(event_data, ThreadRun):
+                    run_id = event_data.id
+                    if event_data.status in ["failed", "cancelled", "expired"]:
+                        raise Exception(f"Agent run failed with status: {event_data.status}")
+                elif event_type == AgentStreamEvent.ERROR:
+                    raise Exception(f"Agent stream error: {event_data}")
+        finished = True
+        metrics.observe_stage("agent_total", time.perf_counter() - started)
+
+        if not received_text:
+            raise Exception("Empty response from Agent")
+
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client disconnected or deadline passed mid-stream: stop the run
+        if run_id and not finished:
+            await asyncio.shield(_abandon_run(thread_id, run_id))
+        raise
+
+    except Exception as e:
+        metrics.count_error("agent")
+        print(f"❌ Azure Agent Stream Error: {str(e)}")
+        traceback.print_exc()
+        raise e
+
+
+def format_messages(
+    message: str,
+    conversation_history: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, str]]:
+    """
+    Build the agent message list: the conversation history plus the new message.
+    The history is only compacted when a new thread needs it (see _prompt_messages).
+    """
+    return list(conversation_history or []) + [{"role": "user", "content": message}]
+
+
+async def _prompt_messages(
+    messages: List[Dict[str, str]],
+    session_id: Optional[str],
+) -> List[Dict[str, str]]:
+    """Messages for a new thread: the history packed into its token budget, then the new message."""
+    if len(messages) <= 1:
+        return messages
+    # OPTIMIZATION: History is packed into a token budget (older turns are summarized)
+    # Bounded prompt size = bounded agent latency and cost
+    with metrics.time_stage("history_compaction"):
+        history = await history_compactor.compact_async(session_id, messages[:-1])
+    return history + messages[-1:]
+
+
+async def _lookup_answer_cache(
+    message: str,
+    conversation_history: Optional[List[Dict[str, Any]]],
+) -> CacheLookup:
+    """Look up single-turn questions in the semantic cache; multi-turn turns bypass it."""
+    if conversation_history:
+        answer_cache.record_bypass()
+        return CacheLookup(answer=None, vector=None)
+    try:
+        with metrics.time_stage("semantic_cache_lookup"):
+            return await answer_cache.lookup(message)
+    except Exception as e:
+        # The cache is an optimization only; never fail the request because of it
+        metrics.count_error("semantic_cache")
+        print(f"Error in semantic cache lookup: {e}")
+        return CacheLookup(answer=None, vector=None)
+
+
+async def _pre_agent_lookup(
+    message: str,
+    conversation_history: Optional[List[Dict[str, Any]]],
+) -> Tuple[Optional[FaqMatch], CacheLookup]:
+    """
+    Stages that can answer without the agent, cheapest first: lexical FAQ
+    match, semantic cache, then semantic FAQ match on the cache's query vector.
+    All of them are for single-turn questions: a follow-up like "and how long
+    does it take?" depends on the conversation, so it always goes to the agent.
+    """
+    if conversation_history:
+        return None, await _lookup_answer_cache(message, conversation_history)
+    locale = suggestion_engine.detect_locale(message)
+    with metrics.time_stage("faq_fast_path"):
+        faq_match = faq_fast_path.match_lexical(message, locale)
+    if faq_match is not None:
+        return faq_match, CacheLookup(answer=None, vector=None)
+    cache_lookup = await _lookup_answer_cache(message, conversation_history)
+    if cache_lookup.answer is None:
+        faq_match = faq_fast_path.match_semantic(cache_lookup.vector, locale)
+    return faq_match, cache_lookup
+
+
+def _faq_response(faq_match: FaqMatch, message: str, session_id: str) -> Dict[str, Any]:
+    answer = faq_match.faq["answer"]
+    return {
+        "response": answer,
+        "suggestions": generate_suggestions(message, answer, faq_match.locale),
+        "session_id": session_id,
+        "model_used": "faq",
+    }
+
+
+def _normalize_question(message: str) -> str:
+    return " ".join(message.lower().split())
+
+
+async def _resolve_history(
+    session_id: str,
+    conversation_history: Optional[List[Dict[str, Any]]],
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[SessionRevision]]:
+    """
+    History sent by the client wins; otherwise use the server-side session
+    turns, with the session revision they were read at (None if unknown).
+    """
+    if conversation_history is not None or not session_id:
+        return conversation_history, None
+    try:
+        with metrics.time_stage("session_history_load"):
+            session = await session_store.get_session(session_id)
+    except Exception as e:
+        metrics.count_error("session_store")
+        print(f"Error loading session history: {e}")
+        return None, None
+    if session is None:
+        return None, None
+    return session.turns, session.revision
+
+
+async def _remember_turn(session_id: str, message: str, response_text: str) -> None:
+    """Append the answered exchange to the session's server-side history."""
+    if not session_id:
+        return
+    try:
+        await session_store.append_turns(session_id, [("user", message), ("assistant", response_text)])
+    except Exception as e:
+        metrics.count_error("session_store")
+        print(f"Error saving session history: {e}")
 
-def process_text_message(
+
+async def _remember_local_turn(session_id: str, message: str, response_text: str) -> None:
+    """
+    Remember an exchange answered without the agent. The session's cached
+    thread never saw it and reused threads only get the newest message, so
+    the thread is dropped: the next agent turn starts from the full history.
+    """
+    if session_id:
+        thread_cache.invalidate(session_id)
+    await _remember_turn(session_id, message, response_text)
+
+
+def forget_session(session_id: str) -> None:
+    """Drop what this worker keeps for an ended session: its agent thread and history summary."""
+    thread_cache.invalidate(session_id)
+    history_compactor.invalidate(session_id)
+
+
+async def process_text_message(
     message: str,
     session_id: str,
     conversation_history: Optional[List[Dict[str, Any]]] = None,
     preferred_model: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
 ) -> Dict[str, Any]:
-    """Process message and return response dict."""
+    """
+    Process message and return response dict.
+    Without conversation_history the session's server-side history is used,
+    and every answered exchange is appended to it.
+    The deadline bounds the whole pipeline; when it passes during the agent
+    run, the run is cancelled and its thread dropped.
+    """
+    if deadline is None:
+        deadline = Deadline(DEFAULT_REQUEST_TIMEOUT_SECONDS)
     try:
-        formatted_messages = []
-        
-        # OPTIMIZATION: Limit history to last 4 messages (2 exchanges)
-        # Fewer messages = faster processing by the agent
-        if conversation_history:
-            for msg in conversation_history[-4:]:
-                role = msg.get("role")
-                content = msg.get("content")
-                if role in ["user", "assistant"] and content:
-                    formatted_messages.append({"role": role, "content": content})
-        
-        formatted_messages.append({"role": "user", "content": message})
+        conversation_history, revision = await _resolve_history(session_id, conversation_history)
+
+        # OPTIMIZATION: Single-turn questions matching a curated FAQ or a cached answer skip the agent entirely
+        faq_match, cache_lookup = await _pre_agent_lookup(message, conversation_history)
+        if faq_match:
+            response = _faq_response(faq_match, message, session_id)
+            await _remember_local_turn(session_id, message, response["response"])
+            return response
+        if cache_lookup.answer:
+            await _remember_local_turn(session_id, message, cache_lookup.answer.response)
+            return {
+                "response": cache_lookup.answer.response,
+                "suggestions": cache_lookup.answer.suggestions,
+                "session_id": session_id,
+                "model_used": "semantic-cache",
+            }
+
+        formatted_messages = format_messages(message, conversation_history)
+        deadline.check("agent run")
 
         # Call LLM
-        response_text = call_llm_with_history(formatted_messages)
+        async def run_llm():
+            if conversation_history:
+                return await call_agent_guarded(formatted_messages, session_id=session_id, revision=revision), False
+            # OPTIMIZATION: Bursts of the same opening question share one agent run
+            return await coalescer.do(
+                _normalize_question(message),
+                lambda: call_agent_guarded(formatted_messages, session_id=session_id, revision=revision),
+            )
+
+        try:
+            response_text, shared = await asyncio.wait_for(run_llm(), timeout=deadline.remaining())
+        except asyncio.TimeoutError:
+            # The client's budget ran out, not the backend's: the cancelled run
+            # counts as abandoned in call_agent_guarded, not as a breaker failure
+            raise DeadlineExceeded(f"Request deadline of {deadline.budget_seconds:.1f}s exceeded during agent run")
+        except CircuitOpenError:
+            fallback = _fallback_response(message, session_id)
+            if "error" not in fallback:
+                await _remember_local_turn(session_id, message, fallback["response"])
+            return fallback
         
-        # Suggestions (Local processing is instant)
-        suggestions = generate_suggestions(message, response_text)
+        # Suggestions (Local processing is instant); past the deadline the
+        # answer is still returned, just with the generic suggestions
+        if deadline.expired():
+            suggestions = list(DEFAULT_SUGGESTIONS)
+        else:
+            suggestions = generate_suggestions(message, response_text)
+        if not shared:
+            answer_cache.store(cache_lookup, message, response_text, suggestions)
+        await _remember_turn(session_id, message, response_text)
 
         return {
             "response": response_text,
@@ -134,6 +792,7 @@ def process_text_message(
         }
 
     except Exception as e:
+        metrics.count_error("chat")
         return {
             "response": "I apologize, but I'm having trouble connecting right now.",
             "suggestions": ["Try again"],
@@ -141,116 +800,209 @@ def process_text_message(
             "error": str(e)
         }
 
-def generate_suggestions(user_message: str, assistant_response: str) -> List[str]:
+async def stream_text_message(
+    message: str,
+    session_id: str,
+    conversation_history: Optional[List[Dict[str, Any]]] = None,
+    preferred_model: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a chat answer as events: one "token" event per text delta, then a
+    final "done" event carrying the full response, suggestions and model_used.
+    Failures are reported as an "error" event with the usual apology text.
+    """
+    if deadline is None:
+        deadline = Deadline(DEFAULT_REQUEST_TIMEOUT_SECONDS)
+    response_parts: List[str] = []
+    agent_called = False
+    try:
+        conversation_history, revision = await _resolve_history(session_id, conversation_history)
+
+        faq_match, cache_lookup = await _pre_agent_lookup(message, conversation_history)
+        if faq_match:
+            response = _faq_response(faq_match, message, session_id)
+            await _remember_local_turn(session_id, message, response["response"])
+            yield {"event": "token", "data": {"text": response["response"]}}
+            yield {"event": "done", "data": response}
+            return
+        if cache_lookup.answer:
+            await _remember_local_turn(session_id, message, cache_lookup.answer.response)
+            yield {"event": "token", "data": {"text": cache_lookup.answer.response}}
+            yield {
+                "event": "done",
+                "data": {
+                    "response": cache_lookup.answer.response,
+                    "suggestions": cache_lookup.answer.suggestions,
+                    "session_id": session_id,
+                    "model_used": "semantic-cache",
+                },
+            }
+            return
+
+        formatted_messages = format_messages(message, conversation_history)
+        deadline.check("agent run")
+
+        if not circuit_breaker.allow():
+            fallback = _fallback_response(message, session_id)
+            if "error" not in fallback:
+                await _remember_local_turn(session_id, message, fallback["response"])
+            yield {"event": "token", "data": {"text": fallback["response"]}}
+            yield {"event": "done", "data": fallback}
+            return
+        agent_called = True
+
+        async with aclosing(
+            stream_llm_with_history(formatted_messages, session_id=session_id, revision=revision)
+        ) as deltas:
+            while True:
+                # The deadline bounds every wait (run slot, thread lease, queued run,
+                # first and later tokens); a timeout cancels the run and drops its thread
+                try:
+                    delta = await asyncio.wait_for(anext(deltas), timeout=deadline.remaining())
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(
+                        f"Request deadline of {deadline.budget_seconds:.1f}s exceeded during agent stream"
+                    )
+                response_parts.append(delta)
+                yield {"event": "token", "data": {"text": delta}}
+
+        circuit_breaker.record_success()
+        agent_called = False
+        response_text = "".join(response_parts)
+        if deadline.expired():
+            suggestions = list(DEFAULT_SUGGESTIONS)
+        else:
+            suggestions = generate_suggestions(message, response_text)
+        answer_cache.store(cache_lookup, message, response_text, suggestions)
+        await _remember_turn(session_id, message, response_text)
+
+        yield {
+            "event": "done",
+            "data": {
+                "response": response_text,
+                "suggestions": suggestions,
+                "session_id": session_id,
+                "model_used": "azure-agent",
+            },
+        }
+
+    except asyncio.CancelledError:
+        if agent_called:
+            circuit_breaker.record_abandoned()
+        raise
+
+    except Exception as e:
+        if agent_called:
+            # Only the backend's own run budget counts against it; a client
+            # deadline passing mid-stream says nothing about backend health
+            if isinstance(e, DeadlineExceeded):
+                circuit_breaker.record_abandoned()
+            else:
+                circuit_breaker.record_failure(timeout=isinstance(e, AgentRunTimeout))
+        metrics.count_error("chat")
+        yield {
+            "event": "error",
+            "data": {
+                "response": "I apologize, but I'm having trouble connecting right now.",
+                "suggestions": ["Try again"],
+                "session_id": session_id,
+                "error": str(e),
+            },
+        }
+
+def _fallback_response(message: str, session_id: str) -> Dict[str, Any]:
+    """
+    Cheap local answer while the agent circuit is open: the best-matching
+    curated FAQ, or an apology if nothing matches.
+    """
+    with metrics.time_stage("faq_fallback"):
+        faq = _best_faq_match(message)
+    if faq is None:
+        return {
+            "response": "I apologize, but I'm having trouble connecting right now. Please try again in a moment.",
+            "suggestions": ["Try again", "Browse FAQs"],
+            "session_id": session_id,
+            "model_used": "fallback",
+            "error": "Agent backend circuit is open",
+        }
+    return {
+        "response": faq["answer"],
+        "suggestions": generate_suggestions(message, faq["answer"]),
+        "session_id": session_id,
+        "model_used": "faq-fallback",
+    }
+
+
+def _best_faq_match(message: str) -> Optional[Dict[str, Any]]:
+    """Pick the best BM25-ranked FAQ for the message, in the message's language."""
+    if not message.strip():
+        return None
+    locale = suggestion_engine.detect_locale(message)
+    hits = faq_service.search_hits(message, limit=1, locale=locale)
+    if not hits:
+        return None
+    # Require at least two matching terms so unrelated questions get the apology instead
+    if hits[0].matched_terms < min(2, len(faq_service.query_terms(message, locale=locale))):
+        return None
+    return faq_service.get_faq(hits[0].doc_id, locale=locale)
+
+
+def get_stats() -> Dict[str, Any]:
+    """Counters of the chat pipeline's caches and resilience features."""
+    return {
+        "thread_cache": thread_cache.stats(),
+        "semantic_cache": answer_cache.stats(),
+        "faq_fast_path": faq_fast_path.stats(),
+        "coalescing": coalescer.stats(),
+        "hedging": hedger.stats(),
+        "circuit_breaker": circuit_breaker.stats(),
+        "run_timings": run_timings.summary(),
+        "sessions": session_store.stats(),
+        "history": history_compactor.stats(),
+        "admission": chat_admission.stats(),
+        "session_rate_limit": session_rate_limiter.stats(),
+        "ip_rate_limit": ip_rate_limiter.stats(),
+    }
+
+
+def _collect_metrics() -> List[metrics.Family]:
+    """Expose the pipeline counters of get_stats() as gauges named chat_<component>_<counter>."""
+    families = []
+    for component, stats in get_stats().items():
+        if component == "run_timings":
+            continue  # Covered by the stage_duration_seconds histogram
+        for key, value in stats.items():
+            name = f"chat_{component}_{key}"
+            if isinstance(value, str):
+                families.append((name, "gauge", f"{component} {key}", [("", {key: value}, 1)]))
+            elif isinstance(value, (int, float)):
+                families.append((name, "gauge", f"{component} {key}", [("", {}, float(value))]))
+    return families
+
+
+metrics.REGISTRY.register_collector(_collect_metrics)
+
+
+# Follow-up suggestion rules, compiled once per locale
+suggestion_engine = SuggestionEngine()
+
+# Returned when there is no time left to compute contextual suggestions
+DEFAULT_SUGGESTIONS = suggestion_engine.default("en")
+
+
+def generate_suggestions(
+    user_message: str,
+    assistant_response: str,
+    locale: Optional[str] = None,
+) -> List[str]:
     """
     Generate intelligent, context-aware follow-up suggestions based on both
     the user's question and the agent's response.
+    Rules come from the per-locale tables in suggestion_rules; conditions are
+    plain substring checks, evaluated in order (see suggestions.py).
     """
-    user_lower = user_message.lower()
-    response_lower = assistant_response.lower()
-    
-    # Combine both for better context
-    combined_text = user_lower + " " + response_lower
-    
-    # Testing & Diagnosis
-    if any(word in combined_text for word in ["test", "testing", "diagnosis", "hiv test", "window period"]):
-        if "where" in user_lower or "location" in combined_text:
-            return ["What types of tests exist?", "How accurate are tests?", "What if I test positive?"]
-        elif "positive" in combined_text or "result" in combined_text:
-            return ["What happens next?", "Treatment options?", "Who should I tell?"]
-        elif "window" in combined_text or "when" in user_lower:
-            return ["Where to get tested?", "What happens during testing?", "Cost of testing?"]
-        else:
-            return ["Where can I get tested?", "When should I test?", "Test accuracy rates?"]
-    
-    # Treatment & Medication
-    elif any(word in combined_text for word in ["treatment", "medication", "art", "antiretroviral", "drugs", "pills", "medicine"]):
-        if "side effect" in combined_text or "problem" in combined_text:
-            return ["How to manage side effects?", "Alternative treatments?", "When to see a doctor?"]
-        elif "start" in combined_text or "begin" in combined_text:
-            return ["What to expect from treatment?", "Treatment side effects?", "Cost of medication?"]
-        elif "stop" in combined_text or "miss" in combined_text or "adhere" in combined_text:
-            return ["Importance of adherence?", "What if I miss doses?", "Reminder strategies?"]
-        else:
-            return ["How does treatment work?", "Treatment side effects?", "How long is treatment?"]
-    
-    # Prevention (PrEP/PEP)
-    elif any(word in combined_text for word in ["prevent", "prevention", "prep", "pep", "prophylaxis", "protect"]):
-        if "prep" in combined_text:
-            return ["How to get PrEP?", "PrEP side effects?", "PrEP effectiveness?"]
-        elif "pep" in combined_text:
-            return ["Where to get PEP?", "PEP timeline?", "PEP vs PrEP?"]
-        elif "condom" in combined_text:
-            return ["Other prevention methods?", "What is PrEP?", "Risk reduction strategies?"]
-        else:
-            return ["What is PrEP?", "What is PEP?", "How to reduce risk?"]
-    
-    # Living with HIV
-    elif any(word in combined_text for word in ["living with", "daily life", "lifestyle", "cope", "coping", "manage", "undetectable"]):
-        if "work" in combined_text or "job" in combined_text:
-            return ["Disclosure at work?", "Staying healthy?", "Support groups?"]
-        elif "relation" in combined_text or "partner" in combined_text or "sex" in combined_text:
-            return ["Telling partners?", "Safe sex practices?", "Undetectable = Untransmittable?"]
-        elif "u=u" in combined_text or "undetectable" in combined_text:
-            return ["How to become undetectable?", "What does U=U mean?", "Can I have children?"]
-        else:
-            return ["Staying healthy tips?", "Support resources?", "Emotional support?"]
-    
-    # Transmission & Risk
-    elif any(word in combined_text for word in ["transmit", "transmission", "risk", "expose", "exposure", "infect", "catch", "spread"]):
-        if "how" in user_lower:
-            return ["Risk levels?", "Prevention methods?", "Getting tested?"]
-        elif "partner" in combined_text:
-            return ["How to tell partner?", "Protecting partners?", "U=U explained?"]
-        else:
-            return ["Transmission risks?", "Prevention strategies?", "PrEP for partners?"]
-    
-    # Symptoms & Health
-    elif any(word in combined_text for word in ["symptom", "sick", "fever", "rash", "tired", "fatigue", "health"]):
-        if "early" in combined_text or "first" in combined_text:
-            return ["When to get tested?", "Acute HIV symptoms?", "Next steps?"]
-        else:
-            return ["When to see a doctor?", "Managing symptoms?", "Health monitoring?"]
-    
-    # Support & Resources
-    elif any(word in combined_text for word in ["support", "help", "resource", "counsel", "talk", "alone", "scared", "anxiety"]):
-        if "emotion" in combined_text or "mental" in combined_text or "depress" in combined_text:
-            return ["Mental health resources?", "Support groups?", "Counseling services?"]
-        elif "financial" in combined_text or "cost" in combined_text or "afford" in combined_text:
-            return ["Financial assistance?", "Insurance coverage?", "Free services?"]
-        else:
-            return ["Support groups near me?", "Hotline numbers?", "Online communities?"]
-    
-    # Pregnancy & Family
-    elif any(word in combined_text for word in ["pregnant", "pregnancy", "baby", "child", "mother", "breastfeed"]):
-        return ["Prevention during pregnancy?", "Safe delivery options?", "Infant testing?"]
-    
-    # Stigma & Disclosure
-    elif any(word in combined_text for word in ["stigma", "discriminat", "tell", "disclose", "secret", "shame"]):
-        return ["Disclosure strategies?", "Legal protections?", "Finding support?"]
-    
-    # Response-based suggestions when agent mentions specific topics
-    elif "doctor" in response_lower or "healthcare" in response_lower or "medical" in response_lower:
-        return ["How to find a specialist?", "What to ask my doctor?", "Preparing for appointments?"]
-    elif "immediately" in response_lower or "urgent" in response_lower or "soon" in response_lower:
-        return ["Where to get immediate help?", "Emergency resources?", "What to do now?"]
-    elif "more information" in response_lower or "learn more" in response_lower:
-        return ["Tell me more", "Related topics?", "Where to read more?"]
-    
-    # Default contextual suggestions based on question type
-    elif "?" in user_message:
-        if "how" in user_lower:
-            return ["Tell me more", "Next steps?", "Where to get help?"]
-        elif "what" in user_lower:
-            return ["How does it work?", "Why is this important?", "Related information?"]
-        elif "where" in user_lower:
-            return ["Other options?", "What to expect?", "Cost information?"]
-        elif "when" in user_lower:
-            return ["What happens next?", "How long does it take?", "Other timing questions?"]
-        elif "why" in user_lower:
-            return ["Tell me more", "What are alternatives?", "Related concerns?"]
-        else:
-            return ["Tell me more", "Related topics?", "Where to get help?"]
-    
-    # Final fallback
-    return ["Tell me more", "What are my options?", "Where can I get help?"]
\ No newline at end of file
+    with metrics.time_stage("suggestions"):
+        return suggestion_engine.suggest(user_message, assistant_response, locale)
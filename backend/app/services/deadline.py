@@ -0,0 +1,55 @@
+"""
+Deadline - Per-request time budget propagated through the chat pipeline
+"""
+
+import math
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's time budget runs out before a stage starts."""
+
+
+class Deadline:
+    """An absolute point in time by which a request must be answered."""
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    @classmethod
+    def from_request(
+        cls,
+        header_value: Optional[str],
+        field_value: Optional[float],
+        default_seconds: float,
+        max_seconds: float,
+        min_seconds: float = 1.0,
+    ) -> "Deadline":
+        """
+        Build a deadline from the X-Request-Timeout header or the request's
+        timeoutSeconds field (header wins), clamped to [min_seconds, max_seconds].
+        Invalid, non-finite ("nan", "inf") or non-positive values fall back to the default.
+        """
+        budget = None
+        if header_value:
+            try:
+                budget = float(header_value)
+            except ValueError:
+                budget = None
+        if budget is None and field_value is not None:
+            budget = float(field_value)
+        if budget is None or not math.isfinite(budget) or budget <= 0:
+            budget = default_seconds
+        return cls(min(max(budget, min_seconds), max_seconds))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str) -> None:
+        if self.expired():
+            raise DeadlineExceeded(f"Request deadline of {self.budget_seconds:.1f}s exceeded before {stage}")
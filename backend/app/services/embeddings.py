@@ -0,0 +1,105 @@
+"""
+Embeddings - Shared multilingual sentence embedding model
+
+Uses the same model as the vector populators so query and document
+embeddings live in the same space. The model is loaded on first use.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+# Seconds before a failed model load (offline, model not downloaded) is tried again
+MODEL_RETRY_SECONDS = float(os.environ.get("EMBEDDING_MODEL_RETRY_SECONDS", "300"))
+
+_model = None
+_model_lock = threading.Lock()
+_model_failed = False
+_model_failed_at = 0.0
+_model_error = ""
+
+_tokenizer = None
+_tokenizer_failed = False
+
+
+def get_model():
+    """
+    Load the SentenceTransformer model once (thread-safe). After a failed
+    load, callers get a RuntimeError at once until MODEL_RETRY_SECONDS pass,
+    so requests don't each pay for another attempt.
+    """
+    global _model, _model_failed, _model_failed_at, _model_error
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                if _model_failed and time.monotonic() - _model_failed_at < MODEL_RETRY_SECONDS:
+                    raise RuntimeError(f"Embedding model unavailable: {_model_error}")
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    _model = SentenceTransformer(MODEL_NAME)
+                except Exception as e:
+                    print(f"Error loading embedding model: {e}")
+                    _model_failed, _model_failed_at, _model_error = True, time.monotonic(), str(e)
+                    raise
+                _model_failed = False
+    return _model
+
+
+def get_tokenizer():
+    """
+    The model's word-piece tokenizer, loaded on its own (no model weights)
+    unless the model is already in memory. Returns None if it can't be loaded.
+    """
+    global _tokenizer, _tokenizer_failed
+    if _tokenizer is None and not _tokenizer_failed:
+        with _model_lock:
+            if _tokenizer is None and not _tokenizer_failed:
+                try:
+                    if _model is not None:
+                        _tokenizer = _model.tokenizer
+                    else:
+                        from transformers import AutoTokenizer
+                        _tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+                except Exception as e:
+                    print(f"Tokenizer unavailable, estimating token counts: {e}")
+                    _tokenizer_failed = True
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """Number of word-piece tokens in text (estimated if the tokenizer is unavailable)."""
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        # Multilingual text averages roughly 3 characters per token
+        return -(-len(text) // 3)
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def is_available() -> bool:
+    """True if sentence-transformers is installed (checked without importing it and torch)."""
+    return importlib.util.find_spec("sentence_transformers") is not None
+
+
+def encode(texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+    """Encode texts into L2-normalized float32 vectors (cosine similarity == dot product)."""
+    kwargs = {"batch_size": batch_size} if batch_size else {}
+    vectors = get_model().encode(
+        texts,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        **kwargs,
+    )
+    return vectors.astype(np.float32, copy=False)
+
+
+async def encode_async(texts: List[str]) -> np.ndarray:
+    """Encode off the event loop so model inference never blocks other requests."""
+    return await asyncio.to_thread(encode, texts)
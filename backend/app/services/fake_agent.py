@@ -0,0 +1,284 @@
+"""
+Fake Agent - In-process stand-in for the Azure AI agent service
+
+Implements the subset of the async AIProjectClient.agents API the chat
+service uses (agents, threads, runs incl. streaming, messages), with configurable
+latency distributions and failure rates, so the chat API can be load-tested
+offline. Selected with AGENT_BACKEND=fake.
+
+Latencies: every API call costs a network round trip (AGENT_FAKE_API_LATENCY),
+runs wait in the queue (AGENT_FAKE_QUEUE_SECONDS) and then run for a
+log-normally distributed time (median AGENT_FAKE_RUN_SECONDS, spread
+AGENT_FAKE_RUN_SIGMA). AGENT_FAKE_FAILURE_RATE is the share of runs that end
+"failed"; AGENT_FAKE_ERROR_RATE the share of API calls that raise.
+"""
+
+import asyncio
+import itertools
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from azure.ai.agents.models import AgentStreamEvent, MessageDeltaChunk, ThreadMessage, ThreadRun
+from azure.core.exceptions import HttpResponseError
+
+_FILLER = (
+    "HIV is a manageable condition with modern treatment. Testing is confidential and "
+    "widely available. Counselling services can help with any questions or worries."
+).split()
+
+
+@dataclass
+class FakeAgentConfig:
+    api_latency: float = 0.03
+    queue_seconds: float = 0.1
+    run_seconds: float = 1.5
+    run_sigma: float = 0.5
+    failure_rate: float = 0.0
+    error_rate: float = 0.0
+    response_words: int = 80
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "FakeAgentConfig":
+        seed = os.environ.get("AGENT_FAKE_SEED")
+        return cls(
+            api_latency=float(os.environ.get("AGENT_FAKE_API_LATENCY", "0.03")),
+            queue_seconds=float(os.environ.get("AGENT_FAKE_QUEUE_SECONDS", "0.1")),
+            run_seconds=float(os.environ.get("AGENT_FAKE_RUN_SECONDS", "1.5")),
+            run_sigma=float(os.environ.get("AGENT_FAKE_RUN_SIGMA", "0.5")),
+            failure_rate=float(os.environ.get("AGENT_FAKE_FAILURE_RATE", "0.0")),
+            error_rate=float(os.environ.get("AGENT_FAKE_ERROR_RATE", "0.0")),
+            response_words=int(os.environ.get("AGENT_FAKE_RESPONSE_WORDS", "80")),
+            seed=int(seed) if seed else None,
+        )
+
+
+@dataclass
+class _FakeRun:
+    id: str
+    thread_id: str
+    created_at: float
+    duration: float
+    fails: bool
+    cancelled: bool = False
+    answered: bool = False
+
+
+@dataclass
+class _FakeThread:
+    id: str
+    messages: List[Dict[str, str]] = field(default_factory=list)
+
+
+class _FakeBackend:
+    """Shared state of all fake operations."""
+
+    def __init__(self, config: FakeAgentConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.threads: Dict[str, _FakeThread] = {}
+        self.runs: Dict[str, _FakeRun] = {}
+        self._ids = itertools.count(1)
+
+    async def call(self) -> None:
+        """One API round trip; may fail like a flaky network/service would."""
+        await asyncio.sleep(self.config.api_latency)
+        if self.random.random() < self.config.error_rate:
+            raise HttpResponseError(message="Fake agent service error (503)")
+
+    def new_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids):08d}"
+
+    def new_thread(self, messages: Optional[List[Dict[str, str]]] = None) -> _FakeThread:
+        thread = _FakeThread(id=self.new_id("thread"), messages=list(messages or []))
+        self.threads[thread.id] = thread
+        return thread
+
+    def start_run(self, thread_id: str) -> _FakeRun:
+        if thread_id not in self.threads:
+            raise HttpResponseError(message=f"No thread found with id '{thread_id}' (404)")
+        config = self.config
+        run = _FakeRun(
+            id=self.new_id("run"),
+            thread_id=thread_id,
+            created_at=time.monotonic(),
+            duration=config.queue_seconds + self.random.lognormvariate(0, config.run_sigma) * config.run_seconds,
+            fails=self.random.random() < config.failure_rate,
+        )
+        self.runs[run.id] = run
+        return run
+
+    def status(self, run: _FakeRun) -> str:
+        if run.cancelled:
+            return "cancelled"
+        elapsed = time.monotonic() - run.created_at
+        if elapsed < self.config.queue_seconds:
+            return "queued"
+        if elapsed < run.duration:
+            return "in_progress"
+        if run.fails:
+            return "failed"
+        self._answer(run)
+        return "completed"
+
+    def thread_run(self, run: _FakeRun, status: Optional[str] = None) -> ThreadRun:
+        return ThreadRun({"id": run.id, "thread_id": run.thread_id, "status": status or self.status(run)})
+
+    def answer_text(self, run: _FakeRun) -> str:
+        thread = self.threads.get(run.thread_id)
+        question = next(
+            (m["content"] for m in reversed(thread.messages) if m["role"] == "user"), ""
+        ) if thread else ""
+        rng = random.Random(run.id)
+        filler = " ".join(rng.choice(_FILLER) for _ in range(self.config.response_words))
+        return f"(simulated) You asked: {question[:80]}. {filler}"
+
+    def _answer(self, run: _FakeRun) -> None:
+        if not run.answered and run.thread_id in self.threads:
+            run.answered = True
+            self.threads[run.thread_id].messages.append({"role": "assistant", "content": self.answer_text(run)})
+
+
+class _FakeThreads:
+    def __init__(self, backend: _FakeBackend):
+        self._backend = backend
+
+    async def create(self, **kwargs) -> Any:
+        await self._backend.call()
+        return self._backend.new_thread(kwargs.get("messages"))
+
+    async def delete(self, thread_id: str, **kwargs) -> None:
+        await self._backend.call()
+        self._backend.threads.pop(thread_id, None)
+        for run_id in [r.id for r in self._backend.runs.values() if r.thread_id == thread_id]:
+            del self._backend.runs[run_id]
+
+
+class _FakeMessages:
+    def __init__(self, backend: _FakeBackend):
+        self._backend = backend
+
+    async def create(self, thread_id: str, role: str, content: str, **kwargs) -> None:
+        await self._backend.call()
+        self._backend.threads[thread_id].messages.append({"role": role, "content": content})
+
+    async def list(self, thread_id: str, order: str = "desc", limit: Optional[int] = None, **kwargs):
+        await self._backend.call()
+        messages = list(self._backend.threads[thread_id].messages)
+        if order == "desc":
+            messages.reverse()
+        for i, message in enumerate(messages[:limit]):
+            yield ThreadMessage({
+                "id": f"msg_{i}",
+                "thread_id": thread_id,
+                "role": message["role"],
+                "content": [{"type": "text", "text": {"value": message["content"], "annotations": []}}],
+            })
+
+
+class _FakeRunStream:
+    """Async context manager yielding (event_type, event_data, None) like AsyncAgentRunStream."""
+
+    def __init__(self, backend: _FakeBackend, run: _FakeRun):
+        self._backend = backend
+        self._run = run
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        backend, run = self._backend, self._run
+        yield AgentStreamEvent.THREAD_RUN_CREATED, backend.thread_run(run, "queued"), None
+        await asyncio.sleep(max(0.0, run.created_at + backend.config.queue_seconds - time.monotonic()))
+        if run.cancelled:
+            yield AgentStreamEvent.THREAD_RUN_CANCELLED, backend.thread_run(run), None
+            return
+        yield AgentStreamEvent.THREAD_RUN_IN_PROGRESS, backend.thread_run(run, "in_progress"), None
+
+        # Spread the answer's deltas over the run time
+        words = backend.answer_text(run).split(" ")
+        chunks = [" ".join(words[i:i + 5]) + " " for i in range(0, len(words), 5)]
+        remaining = max(0.0, run.created_at + run.duration - time.monotonic())
+        for chunk in chunks:
+            await asyncio.sleep(remaining / len(chunks))
+            if run.cancelled:
+                yield AgentStreamEvent.THREAD_RUN_CANCELLED, backend.thread_run(run), None
+                return
+            if not run.fails:
+                yield AgentStreamEvent.THREAD_MESSAGE_DELTA, MessageDeltaChunk({
+                    "id": "msg_delta",
+                    "object": "thread.message.delta",
+                    "delta": {"role": "assistant", "content": [{"type": "text", "index": 0, "text": {"value": chunk}}]},
+                }), None
+
+        status = backend.status(run)
+        event = AgentStreamEvent.THREAD_RUN_FAILED if status == "failed" else AgentStreamEvent.THREAD_RUN_COMPLETED
+        yield event, backend.thread_run(run, status), None
+        yield AgentStreamEvent.DONE, "[DONE]", None
+
+
+class _FakeRuns:
+    def __init__(self, backend: _FakeBackend):
+        self._backend = backend
+
+    async def create(self, thread_id: str, agent_id: str, additional_messages=None, **kwargs) -> ThreadRun:
+        await self._backend.call()
+        run = self._backend.start_run(thread_id)
+        self._backend.threads[thread_id].messages.extend(additional_messages or [])
+        return self._backend.thread_run(run)
+
+    async def stream(self, thread_id: str, agent_id: str, additional_messages=None, **kwargs) -> _FakeRunStream:
+        await self._backend.call()
+        run = self._backend.start_run(thread_id)
+        self._backend.threads[thread_id].messages.extend(additional_messages or [])
+        return _FakeRunStream(self._backend, run)
+
+    async def get(self, thread_id: str, run_id: str, **kwargs) -> ThreadRun:
+        await self._backend.call()
+        return self._backend.thread_run(self._backend.runs[run_id])
+
+    async def cancel(self, thread_id: str, run_id: str, **kwargs) -> ThreadRun:
+        await self._backend.call()
+        run = self._backend.runs[run_id]
+        run.cancelled = True
+        return self._backend.thread_run(run)
+
+
+class FakeAgentsClient:
+    """Drop-in for AIProjectClient.agents."""
+
+    def __init__(self, config: Optional[FakeAgentConfig] = None):
+        backend = _FakeBackend(config or FakeAgentConfig.from_env())
+        self._backend = backend
+        self.threads = _FakeThreads(backend)
+        self.messages = _FakeMessages(backend)
+        self.runs = _FakeRuns(backend)
+
+    async def get_agent(self, agent_id: str, **kwargs) -> Any:
+        await self._backend.call()
+        return SimpleNamespace(id=agent_id)
+
+    async def create_thread_and_run(self, agent_id: str, thread: Dict[str, Any], **kwargs) -> ThreadRun:
+        await self._backend.call()
+        new_thread = self._backend.new_thread(thread.get("messages"))
+        return self._backend.thread_run(self._backend.start_run(new_thread.id))
+
+
+class FakeProjectClient:
+    """Drop-in for the async AIProjectClient (only .agents and close())."""
+
+    def __init__(self, config: Optional[FakeAgentConfig] = None):
+        self.agents = FakeAgentsClient(config)
+
+    async def close(self) -> None:
+        return None
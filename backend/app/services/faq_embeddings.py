@@ -0,0 +1,148 @@
+"""
+FAQ Embeddings - Precomputed embedding matrices for semantic FAQ search
+
+Question and answer embeddings of every FAQ are computed once with the
+shared multilingual model and kept as L2-normalized float32 matrices, so a
+query is a single matrix-vector product per matrix plus a top-k partial
+sort. The matrices are persisted to an .npz file tagged with a fingerprint
+of the model and the FAQ texts; a restart with unchanged FAQs loads them
+instead of re-encoding. When FAQs are reloaded, the new index takes the
+vectors of unchanged texts from the previous one and encodes only the
+changed texts.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services import embeddings
+
+
+class FaqEmbeddingIndex:
+    """Question/answer embedding matrices over a fixed list of FAQs (row i = faqs[i])."""
+
+    def __init__(
+        self,
+        faqs: List[Dict[str, Any]],
+        cache_path: Optional[str] = None,
+        previous: Optional["FaqEmbeddingIndex"] = None,
+    ):
+        self.cache_path = cache_path
+        self._previous = previous
+        self.doc_ids = [faq["id"] for faq in faqs]
+        self._questions_text = [faq["question"] for faq in faqs]
+        self._answers_text = [faq["answer"] for faq in faqs]
+        self._questions: Optional[np.ndarray] = None
+        self._answers: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.source: Optional[str] = None  # "disk", "encoded" or "incremental" once loaded
+        self.encoded = 0  # Texts actually run through the model by load()
+
+    @property
+    def loaded(self) -> bool:
+        return self._questions is not None
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256(embeddings.MODEL_NAME.encode())
+        for doc_id, question, answer in zip(self.doc_ids, self._questions_text, self._answers_text):
+            digest.update(b"\0".join(s.encode() for s in (doc_id, question, answer)) + b"\1")
+        return digest.hexdigest()
+
+    def load(self) -> None:
+        """Load the matrices from disk if they match, else encode (and persist) them. Thread-safe."""
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            fingerprint = self.fingerprint()
+            cached = self._read_cache(fingerprint)
+            if cached is not None:
+                self._questions, self._answers = cached
+                self.source = "disk"
+                return
+            known = self._previous.vectors() if self._previous is not None else {}
+            missing = list(dict.fromkeys(
+                text for text in self._questions_text + self._answers_text if text not in known
+            ))
+            if missing:
+                known = {**known, **dict(zip(missing, embeddings.encode(missing)))}
+            questions = self._stack([known[text] for text in self._questions_text])
+            answers = self._stack([known[text] for text in self._answers_text])
+            self._write_cache(fingerprint, questions, answers)
+            self._questions, self._answers = questions, answers
+            self.encoded = len(missing)
+            self.source = "incremental" if self._previous is not None and self._previous.loaded else "encoded"
+            self._previous = None
+
+    def vectors(self) -> Dict[str, np.ndarray]:
+        """Text -> embedding of every question and answer (empty if not loaded)."""
+        if not self.loaded:
+            return {}
+        return {
+            **dict(zip(self._answers_text, self._answers)),
+            **dict(zip(self._questions_text, self._questions)),
+        }
+
+    @staticmethod
+    def _stack(vectors: List[np.ndarray]) -> np.ndarray:
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(vectors).astype(np.float32)
+
+    async def load_async(self) -> None:
+        if not self.loaded:
+            await asyncio.to_thread(self.load)
+
+    def similarities(self, query_vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the query to each FAQ: the better of its question and answer."""
+        self.load()
+        return np.maximum(self._questions @ query_vector, self._answers @ query_vector)
+
+    def best_question(self, query_vector: np.ndarray) -> Tuple[str, float]:
+        """The FAQ whose question is closest to the query, with its cosine similarity."""
+        self.load()
+        scores = self._questions @ query_vector
+        best = int(np.argmax(scores))
+        return self.doc_ids[best], float(scores[best])
+
+    def search(self, query_vector: np.ndarray, limit: int = 10, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """Top-k (FAQ id, similarity) pairs, best first."""
+        scores = self.similarities(query_vector)
+        candidates = np.flatnonzero(scores >= min_score)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.doc_ids[i], float(scores[i])) for i in ranked]
+
+    # --- Persistence ---
+
+    def _read_cache(self, fingerprint: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with np.load(self.cache_path) as data:
+                if str(data["fingerprint"]) != fingerprint:
+                    return None
+                return data["questions"].astype(np.float32), data["answers"].astype(np.float32)
+        except Exception as e:
+            print(f"Ignoring unreadable FAQ embedding cache {self.cache_path}: {e}")
+            return None
+
+    def _write_cache(self, fingerprint: str, questions: np.ndarray, answers: np.ndarray) -> None:
+        if not self.cache_path:
+            return
+        # Write to a temporary file and rename, so readers never see a partial file
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, fingerprint=np.array(fingerprint), questions=questions, answers=answers)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"Error saving FAQ embedding cache {self.cache_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,95 @@
+"""
+FAQ Fast Path - Answer curated questions without the agent
+
+Before a message goes to the agent it is scored against the curated FAQs:
+- lexical: the top BM25 hits in the message's locale, scored by the overlap
+  (Jaccard) of the message's analyzed terms with the FAQ question's terms,
+  so only messages that are essentially the question itself qualify;
+- semantic: cosine similarity of the message embedding (the one the
+  semantic cache computed anyway) to the FAQ question embeddings, used only
+  once those are loaded so a request never waits for the model.
+
+Above the configured confidence the curated answer is returned directly.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.services import faq_service
+
+
+@dataclass
+class FaqMatch:
+    faq: Dict[str, Any]
+    confidence: float
+    method: str  # "lexical" or "semantic"
+    locale: str
+
+
+class FaqFastPath:
+    """Confidence-gated FAQ match for incoming chat messages."""
+
+    def __init__(
+        self,
+        min_lexical: float = 0.75,
+        min_similarity: float = 0.9,
+        candidates: int = 3,
+        enabled: bool = True,
+    ):
+        self.min_lexical = min_lexical
+        self.min_similarity = min_similarity
+        self.candidates = candidates
+        self.enabled = enabled
+
+        self.checked = 0
+        self.lexical_hits = 0
+        self.semantic_hits = 0
+
+    def match_lexical(self, message: str, locale: Optional[str] = None) -> Optional[FaqMatch]:
+        """Best FAQ by term overlap with its question, if above min_lexical."""
+        if not self.enabled or not message.strip():
+            return None
+        self.checked += 1
+        data = faq_service.get_locale(locale)
+        analyzer = data.index.analyzer
+        terms = set(analyzer.terms(message))
+        if not terms:
+            return None
+        best: Optional[FaqMatch] = None
+        for hit in data.index.search(message, limit=self.candidates):
+            faq = data.by_id[hit.doc_id]
+            question_terms = set(analyzer.terms(faq["question"]))
+            confidence = len(terms & question_terms) / len(terms | question_terms)
+            if best is None or confidence > best.confidence:
+                best = FaqMatch(faq, confidence, "lexical", data.locale)
+        if best is None or best.confidence < self.min_lexical:
+            return None
+        self.lexical_hits += 1
+        return best
+
+    def match_semantic(self, vector: Optional[np.ndarray], locale: Optional[str] = None) -> Optional[FaqMatch]:
+        """Best FAQ by question embedding similarity, if above min_similarity (None until embeddings are loaded)."""
+        if not self.enabled or vector is None:
+            return None
+        catalog = faq_service.get_catalog()
+        if not catalog.embeddings.loaded:
+            return None
+        faq_id, similarity = catalog.embeddings.best_question(vector)
+        data = catalog.locale(locale)
+        faq = data.by_id.get(faq_id)
+        if faq is None or similarity < self.min_similarity:
+            return None
+        self.semantic_hits += 1
+        return FaqMatch(faq, similarity, "semantic", data.locale)
+
+    def stats(self) -> Dict[str, float]:
+        answered = self.lexical_hits + self.semantic_hits
+        return {
+            "enabled": self.enabled,
+            "checked": self.checked,
+            "lexical_hits": self.lexical_hits,
+            "semantic_hits": self.semantic_hits,
+            "answer_ratio": answered / self.checked if self.checked else 0.0,
+        }
@@ -1,131 +1,446 @@
 """
-FAQ Service - Static FAQ data and search functionality
-TODO: Integrate with vector database for semantic similarity search
+FAQ Service - Localized FAQ data and search functionality
+
+FAQs for every locale (en, de, uk, fr, tr) are loaded from one data file
+(data/faqs.json, or a YAML file; shared content with the frontend). Per
+locale, the ID and category indexes, the BM25 search index and the
+serialized bodies of the static responses (with their ETags) are all built
+once at load time.
+
+The file can be reloaded without a restart (file watch or admin endpoint).
+A reload re-analyzes and re-embeds only the FAQs whose content changed and
+then swaps the whole catalog in with a single assignment; a request works
+on the catalog it started with, so it never sees a half-built index.
+
+Search modes: lexical (BM25 over an inverted index), semantic (cosine
+similarity to precomputed question/answer embeddings) and hybrid (a weighted
+fusion of both, so e.g. a Ukrainian or Turkish question still finds the
+matching FAQ while exact keyword matches keep their edge).
 """
 
-from typing import List, Dict, Any
-
-FAQ_CATEGORIES = [
-    "Testing & Diagnosis",
-    "Treatment & Medication",
-    "Living with HIV",
-    "Prevention & PrEP",
-    "Support Resources",
-]
-
-FAQ_DATA: List[Dict[str, Any]] = [
-    {
-        "id": "1",
-        "category": "Testing & Diagnosis",
-        "question": "What should I do if I think I've been exposed to HIV?",
-        "answer": "If you believe you may have been exposed to HIV, it's important to act quickly. Post-exposure prophylaxis (PEP) is a medication that can prevent HIV infection if started within 72 hours of exposure. Contact a healthcare provider, local clinic, or emergency room immediately. We understand this can be frightening, and you're not alone. Many people have navigated this situation, and there are resources available to help you.",
-        "tags": ["exposure", "PEP", "emergency", "testing"],
-    },
-    {
-        "id": "2",
-        "category": "Testing & Diagnosis",
-        "question": "How accurate are HIV tests?",
-        "answer": "Modern HIV tests are highly accurate. Fourth-generation tests can detect HIV as early as 2-4 weeks after exposure with over 99% accuracy. If you test negative after the window period (typically 3 months), the result is considered conclusive. However, if you've had recent exposure, it's important to test again after the window period. We're here to help you understand your results and next steps.",
-        "tags": ["testing", "accuracy", "window period", "diagnosis"],
-    },
-    {
-        "id": "3",
-        "category": "Testing & Diagnosis",
-        "question": "Where can I get tested confidentially?",
-        "answer": "You can get tested at many locations, including local health departments, community health centers, private doctors' offices, and some pharmacies. Many locations offer free or low-cost testing, and your results are confidential. Some places offer rapid testing with results in 20 minutes. We can help you find testing locations in your area that respect your privacy and provide supportive care.",
-        "tags": ["testing", "confidential", "locations", "privacy"],
-    },
-    {
-        "id": "4",
-        "category": "Prevention & PrEP",
-        "question": "What is PrEP and should I consider it?",
-        "answer": "PrEP (Pre-Exposure Prophylaxis) is a daily medication that can significantly reduce your risk of getting HIV through sex or injection drug use. When taken consistently, PrEP is up to 99% effective at preventing HIV. It's recommended for people who are at higher risk of HIV exposure. Talking with a healthcare provider can help you determine if PrEP is right for you. There's no judgment here—taking care of your health is important, and PrEP is a valid prevention option.",
-        "tags": ["PrEP", "prevention", "medication", "protection"],
-    },
-    {
-        "id": "5",
-        "category": "Treatment & Medication",
-        "question": "What are the side effects of HIV medication?",
-        "answer": "Modern HIV medications are generally well-tolerated, and many people experience few or no side effects. When side effects do occur, they're often mild and temporary, such as nausea, fatigue, or headaches during the first few weeks. Serious side effects are rare. Your healthcare provider will work with you to find a medication regimen that works for your body. If you're experiencing side effects, it's important to communicate with your care team—they can help adjust your treatment.",
-        "tags": ["medication", "side effects", "treatment", "health"],
-    },
-    {
-        "id": "6",
-        "category": "Treatment & Medication",
-        "question": "Is HIV treatment free or covered by insurance?",
-        "answer": "HIV treatment is often covered by insurance, including Medicaid and Medicare. There are also assistance programs available for those who are uninsured or underinsured, such as the Ryan White HIV/AIDS Program, pharmaceutical patient assistance programs, and state AIDS Drug Assistance Programs (ADAP). Many clinics offer sliding scale fees based on income. You don't have to navigate this alone—we can help connect you with resources to access the care you need.",
-        "tags": ["insurance", "cost", "financial assistance", "treatment"],
-    },
-    {
-        "id": "7",
-        "category": "Living with HIV",
-        "question": "Can I live a normal life with HIV?",
-        "answer": "Yes, absolutely. With modern treatment, people living with HIV can live long, healthy, and fulfilling lives. Effective HIV medication (antiretroviral therapy) can reduce the amount of virus in your body to undetectable levels, which means you can't transmit HIV to others and can maintain good health. Many people with HIV work, have relationships, start families, and pursue their dreams. Your diagnosis doesn't define you, and there's a whole community of people living full, vibrant lives with HIV.",
-        "tags": ["living with HIV", "normal life", "health", "hope"],
-    },
-    {
-        "id": "8",
-        "category": "Living with HIV",
-        "question": "How do I tell my partner about my status?",
-        "answer": "Disclosing your HIV status to a partner can feel overwhelming, and there's no one 'right' way to do it. Choose a private, comfortable setting when you both have time to talk. You might want to prepare what you'll say, and remember that you're sharing important health information—you're not asking for forgiveness. If you're on effective treatment and undetectable, you can share that you can't transmit HIV. Some people find it helpful to bring educational materials. Remember, you deserve respect and support. If you need help preparing for this conversation, we're here to support you.",
-        "tags": ["disclosure", "partner", "relationships", "communication"],
-    },
-    {
-        "id": "9",
-        "category": "Support Resources",
-        "question": "Where can I find emotional support?",
-        "answer": "You don't have to navigate this alone. There are many sources of support available, including support groups (both in-person and online), mental health counselors who specialize in HIV care, peer navigators, and crisis hotlines. Many organizations offer free or low-cost counseling services. Connecting with others who understand your experience can be incredibly valuable. We're here to help you find the support that feels right for you.",
-        "tags": ["support", "emotional", "counseling", "community"],
-    },
-    {
-        "id": "10",
-        "category": "Support Resources",
-        "question": "What legal protections exist for people living with HIV?",
-        "answer": "People living with HIV are protected by the Americans with Disabilities Act (ADA), which prohibits discrimination in employment, housing, and public accommodations. Your HIV status is confidential medical information, and healthcare providers are required to protect your privacy under HIPAA. Laws vary by state regarding disclosure requirements to sexual partners. If you're facing discrimination or have questions about your rights, legal aid organizations can provide guidance and support.",
-        "tags": ["legal", "rights", "discrimination", "privacy"],
-    },
-    {
-        "id": "11",
-        "category": "Prevention & PrEP",
-        "question": "How do I start PrEP?",
-        "answer": "Starting PrEP involves a few steps: first, you'll need to see a healthcare provider who can prescribe it. They'll test you for HIV (to confirm you're negative) and check your kidney function. If PrEP is right for you, they'll write a prescription. Many insurance plans cover PrEP, and there are assistance programs if cost is a concern. Once you start, you'll take one pill daily. Your provider will want to see you every few months for follow-up testing and to ensure everything is going well. Taking this step to protect your health is something to be proud of.",
-        "tags": ["PrEP", "starting", "prescription", "healthcare"],
-    },
-    {
-        "id": "12",
-        "category": "Living with HIV",
-        "question": "Can I have children if I'm living with HIV?",
-        "answer": "Yes, people living with HIV can have healthy children. With proper medical care and treatment, the risk of transmitting HIV to your baby during pregnancy or childbirth is less than 1%. This involves taking HIV medication during pregnancy, potentially adjusting your treatment plan, and sometimes using formula instead of breastfeeding (depending on your situation and location). Many people living with HIV have become parents and have healthy, HIV-negative children. If you're considering starting a family, talking with an HIV specialist who has experience with pregnancy care is important.",
-        "tags": ["pregnancy", "children", "family", "transmission"],
-    },
-]
-
-
-def search_faqs(query: str) -> List[Dict[str, Any]]:
+import asyncio
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.services import embeddings, suggestions, typeahead
+from app.services.faq_embeddings import FaqEmbeddingIndex
+from app.services.http_cache import BodyCache, CachedBody
+from app.services.text_index import Analyzer, BM25Index, SearchHit
+
+FAQ_DATA_PATH = os.environ.get(
+    "FAQ_DATA_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "faqs.json"),
+)
+
+DEFAULT_LOCALE = "en"
+
+# Field weights for ranking: a term in the question counts three times, in a tag twice
+QUESTION_WEIGHT = 3
+TAG_WEIGHT = 2
+ANSWER_WEIGHT = 1
+
+# Seconds between checks of the data file for changes (0 = no file watch)
+FAQ_RELOAD_INTERVAL = float(os.environ.get("FAQ_RELOAD_INTERVAL", "10"))
+
+REQUIRED_FIELDS = ("id", "category", "question", "answer", "tags")
+
+
+def _fields(faq: Dict[str, Any]) -> List[Tuple[str, int]]:
+    return [
+        (faq["question"], QUESTION_WEIGHT),
+        (" ".join(faq["tags"]), TAG_WEIGHT),
+        (faq["answer"], ANSWER_WEIGHT),
+    ]
+
+
+def build_index(faqs: List[Dict[str, Any]], language: str = DEFAULT_LOCALE) -> BM25Index:
+    """BM25 index over question, tags and answer of each FAQ."""
+    return BM25Index(((faq["id"], _fields(faq)) for faq in faqs), analyzer=Analyzer(language))
+
+
+@dataclass
+class LocaleFaqs:
+    """All FAQs of one locale with their lookup indexes and pre-serialized responses."""
+    locale: str
+    faqs: List[Dict[str, Any]]
+    by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    by_category: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)  # display name and key
+    categories: List[str] = field(default_factory=list)  # display names, in first-seen order
+    index: Optional[BM25Index] = None
+    term_freqs: Dict[str, Dict[str, int]] = field(default_factory=dict)  # FAQ id -> analyzed terms
+    responses: Dict[Tuple[str, ...], CachedBody] = field(default_factory=dict)
+    completions: Optional[typeahead.PrefixIndex] = None  # Autocomplete over questions, tags and suggestions
+    changed: int = 0  # FAQs (re-)analyzed when this was built
+
+    @classmethod
+    def build(cls, locale: str, faqs: List[Dict[str, Any]], previous: Optional["LocaleFaqs"] = None) -> "LocaleFaqs":
+        """Build the indexes; FAQs identical to those in `previous` reuse its analysis and serialized bodies."""
+        data = cls(locale=locale, faqs=faqs)
+        analyzer = previous.index.analyzer if previous is not None else Analyzer(locale)
+        for faq in faqs:
+            unchanged = previous is not None and previous.by_id.get(faq["id"]) == faq
+            if unchanged:
+                data.term_freqs[faq["id"]] = previous.term_freqs[faq["id"]]
+                data.responses[("faq", faq["id"])] = previous.responses[("faq", faq["id"])]
+            else:
+                data.term_freqs[faq["id"]] = analyzer.term_frequencies(_fields(faq))
+                data.responses[("faq", faq["id"])] = CachedBody.from_obj(faq)
+                data.changed += 1
+            data.by_id[faq["id"]] = faq
+            if faq["category"] not in data.by_category:
+                data.categories.append(faq["category"])
+            data.by_category.setdefault(faq["category"], []).append(faq)
+            if faq.get("categoryKey") and faq["categoryKey"] != faq["category"]:
+                data.by_category.setdefault(faq["categoryKey"], []).append(faq)
+        # Collection statistics (idf, average length) change with any edit, so the
+        # postings are always rebuilt; only the per-FAQ text analysis is reused
+        data.index = BM25Index.from_term_frequencies(
+            ((faq["id"], data.term_freqs[faq["id"]]) for faq in faqs), analyzer=analyzer
+        )
+
+        data.completions = typeahead.build_index(
+            locale, faqs, suggestions.phrases(locale) if locale in suggestions.RULES else ()
+        )
+
+        # OPTIMIZATION: Static responses are serialized (and hashed) once, not per request
+        category_keys = {faq["category"]: faq.get("categoryKey") for faq in faqs}
+        data.responses[("faqs",)] = CachedBody.from_obj({"locale": locale, "faqs": faqs})
+        data.responses[("categories",)] = CachedBody.from_obj({
+            "locale": locale,
+            "categories": [{"name": name, "key": category_keys[name]} for name in data.categories],
+        })
+        for category, items in data.by_category.items():
+            data.responses[("category", category)] = CachedBody.from_obj({
+                "locale": locale, "category": items[0]["category"], "faqs": items,
+            })
+        return data
+
+
+def _check_field_types(path: str, where: str, faq: Dict[str, Any]) -> None:
+    """Reject wrong field types here rather than as a TypeError deep in indexing."""
+    # bool is an int subclass, but True is no FAQ id
+    if isinstance(faq["id"], bool) or not isinstance(faq["id"], (str, int)):
+        raise ValueError(f"{path}: {where}.id must be a string or an integer")
+    for name in ("category", "question", "answer"):
+        if not isinstance(faq[name], str):
+            raise ValueError(f"{path}: {where}.{name} must be a string")
+    if not isinstance(faq["tags"], list) or not all(isinstance(tag, str) for tag in faq["tags"]):
+        raise ValueError(f"{path}: {where}.tags must be a list of strings")
+
+
+def read_data_file(path: str = FAQ_DATA_PATH) -> Tuple[Dict[str, List[Dict[str, Any]]], str]:
+    """Parse and validate the FAQ data file ({locale: [faq, ...]}); returns it with its content hash."""
+    with open(path, "rb") as f:
+        content = f.read()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"PyYAML is required to read {path}")
+        raw = yaml.safe_load(content)
+    else:
+        raw = json.loads(content)
+
+    if not isinstance(raw, dict) or not isinstance(raw.get(DEFAULT_LOCALE), list) or not raw[DEFAULT_LOCALE]:
+        raise ValueError(f"{path}: expected {{locale: [faq, ...]}} with a non-empty '{DEFAULT_LOCALE}' list")
+    for locale, faqs in raw.items():
+        if not isinstance(faqs, list) or not faqs:
+            raise ValueError(f"{path}: {locale!r} must be a non-empty list of FAQs")
+        seen = set()
+        for i, faq in enumerate(faqs):
+            if not isinstance(faq, dict):
+                raise ValueError(f"{path}: {locale}[{i}] must be an object, not {type(faq).__name__}")
+            missing = [name for name in REQUIRED_FIELDS if name not in faq]
+            if missing:
+                raise ValueError(f"{path}: {locale}[{i}] is missing {', '.join(missing)}")
+            _check_field_types(path, f"{locale}[{i}]", faq)
+            faq["id"] = str(faq["id"])
+            if faq["id"] in seen:
+                raise ValueError(f"{path}: duplicate FAQ id {faq['id']!r} in {locale}")
+            seen.add(faq["id"])
+    return raw, hashlib.sha256(content).hexdigest()
+
+
+# Semantic search: embeddings persisted here, next to the FAQ data (empty = recompute on every start)
+FAQ_EMBEDDINGS_PATH = os.environ.get(
+    "FAQ_EMBEDDINGS_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "faq_embeddings.npz"),
+)
+
+
+@dataclass
+class FaqCatalog:
+    """One immutable version of all FAQ data; replaced as a whole on reload."""
+    version: str  # Content hash of the data file
+    locales: Dict[str, LocaleFaqs]
+    # Embeddings of the English FAQs; the multilingual model maps questions in any
+    # language close to them, and hits are returned in the requested locale by id
+    embeddings: FaqEmbeddingIndex
+
+    @classmethod
+    def build(cls, raw: Dict[str, List[Dict[str, Any]]], version: str, previous: Optional["FaqCatalog"] = None) -> "FaqCatalog":
+        locales = {
+            locale: LocaleFaqs.build(locale, faqs, previous.locales.get(locale) if previous else None)
+            for locale, faqs in raw.items()
+        }
+        return cls(
+            version=version,
+            locales=locales,
+            embeddings=FaqEmbeddingIndex(
+                locales[DEFAULT_LOCALE].faqs,
+                cache_path=FAQ_EMBEDDINGS_PATH or None,
+                previous=previous.embeddings if previous else None,
+            ),
+        )
+
+    def locale(self, locale: Optional[str] = None) -> LocaleFaqs:
+        """FAQs of the locale (e.g. "de" or "de-AT"); unknown locales fall back to English."""
+        if locale:
+            locale = locale.lower().replace("_", "-")
+            found = self.locales.get(locale) or self.locales.get(locale.split("-")[0])
+            if found is not None:
+                return found
+        return self.locales[DEFAULT_LOCALE]
+
+
+_catalog = FaqCatalog.build(*read_data_file())
+
+LOCALES = list(_catalog.locales)
+
+# English FAQs: the canonical set (embeddings, chat fallback); rebound on reload
+FAQ_DATA: List[Dict[str, Any]] = _catalog.locales[DEFAULT_LOCALE].faqs
+FAQ_CATEGORIES = _catalog.locales[DEFAULT_LOCALE].categories
+
+
+def get_catalog() -> FaqCatalog:
+    """The current FAQ catalog; hold on to it for the duration of a request."""
+    return _catalog
+
+
+def get_locale(locale: Optional[str] = None) -> LocaleFaqs:
+    """FAQs of the locale (e.g. "de" or "de-AT") in the current catalog; unknown locales fall back to English."""
+    return _catalog.locale(locale)
+
+
+def search_hits(query: str, limit: Optional[int] = None, locale: Optional[str] = None) -> List[SearchHit]:
+    """Ranked BM25 hits (FAQ id, score, number of matched query terms)."""
+    return get_locale(locale).index.search(query, limit=limit)
+
+
+def query_terms(query: str, locale: Optional[str] = None) -> List[str]:
+    """Analyzed query terms that occur in the locale's FAQ index."""
+    return get_locale(locale).index.query_terms(query)
+
+
+def get_faq(faq_id: str, locale: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    return get_locale(locale).by_id.get(faq_id)
+
+
+def search_faqs(query: str, limit: Optional[int] = None, locale: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Search FAQs by query string: every FAQ sharing a (stemmed) term with the
+    query, best BM25 score first, each with its "score". An empty query
+    returns all FAQs.
+    """
+    data = get_locale(locale)
+    if not query or not query.strip():
+        return data.faqs if limit is None else data.faqs[:limit]
+    return [
+        {**data.by_id[hit.doc_id], "score": round(hit.score, 4)}
+        for hit in data.index.search(query, limit=limit)
+    ]
+
+
+# Semantic hits below this cosine similarity are not returned
+SEMANTIC_MIN_SCORE = float(os.environ.get("FAQ_SEMANTIC_MIN_SCORE", "0.3"))
+# Share of the semantic score in hybrid mode (the rest is max-normalized BM25)
+HYBRID_SEMANTIC_WEIGHT = float(os.environ.get("FAQ_HYBRID_SEMANTIC_WEIGHT", "0.6"))
+
+SEARCH_MODES = ("lexical", "semantic", "hybrid")
+
+
+def semantic_search_available() -> bool:
+    return embeddings.is_available()
+
+
+async def load_embeddings() -> str:
+    """Load or compute the FAQ embedding matrices (startup warm-up); returns where they came from."""
+    faq_embeddings = _catalog.embeddings
+    await faq_embeddings.load_async()
+    return faq_embeddings.source
+
+
+def _with_scores(data: LocaleFaqs, ranked: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+    return [
+        {**data.by_id[faq_id], "score": round(score, 4)}
+        for faq_id, score in ranked
+        if faq_id in data.by_id
+    ]
+
+
+async def semantic_search(query: str, limit: int = 10, locale: Optional[str] = None) -> List[Dict[str, Any]]:
+    """FAQs by embedding similarity to the query (works across languages)."""
+    catalog = _catalog
+    data = catalog.locale(locale)
+    if not query or not query.strip():
+        return data.faqs[:limit]
+    await catalog.embeddings.load_async()
+    vector = (await embeddings.encode_async([query]))[0]
+    return _with_scores(data, catalog.embeddings.search(vector, limit=limit, min_score=SEMANTIC_MIN_SCORE))
+
+
+async def hybrid_search(query: str, limit: int = 10, locale: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    Search FAQs by query string
-    TODO: Replace with vector database similarity search for better results
+    Weighted fusion of semantic similarity and max-normalized BM25 scores.
+    Returns FAQs that match lexically or are semantically close enough.
     """
+    catalog = _catalog
+    data = catalog.locale(locale)
+    faq_embeddings = catalog.embeddings
     if not query or not query.strip():
-        return FAQ_DATA
+        return data.faqs[:limit]
+    await faq_embeddings.load_async()
+    vector = (await embeddings.encode_async([query]))[0]
+    semantic = np.clip(faq_embeddings.similarities(vector), 0.0, 1.0)
+
+    # Lexical scores come from the locale's index; align them to the embedding rows by FAQ id
+    locale_scores, locale_matched = data.index.scores(query)
+    position = {faq_id: i for i, faq_id in enumerate(data.index.doc_ids)}
+    rows = np.array([position.get(faq_id, -1) for faq_id in faq_embeddings.doc_ids])
+    present = rows >= 0
+    lexical = np.where(present, locale_scores[rows], 0.0)
+    matched = np.where(present, locale_matched[rows], 0)
+    top_lexical = float(lexical.max()) if len(lexical) else 0.0
+    if top_lexical > 0:
+        lexical = lexical / top_lexical
+    fused = HYBRID_SEMANTIC_WEIGHT * semantic + (1 - HYBRID_SEMANTIC_WEIGHT) * lexical
 
-    lower_query = query.lower()
-    results = []
-    for faq in FAQ_DATA:
-        question_match = lower_query in faq["question"].lower()
-        answer_match = lower_query in faq["answer"].lower()
-        tag_match = any(lower_query in tag.lower() for tag in faq["tags"])
-        if question_match or answer_match or tag_match:
-            results.append(faq)
-    return results
+    candidates = np.flatnonzero(present & ((matched > 0) | (semantic >= SEMANTIC_MIN_SCORE)))
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-fused[candidates], limit - 1)[:limit]]
+    ranked = candidates[np.argsort(-fused[candidates], kind="stable")]
+    return _with_scores(data, [(faq_embeddings.doc_ids[i], float(fused[i])) for i in ranked])
 
 
-def get_faqs_by_category(category: str) -> List[Dict[str, Any]]:
-    """Get FAQs by category"""
-    return [faq for faq in FAQ_DATA if faq["category"] == category]
+def get_faqs_by_category(category: str, locale: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get FAQs by category (display name or category key)"""
+    return get_locale(locale).by_category.get(category, [])
 
 
-def get_categories() -> List[str]:
+def get_categories(locale: Optional[str] = None) -> List[str]:
     """Get all unique categories"""
-    return list(set(faq["category"] for faq in FAQ_DATA))
+    return list(get_locale(locale).categories)
+
+
+def suggest(prefix: str, limit: int = 8, locale: Optional[str] = None) -> List[Dict[str, str]]:
+    """Autocomplete: questions, tags and suggestion phrases with a word starting with prefix, most popular first."""
+    return [completion.to_dict() for completion in get_locale(locale).completions.suggest(prefix, limit=limit)]
+
+
+def record_use(text: str) -> None:
+    """Count a chat message or search that is exactly a completion (e.g. a clicked suggestion)."""
+    for locale, data in _catalog.locales.items():
+        if data.completions.contains(text):
+            typeahead.popularity.record(locale, text)
+
+
+def record_view(faq_id: str, locale: Optional[str] = None) -> None:
+    """Count a view of an FAQ towards its question's autocomplete popularity."""
+    data = get_locale(locale)
+    faq = data.by_id.get(faq_id)
+    if faq is not None:
+        typeahead.popularity.record(data.locale, faq["question"])
+
+
+# --- Pre-serialized HTTP responses ---
+
+# Serialized search responses for repeated queries
+search_response_cache: BodyCache = BodyCache(max_entries=int(os.environ.get("FAQ_SEARCH_CACHE_SIZE", "512")))
+
+
+def cached_response(locale: Optional[str], *key: str) -> Optional[CachedBody]:
+    """Serialized body + ETag of a static FAQ response: ("faqs",), ("categories",), ("category", c), ("faq", id)."""
+    return get_locale(locale).responses.get(key)
+
+
+# --- Reload ---
+
+_reload_lock = asyncio.Lock()
+_watch_task: Optional[asyncio.Task] = None
+_watched_mtime: Optional[float] = None
+
+
+def _build_reloaded(path: str, previous: FaqCatalog, force: bool) -> Optional[FaqCatalog]:
+    raw, version = read_data_file(path)
+    if version == previous.version and not force:
+        return None
+    catalog = FaqCatalog.build(raw, version, previous)
+    if previous.embeddings.loaded:
+        # Re-embed the changed FAQs now, so the swap never leaves searches waiting for the model
+        catalog.embeddings.load()
+    return catalog
+
+
+async def reload(path: str = FAQ_DATA_PATH, force: bool = False) -> Dict[str, Any]:
+    """
+    Re-read the data file and swap in the new catalog if its content changed.
+    Raises ValueError (old catalog stays active) if the file is invalid.
+    """
+    global _catalog, FAQ_DATA, FAQ_CATEGORIES
+    async with _reload_lock:
+        previous = _catalog
+        # Parsing, analysis and re-embedding run off the event loop
+        catalog = await asyncio.to_thread(_build_reloaded, path, previous, force)
+        if catalog is None:
+            return {"reloaded": False, "version": previous.version}
+        _catalog = catalog
+        FAQ_DATA = catalog.locales[DEFAULT_LOCALE].faqs
+        FAQ_CATEGORIES = catalog.locales[DEFAULT_LOCALE].categories
+        search_response_cache.clear()
+    report = {
+        "reloaded": True,
+        "version": catalog.version,
+        "changed": {locale: data.changed for locale, data in catalog.locales.items()},
+        "faqs": {locale: len(data.faqs) for locale, data in catalog.locales.items()},
+        "embedded": catalog.embeddings.encoded if catalog.embeddings.loaded else None,
+    }
+    print(f"Reloaded FAQs from {path}: {report['changed']}")
+    return report
+
+
+async def _watch_loop(path: str, interval: float) -> None:
+    global _watched_mtime
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            mtime = os.stat(path).st_mtime
+            if mtime == _watched_mtime:
+                continue
+            _watched_mtime = mtime
+            await reload(path)
+        except Exception as e:
+            print(f"Error reloading FAQs from {path}: {e}")
+
+
+def start_watching(path: str = FAQ_DATA_PATH, interval: float = FAQ_RELOAD_INTERVAL) -> None:
+    """Poll the data file's mtime and reload on change (every worker picks up edits on its own)."""
+    global _watch_task, _watched_mtime
+    if interval <= 0 or _watch_task is not None:
+        return
+    try:
+        _watched_mtime = os.stat(path).st_mtime
+    except OSError:
+        _watched_mtime = None
+    _watch_task = asyncio.create_task(_watch_loop(path, interval))
+
 
+def stop_watching() -> None:
+    global _watch_task
+    if _watch_task is not None:
+        _watch_task.cancel()
+        _watch_task = None
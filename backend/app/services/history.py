@@ -0,0 +1,189 @@
+"""
+History - Token-budgeted conversation history for agent prompts
+
+Recent turns are packed newest-first into a token budget (counted with the
+multilingual embedding model's tokenizer). Turns that no longer fit are
+compacted into a rolling extractive summary: one short line per turn, cached
+per session so each turn is summarized only once, and trimmed oldest-first to
+its own budget. Prompt size therefore stays bounded however long the
+conversation gets.
+"""
+
+import asyncio
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services import embeddings
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+_TurnKey = Tuple[str, str]
+
+
+@dataclass
+class _RollingSummary:
+    # Summary line per summarized turn, oldest first
+    lines: "OrderedDict[_TurnKey, str]" = field(default_factory=OrderedDict)
+    # Newest turn already summarized (its line may since have been trimmed)
+    last_key: Optional[_TurnKey] = None
+
+
+class HistoryCompactor:
+    """Packs history into a token budget, summarizing what doesn't fit."""
+
+    def __init__(
+        self,
+        token_budget: int = 1024,
+        summary_token_budget: int = 256,
+        excerpt_chars: int = 160,
+        max_sessions: int = 1000,
+        token_cache_size: int = 8192,
+        count_tokens: Callable[[str], int] = embeddings.count_tokens,
+    ):
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+        self.excerpt_chars = excerpt_chars
+        self.max_sessions = max_sessions
+        self.token_cache_size = token_cache_size
+        self._count_tokens = count_tokens
+
+        self._summaries: "OrderedDict[str, _RollingSummary]" = OrderedDict()
+        self._token_counts: "OrderedDict[_TurnKey, int]" = OrderedDict()
+
+        # compact() runs in worker threads; the caches are shared between them
+        self._lock = threading.Lock()
+
+        self.compactions = 0
+        self.summarized_turns = 0
+
+    async def compact_async(
+        self,
+        session_id: Optional[str],
+        history: Optional[List[Dict[str, Any]]],
+    ) -> List[Dict[str, str]]:
+        """compact() off the event loop (tokenizing and the first tokenizer load can take a while)."""
+        return await asyncio.to_thread(self.compact, session_id, history)
+
+    def compact(
+        self,
+        session_id: Optional[str],
+        history: Optional[List[Dict[str, Any]]],
+    ) -> List[Dict[str, str]]:
+        """
+        Return the messages to send for this history: an optional summary
+        message followed by the most recent turns that fit the budget.
+        """
+        with self._lock:
+            return self._compact(session_id, history)
+
+    def _compact(
+        self,
+        session_id: Optional[str],
+        history: Optional[List[Dict[str, Any]]],
+    ) -> List[Dict[str, str]]:
+        turns = [
+            (msg.get("role"), msg.get("content"))
+            for msg in history or []
+            if msg.get("role") in ("user", "assistant") and msg.get("content")
+        ]
+
+        recent_budget = self.token_budget - self.summary_token_budget
+        recent: List[Dict[str, str]] = []
+        used = 0
+        split = len(turns)
+        for role, content in reversed(turns):
+            tokens = self._tokens(role, content)
+            if used + tokens > recent_budget:
+                if not recent:
+                    # Even the latest turn is too long: keep its beginning
+                    content = content[: max(1, len(content) * recent_budget // tokens)]
+                    recent.append({"role": role, "content": content})
+                    split -= 1
+                break
+            recent.append({"role": role, "content": content})
+            used += tokens
+            split -= 1
+        recent.reverse()
+
+        older = turns[:split]
+        if older:
+            self.compactions += 1
+        summary = self._update_summary(session_id, older, recent)
+        if summary:
+            return [{"role": "assistant", "content": summary}] + recent
+        return recent
+
+    def invalidate(self, session_id: str) -> None:
+        self._summaries.pop(session_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._summaries),
+            "compactions": self.compactions,
+            "summarized_turns": self.summarized_turns,
+        }
+
+    def _tokens(self, role: str, content: str) -> int:
+        key = (role, content)
+        count = self._token_counts.get(key)
+        if count is None:
+            count = self._count_tokens(content)
+            self._token_counts[key] = count
+            if len(self._token_counts) > self.token_cache_size:
+                self._token_counts.popitem(last=False)
+        else:
+            self._token_counts.move_to_end(key)
+        return count
+
+    def _update_summary(
+        self,
+        session_id: Optional[str],
+        older: List[_TurnKey],
+        recent: List[Dict[str, str]],
+    ) -> str:
+        if session_id is None:
+            summary = _RollingSummary()
+        else:
+            summary = self._summaries.get(session_id)
+            if summary is None:
+                if not older:
+                    return ""
+                summary = _RollingSummary()
+            self._summaries[session_id] = summary
+            self._summaries.move_to_end(session_id)
+            while len(self._summaries) > self.max_sessions:
+                self._summaries.popitem(last=False)
+
+        # Only turns that newly fell out of the window are summarized;
+        # lines for turns that already left the session history are kept
+        start = 0
+        if summary.last_key in older:
+            start = len(older) - older[::-1].index(summary.last_key)
+        for key in older[start:]:
+            if key not in summary.lines:
+                summary.lines[key] = self._summarize_turn(*key)
+                self.summarized_turns += 1
+        if older:
+            summary.last_key = older[-1]
+
+        while summary.lines and self._summary_tokens(summary) > self.summary_token_budget:
+            summary.lines.popitem(last=False)
+
+        in_window = {(msg["role"], msg["content"]) for msg in recent}
+        lines = [line for key, line in summary.lines.items() if key not in in_window]
+        if not lines:
+            return ""
+        return "Summary of the earlier conversation:\n" + "\n".join(lines)
+
+    def _summary_tokens(self, summary: _RollingSummary) -> int:
+        return sum(self._tokens("summary", line) for line in summary.lines.values())
+
+    def _summarize_turn(self, role: str, content: str) -> str:
+        first_sentence = _SENTENCE_END.split(" ".join(content.split()), maxsplit=1)[0]
+        if len(first_sentence) > self.excerpt_chars:
+            first_sentence = first_sentence[: self.excerpt_chars].rsplit(" ", 1)[0] + "..."
+        speaker = "User" if role == "user" else "Assistant"
+        return f"- {speaker}: {first_sentence}"
@@ -0,0 +1,75 @@
+"""
+HTTP Cache - Pre-serialized JSON bodies with strong ETags
+
+Static responses are serialized once, hashed once, and then served as raw
+bytes; a client that already holds the current version gets a 304 without a
+body.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Generic, Hashable, Optional, TypeVar
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str  # Strong validator, quoted as sent in the ETag header
+
+    @classmethod
+    def from_obj(cls, obj: Any) -> "CachedBody":
+        body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body=body, etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if the If-None-Match header lists this version (weak comparison, as RFC 9110 requires)."""
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*" or candidate.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+
+K = TypeVar("K", bound=Hashable)
+
+
+class BodyCache(Generic[K]):
+    """Small LRU of serialized bodies for dynamic but repetitive responses (e.g. common searches)."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[K, CachedBody]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> Optional[CachedBody]:
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return cached
+
+    def put(self, key: K, cached: CachedBody) -> CachedBody:
+        self._entries[key] = cached
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return cached
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
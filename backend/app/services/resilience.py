@@ -0,0 +1,198 @@
+"""
+Resilience - Hedged requests and a circuit breaker for the Azure agent backend
+
+- Hedger: if a call hasn't finished after a p95-based delay, start a second
+  one and take whichever succeeds first (the loser is cancelled).
+- CircuitBreaker: when recent error/timeout rates pass a threshold, stop
+  calling the backend for a cool-down period so requests fail fast instead of
+  waiting for timeouts; then let a single probe through to test recovery.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Tuple
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the backend while the circuit is open."""
+
+
+class Hedger:
+    """Tail-latency hedging with a delay derived from observed latencies."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        quantile: float = 0.95,
+        min_delay: float = 2.0,
+        min_samples: int = 20,
+        history: int = 500,
+    ):
+        self.enabled = enabled
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=history)
+
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a successful call."""
+        self._latencies.append(latency)
+
+    def delay(self) -> float:
+        """Time to wait before hedging: the configured latency percentile (never below min_delay)."""
+        if len(self._latencies) < self.min_samples:
+            return self.min_delay
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.quantile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[Any]],
+        backup: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Run primary(); after delay() also run backup(). The first success wins."""
+        self.calls += 1
+        if not self.enabled:
+            return await primary()
+
+        first = asyncio.create_task(primary())
+        second = None
+        try:
+            done, _ = await asyncio.wait({first}, timeout=self.delay())
+            if done:
+                return first.result()
+
+            self.hedges += 1
+            second = asyncio.create_task(backup())
+            pending = {first, second}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+
+            # Both attempts failed: surface the primary's error
+            return first.result()
+        finally:
+            for task in (first, second):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay_seconds": self.delay(),
+        }
+
+
+class CircuitBreaker:
+    """Closed -> open on high failure rate -> half-open probe -> closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: float = 0.5,
+        min_calls: int = 10,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+
+        self.state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        # (timestamp, outcome) with outcome in {"success", "error", "timeout"}
+        self._outcomes: Deque[Tuple[float, str]] = deque()
+
+        self.successes = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.rejections = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Return True if a call may go to the backend."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejections += 1
+                return False
+            self.state = self.HALF_OPEN
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejections += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.successes += 1
+        self._record("success")
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+            self._outcomes.clear()
+
+    def record_failure(self, timeout: bool = False) -> None:
+        if timeout:
+            self.timeouts += 1
+        else:
+            self.errors += 1
+        self._record("timeout" if timeout else "error")
+
+        if self.state == self.HALF_OPEN:
+            self._open()
+        elif self.state == self.CLOSED and self._failure_rate() >= self.failure_threshold:
+            self._open()
+
+    def record_abandoned(self) -> None:
+        """The call was cancelled by its caller; free the half-open probe slot."""
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": self._failure_rate(),
+            "successes": self.successes,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "rejections": self.rejections,
+            "times_opened": self.times_opened,
+        }
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.times_opened += 1
+        print(f"Circuit breaker opened (failure rate {self._failure_rate():.0%})")
+
+    def _record(self, outcome: str) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, outcome))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _failure_rate(self) -> float:
+        if len(self._outcomes) < self.min_calls:
+            return 0.0
+        failures = sum(1 for _, outcome in self._outcomes if outcome != "success")
+        return failures / len(self._outcomes)
@@ -0,0 +1,244 @@
+"""
+Run Waiter - Strategies for waiting on Azure agent run completion
+
+Three strategies, selected with AGENT_RUN_WAITER:
+- "stream":   event-driven; the run is started as an event stream and completes
+              as soon as the terminal run event arrives (no polling at all).
+              Falls back to "adaptive" for runs that were not started as a stream.
+- "adaptive": polling whose first delay and backoff are tuned from observed
+              run durations.
+- "fixed":    the original schedule (0.05s for 2 seconds, then 0.2s).
+
+Each agent call also records a RunTimings breakdown so chat latency can be
+attributed to create, queue wait, run time, message fetch and delete.
+"""
+
+import abc
+import asyncio
+import statistics
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from azure.ai.agents.models import ThreadRun
+
+ACTIVE_STATUSES = ["queued", "in_progress", "requires_action"]
+
+
+class AgentRunTimeout(Exception):
+    """The run did not finish within the waiter's timeout."""
+
+
+@dataclass
+class RunTimings:
+    """Per-call stage timings in seconds (None = stage not executed)."""
+    strategy: str = ""
+    create: Optional[float] = None
+    queue_wait: Optional[float] = None
+    run: Optional[float] = None
+    fetch: Optional[float] = None
+    delete: Optional[float] = None
+    total: Optional[float] = None
+    polls: int = 0
+    started_at: float = field(default_factory=time.perf_counter, repr=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("started_at")
+        return data
+
+
+class RunTimingLog:
+    """Ring buffer of recent RunTimings with per-stage summaries."""
+
+    STAGES = ["create", "queue_wait", "run", "fetch", "delete", "total"]
+
+    def __init__(self, maxlen: int = 500):
+        self._entries: Deque[RunTimings] = deque(maxlen=maxlen)
+
+    def record(self, timings: RunTimings) -> None:
+        timings.total = time.perf_counter() - timings.started_at
+        self._entries.append(timings)
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return [t.as_dict() for t in list(self._entries)[-limit:]]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for stage in self.STAGES:
+            values = sorted(v for v in (getattr(t, stage) for t in self._entries) if v is not None)
+            if values:
+                summary[stage] = {
+                    "count": len(values),
+                    "mean": statistics.fmean(values),
+                    "p50": _percentile(values, 0.50),
+                    "p95": _percentile(values, 0.95),
+                }
+        return summary
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+class RunWaiter(abc.ABC):
+    """Polls a run until it leaves the active statuses; subclasses choose the poll schedule."""
+
+    name = "base"
+    streams_runs = False
+
+    def __init__(self, timeout: float = 120.0):
+        self.timeout = timeout
+
+    async def wait(self, agents, run: ThreadRun, timings: RunTimings) -> ThreadRun:
+        timings.strategy = self.name
+        started = time.perf_counter()
+        in_progress_at = started if run.status != "queued" else None
+        poll_count = 0
+
+        while run.status in ACTIVE_STATUSES:
+            if time.perf_counter() - started > self.timeout:
+                raise AgentRunTimeout(f"Agent run timeout after {self.timeout:.0f} seconds")
+
+            await asyncio.sleep(self.next_delay(poll_count))
+            run = await agents.runs.get(thread_id=run.thread_id, run_id=run.id)
+            poll_count += 1
+
+            if in_progress_at is None and run.status != "queued":
+                in_progress_at = time.perf_counter()
+
+        finished = time.perf_counter()
+        timings.polls = poll_count
+        timings.queue_wait = (in_progress_at or finished) - started
+        timings.run = finished - (in_progress_at or finished)
+        self.observe(finished - started)
+        return run
+
+    @abc.abstractmethod
+    def next_delay(self, poll_count: int) -> float:
+        """Seconds to sleep before poll number poll_count (0-based)."""
+
+    def observe(self, duration: float) -> None:
+        """Feed back how long a run took from creation to completion."""
+
+
+class FixedScheduleWaiter(RunWaiter):
+    """The original schedule: 20 checks per second for 2 seconds, then 5 per second."""
+
+    name = "fixed"
+
+    def next_delay(self, poll_count: int) -> float:
+        return 0.05 if poll_count < 40 else 0.2
+
+
+class AdaptiveBackoffWaiter(RunWaiter):
+    """
+    Sleeps through the part of the run that is almost always still busy
+    (a low percentile of recent durations), then polls quickly and backs off
+    geometrically, so short runs are caught promptly and long runs cost few calls.
+    """
+
+    name = "adaptive"
+
+    def __init__(
+        self,
+        timeout: float = 120.0,
+        min_interval: float = 0.05,
+        max_interval: float = 1.0,
+        backoff: float = 1.5,
+        history: int = 200,
+    ):
+        super().__init__(timeout)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._durations: Deque[float] = deque(maxlen=history)
+
+    def next_delay(self, poll_count: int) -> float:
+        if poll_count == 0:
+            return self.first_delay()
+        return min(self.max_interval, self.min_interval * self.backoff ** (poll_count - 1))
+
+    def first_delay(self) -> float:
+        if len(self._durations) < 5:
+            return self.min_interval
+        # Most runs are still busy at 80% of the 10th-percentile duration
+        expected = _percentile(sorted(self._durations), 0.10) * 0.8
+        return min(max(self.min_interval, expected), self.timeout / 4)
+
+    def observe(self, duration: float) -> None:
+        self._durations.append(duration)
+
+
+class StreamRunWaiter(RunWaiter):
+    """
+    Event-driven completion: consumes the run's event stream and returns on
+    the terminal run event. Runs created without a stream are handed to the
+    polling fallback.
+    """
+
+    name = "stream"
+    streams_runs = True
+
+    def __init__(self, timeout: float = 120.0, fallback: Optional[RunWaiter] = None):
+        super().__init__(timeout)
+        self.fallback = fallback or AdaptiveBackoffWaiter(timeout)
+
+    async def wait(self, agents, run: ThreadRun, timings: RunTimings) -> ThreadRun:
+        return await self.fallback.wait(agents, run, timings)
+
+    def next_delay(self, poll_count: int) -> float:
+        return self.fallback.next_delay(poll_count)
+
+    async def wait_stream(
+        self,
+        stream,
+        timings: RunTimings,
+        on_run: Optional[Callable[[ThreadRun], None]] = None,
+    ) -> ThreadRun:
+        """Consume the stream until the run finishes; on_run sees every run event (e.g. to learn the run id)."""
+        try:
+            return await asyncio.wait_for(self._consume(stream, timings, on_run), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise AgentRunTimeout(f"Agent run timeout after {self.timeout:.0f} seconds")
+
+    async def _consume(self, stream, timings: RunTimings, on_run) -> ThreadRun:
+        timings.strategy = self.name
+        started = time.perf_counter()
+        in_progress_at = None
+        run = None
+
+        async with stream as event_handler:
+            async for _, event_data, _ in event_handler:
+                if not isinstance(event_data, ThreadRun):
+                    continue
+                run = event_data
+                if on_run:
+                    on_run(run)
+                if in_progress_at is None and run.status != "queued":
+                    in_progress_at = time.perf_counter()
+                if run.status not in ACTIVE_STATUSES:
+                    break
+
+        if run is None:
+            raise Exception("Agent stream ended without a run event")
+
+        finished = time.perf_counter()
+        timings.queue_wait = (in_progress_at or finished) - started
+        timings.run = finished - (in_progress_at or finished)
+        self.fallback.observe(finished - started)
+        return run
+
+
+def create_run_waiter(strategy: str, timeout: float = 120.0) -> RunWaiter:
+    """Build the configured waiter; unknown strategies get "adaptive"."""
+    strategy = strategy.lower()
+    if strategy == "fixed":
+        return FixedScheduleWaiter(timeout)
+    if strategy == "stream":
+        return StreamRunWaiter(timeout)
+    if strategy != "adaptive":
+        print(f"Unknown AGENT_RUN_WAITER {strategy!r}; using adaptive polling")
+    return AdaptiveBackoffWaiter(timeout)
@@ -0,0 +1,149 @@
+"""
+Semantic Cache - Embedding-keyed answer cache in front of the Azure agent
+
+Paraphrased single-turn questions ("What is PrEP?", "what's prep",
+"Was ist PrEP?") map to nearby embeddings, so a stored answer can be
+returned when a new question is within a cosine-similarity threshold.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services import embeddings
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    response: str
+    suggestions: List[str]
+    created_at: float
+    similarity: float = 1.0
+
+
+@dataclass
+class CacheLookup:
+    """Result of a lookup; the query vector is kept so a miss can be stored without re-encoding."""
+    answer: Optional[CachedAnswer]
+    vector: Optional[np.ndarray]
+
+
+class SemanticCache:
+    """Fixed-capacity embedding cache with LRU and TTL eviction."""
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 2048,
+        ttl_seconds: float = 3600.0,
+        enabled: bool = True,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and max_entries > 0 and embeddings.is_available()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+        # Row i of _vectors belongs to _answers[i]; free rows are reused on insert
+        self._vectors: Optional[np.ndarray] = None
+        self._answers: List[Optional[CachedAnswer]] = []
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        self._free: List[int] = []
+
+    async def lookup(self, question: str) -> CacheLookup:
+        """Return the closest cached answer above the threshold, if any."""
+        if not self.enabled:
+            return CacheLookup(answer=None, vector=None)
+
+        vector = (await embeddings.encode_async([question]))[0]
+        answer = self._nearest(vector)
+        if answer is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return CacheLookup(answer=answer, vector=vector)
+
+    def store(self, lookup: CacheLookup, question: str, response: str, suggestions: List[str]) -> None:
+        """Store an answer under the query vector computed by lookup()."""
+        if not self.enabled or lookup.vector is None:
+            return
+
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, lookup.vector.shape[0]), dtype=np.float32)
+            self._answers = [None] * self.max_entries
+            self._free = list(range(self.max_entries - 1, -1, -1))
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot, _ = self._lru.popitem(last=False)
+
+        self._vectors[slot] = lookup.vector
+        self._answers[slot] = CachedAnswer(
+            question=question,
+            response=response,
+            suggestions=list(suggestions),
+            created_at=time.monotonic(),
+        )
+        self._lru[slot] = None
+
+    def record_bypass(self) -> None:
+        """Count a request that skipped the cache (e.g. multi-turn conversation)."""
+        self.bypasses += 1
+
+    def clear(self) -> None:
+        for slot in list(self._lru):
+            self._release(slot)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _nearest(self, vector: np.ndarray) -> Optional[CachedAnswer]:
+        if not self._lru:
+            return None
+
+        # Single vectorized dot product over all rows; empty rows are zero vectors
+        similarities = self._vectors @ vector
+        while True:
+            slot = int(np.argmax(similarities))
+            similarity = float(similarities[slot])
+            if similarity < self.threshold:
+                return None
+
+            answer = self._answers[slot]
+            if answer is None:
+                return None
+            if time.monotonic() - answer.created_at > self.ttl_seconds:
+                self._release(slot)
+                similarities[slot] = -1.0
+                continue
+
+            self._lru.move_to_end(slot)
+            return CachedAnswer(
+                question=answer.question,
+                response=answer.response,
+                suggestions=list(answer.suggestions),
+                created_at=answer.created_at,
+                similarity=similarity,
+            )
+
+    def _release(self, slot: int) -> None:
+        self._lru.pop(slot, None)
+        self._answers[slot] = None
+        self._vectors[slot] = 0.0
+        self._free.append(slot)
@@ -0,0 +1,306 @@
+"""
+Session Store - Server-side chat sessions with compact turn history
+
+Each session keeps a ring buffer of its most recent turns, so clients only
+send sessionId + message. Sessions live in a local SQLite file (shared by all
+uvicorn workers on the host) with an in-process LRU in front of it. A
+revision per session (start time + version counter) lets a worker detect
+turns appended by another worker with a single indexed lookup; the chat
+pipeline also uses it to tell whether its cached agent thread has seen every
+turn. Idle sessions expire and are cleaned up in the background.
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Sessions are runtime state: keep them out of the source tree by default
+# (XDG state directory, e.g. ~/.local/state/hiv-care-assistant/sessions.sqlite3)
+DEFAULT_DB_PATH = os.path.join(
+    os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state"),
+    "hiv-care-assistant",
+    "sessions.sqlite3",
+)
+
+
+@dataclass(frozen=True)
+class SessionRevision:
+    """
+    A session's state: when it (re)started and how many appends it has had
+    since. Equal revisions mean the same turns, in any worker.
+    """
+    created_at: float
+    version: int
+
+    def next(self) -> "SessionRevision":
+        """The revision after one more append."""
+        return SessionRevision(self.created_at, self.version + 1)
+
+
+@dataclass
+class SessionHistory:
+    turns: List[Dict[str, str]]
+    revision: SessionRevision
+
+
+@dataclass
+class _CachedSession:
+    revision: SessionRevision
+    turns: Deque[Dict[str, str]] = field(default_factory=deque)
+
+
+class SessionStore:
+    """SQLite-backed session store with an in-process LRU cache."""
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        max_turns: int = 20,
+        ttl_seconds: float = 7200.0,
+        cache_size: int = 1000,
+        cleanup_interval: float = 300.0,
+    ):
+        self.db_path = db_path
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        self.cleanup_interval = cleanup_interval
+
+        self._cache: "OrderedDict[str, _CachedSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        """Open the database and start the background cleanup of expired sessions."""
+        self._connect()
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def stop(self) -> None:
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Public async API (SQLite work runs off the event loop) ---
+
+    async def create_session(self, metadata: Optional[Dict[str, Any]] = None) -> str:
+        return await asyncio.to_thread(self._create_session, metadata)
+
+    async def get_history(self, session_id: str) -> Optional[List[Dict[str, str]]]:
+        """Recent turns (oldest first), or None if the session is unknown or expired."""
+        session = await self.get_session(session_id)
+        return session.turns if session is not None else None
+
+    async def get_session(self, session_id: str) -> Optional[SessionHistory]:
+        """Recent turns with the session's revision, or None if the session is unknown or expired."""
+        return await asyncio.to_thread(self._get_session, session_id)
+
+    async def append_turns(self, session_id: str, turns: List[Tuple[str, str]]) -> None:
+        """Append (role, content) turns, creating the session if needed."""
+        await asyncio.to_thread(self._append_turns, session_id, turns)
+
+    async def delete_session(self, session_id: str) -> bool:
+        return await asyncio.to_thread(self._delete_session, session_id)
+
+    def stats(self) -> Dict[str, int]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "cached_sessions": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_ratio": self.cache_hits / lookups if lookups else 0.0,
+        }
+
+    # --- Synchronous implementation ---
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    directory = os.path.dirname(self.db_path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+                    # WAL lets several worker processes read while one writes
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.executescript(
+                        """
+                        CREATE TABLE IF NOT EXISTS sessions (
+                            session_id TEXT PRIMARY KEY,
+                            created_at REAL NOT NULL,
+                            last_seen REAL NOT NULL,
+                            version INTEGER NOT NULL DEFAULT 0,
+                            metadata TEXT
+                        );
+                        CREATE TABLE IF NOT EXISTS turns (
+                            session_id TEXT NOT NULL,
+                            seq INTEGER NOT NULL,
+                            role TEXT NOT NULL,
+                            content TEXT NOT NULL,
+                            PRIMARY KEY (session_id, seq)
+                        );
+                        CREATE INDEX IF NOT EXISTS idx_sessions_last_seen ON sessions(last_seen);
+                        """
+                    )
+                    conn.commit()
+                    self._conn = conn
+        return self._conn
+
+    def _create_session(self, metadata: Optional[Dict[str, Any]]) -> str:
+        session_id = f"session_{int(time.time() * 1000)}_{secrets.token_hex(6)}"
+        now = time.time()
+        conn = self._connect()
+        with self._lock:
+            conn.execute(
+                "INSERT INTO sessions (session_id, created_at, last_seen, version, metadata) VALUES (?, ?, ?, 0, ?)",
+                (session_id, now, now, json.dumps(metadata) if metadata else None),
+            )
+            conn.commit()
+            self._cache_put(session_id, _CachedSession(SessionRevision(now, 0), turns=deque(maxlen=self.max_turns)))
+        return session_id
+
+    def _get_session(self, session_id: str) -> Optional[SessionHistory]:
+        conn = self._connect()
+        with self._lock:
+            row = conn.execute(
+                "SELECT version, last_seen, created_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl_seconds:
+                self._cache.pop(session_id, None)
+                return None
+
+            revision = SessionRevision(row[2], row[0])
+            cached = self._cache.get(session_id)
+            if cached is None or cached.revision != revision:
+                self.cache_misses += 1
+                rows = conn.execute(
+                    "SELECT role, content FROM turns WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+                    (session_id, self.max_turns),
+                ).fetchall()
+                cached = _CachedSession(
+                    revision=revision,
+                    turns=deque(
+                        ({"role": role, "content": content} for role, content in reversed(rows)),
+                        maxlen=self.max_turns,
+                    ),
+                )
+            else:
+                self.cache_hits += 1
+            self._cache_put(session_id, cached)
+            return SessionHistory(list(cached.turns), cached.revision)
+
+    def _append_turns(self, session_id: str, turns: List[Tuple[str, str]]) -> None:
+        if not turns:
+            return
+        now = time.time()
+        conn = self._connect()
+        with self._lock:
+            row = conn.execute("SELECT last_seen FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is not None and now - row[0] > self.ttl_seconds:
+                # Expired but not yet cleaned up: start over as a new session
+                # (the version keeps counting so other workers drop their cached turns)
+                conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+                conn.execute(
+                    "UPDATE sessions SET created_at = ?, metadata = NULL WHERE session_id = ?", (now, session_id)
+                )
+                self._cache.pop(session_id, None)
+            conn.execute(
+                "INSERT INTO sessions (session_id, created_at, last_seen, version) VALUES (?, ?, ?, 0) "
+                "ON CONFLICT(session_id) DO NOTHING",
+                (session_id, now, now),
+            )
+            next_seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM turns WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO turns (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                [(session_id, next_seq + i, role, content) for i, (role, content) in enumerate(turns)],
+            )
+            # Ring buffer: keep only the most recent max_turns turns
+            conn.execute(
+                "DELETE FROM turns WHERE session_id = ? AND seq < ?",
+                (session_id, next_seq + len(turns) - self.max_turns),
+            )
+            version, created_at = conn.execute(
+                "UPDATE sessions SET last_seen = ?, version = version + 1 WHERE session_id = ? "
+                "RETURNING version, created_at",
+                (now, session_id),
+            ).fetchone()
+            conn.commit()
+
+            revision = SessionRevision(created_at, version)
+            cached = self._cache.get(session_id)
+            if cached is not None and cached.revision.next() == revision:
+                cached.revision = revision
+                cached.turns.extend({"role": role, "content": content} for role, content in turns)
+                self._cache_put(session_id, cached)
+            else:
+                # Another worker changed the session meanwhile; reload on next read
+                self._cache.pop(session_id, None)
+
+    def _delete_session(self, session_id: str) -> bool:
+        conn = self._connect()
+        with self._lock:
+            deleted = conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+            conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            conn.commit()
+            self._cache.pop(session_id, None)
+        return deleted > 0
+
+    def _delete_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        conn = self._connect()
+        with self._lock:
+            expired = [
+                row[0]
+                for row in conn.execute("SELECT session_id FROM sessions WHERE last_seen < ?", (cutoff,))
+            ]
+            if expired:
+                conn.executemany("DELETE FROM turns WHERE session_id = ?", [(s,) for s in expired])
+                conn.executemany("DELETE FROM sessions WHERE session_id = ?", [(s,) for s in expired])
+                conn.commit()
+                for session_id in expired:
+                    self._cache.pop(session_id, None)
+        return len(expired)
+
+    def _cache_put(self, session_id: str, cached: _CachedSession) -> None:
+        self._cache[session_id] = cached
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            try:
+                removed = await asyncio.to_thread(self._delete_expired)
+                if removed:
+                    print(f"Cleaned up {removed} expired sessions")
+            except Exception as e:
+                print(f"Error cleaning up sessions: {e}")
+            await asyncio.sleep(self.cleanup_interval)
+
+
+session_store = SessionStore(
+    db_path=os.environ.get("SESSION_DB_PATH", DEFAULT_DB_PATH),
+    max_turns=int(os.environ.get("SESSION_MAX_TURNS", "20")),
+    ttl_seconds=float(os.environ.get("SESSION_TTL_SECONDS", "7200")),
+    cache_size=int(os.environ.get("SESSION_CACHE_SIZE", "1000")),
+    cleanup_interval=float(os.environ.get("SESSION_CLEANUP_INTERVAL", "300")),
+)
@@ -0,0 +1,69 @@
+"""
+Single Flight - Coalesce identical concurrent calls into one execution
+
+Concurrent callers with the same key share one in-flight task and all get
+its result (or its exception). Nothing is cached: once the task finishes the
+key is forgotten, so a failure is never replayed to later callers.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Per-key de-duplication of concurrent async calls."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn() once for all concurrent callers of key.
+        Returns (result, shared) where shared is True for callers that joined
+        an execution started by someone else.
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            # The work runs in its own task so one caller's cancellation
+            # (e.g. client disconnect) doesn't fail the other waiters
+            flight = _Flight(task=asyncio.create_task(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            # Nobody is interested in the result any more: stop the work
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._flights),
+            "waiters": sum(f.waiters for f in self._flights.values()),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight.task is task:
+            del self._flights[key]
+        # Mark the exception as retrieved if every waiter already left
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,564 @@
+"""
+Suggestion Rules - Declarative follow-up suggestion tables per locale
+
+Each locale has an ordered list of rules; the first rule whose "when"
+condition matches wins. A rule's "cases" are checked in order and the first
+matching case's suggestions are used, else the rule's "suggest" list.
+
+A condition maps a scope to keywords and is true if any keyword occurs
+(as a substring, after lowercasing) in that scope:
+- "any":      the user message and the assistant response
+- "user":     the user message only
+- "response": the assistant response only
+
+The "en" table reproduces the original generate_suggestions if/elif chain.
+"""
+
+RULES = {
+    "en": {
+        "rules": [
+            # Testing & Diagnosis
+            {
+                "when": {"any": ["test", "testing", "diagnosis", "hiv test", "window period"]},
+                "cases": [
+                    ({"user": ["where"], "any": ["location"]},
+                     ["What types of tests exist?", "How accurate are tests?", "What if I test positive?"]),
+                    ({"any": ["positive", "result"]},
+                     ["What happens next?", "Treatment options?", "Who should I tell?"]),
+                    ({"any": ["window"], "user": ["when"]},
+                     ["Where to get tested?", "What happens during testing?", "Cost of testing?"]),
+                ],
+                "suggest": ["Where can I get tested?", "When should I test?", "Test accuracy rates?"],
+            },
+            # Treatment & Medication
+            {
+                "when": {"any": ["treatment", "medication", "art", "antiretroviral", "drugs", "pills", "medicine"]},
+                "cases": [
+                    ({"any": ["side effect", "problem"]},
+                     ["How to manage side effects?", "Alternative treatments?", "When to see a doctor?"]),
+                    ({"any": ["start", "begin"]},
+                     ["What to expect from treatment?", "Treatment side effects?", "Cost of medication?"]),
+                    ({"any": ["stop", "miss", "adhere"]},
+                     ["Importance of adherence?", "What if I miss doses?", "Reminder strategies?"]),
+                ],
+                "suggest": ["How does treatment work?", "Treatment side effects?", "How long is treatment?"],
+            },
+            # Prevention (PrEP/PEP)
+            {
+                "when": {"any": ["prevent", "prevention", "prep", "pep", "prophylaxis", "protect"]},
+                "cases": [
+                    ({"any": ["prep"]}, ["How to get PrEP?", "PrEP side effects?", "PrEP effectiveness?"]),
+                    ({"any": ["pep"]}, ["Where to get PEP?", "PEP timeline?", "PEP vs PrEP?"]),
+                    ({"any": ["condom"]}, ["Other prevention methods?", "What is PrEP?", "Risk reduction strategies?"]),
+                ],
+                "suggest": ["What is PrEP?", "What is PEP?", "How to reduce risk?"],
+            },
+            # Living with HIV
+            {
+                "when": {"any": ["living with", "daily life", "lifestyle", "cope", "coping", "manage", "undetectable"]},
+                "cases": [
+                    ({"any": ["work", "job"]}, ["Disclosure at work?", "Staying healthy?", "Support groups?"]),
+                    ({"any": ["relation", "partner", "sex"]},
+                     ["Telling partners?", "Safe sex practices?", "Undetectable = Untransmittable?"]),
+                    ({"any": ["u=u", "undetectable"]},
+                     ["How to become undetectable?", "What does U=U mean?", "Can I have children?"]),
+                ],
+                "suggest": ["Staying healthy tips?", "Support resources?", "Emotional support?"],
+            },
+            # Transmission & Risk
+            {
+                "when": {"any": ["transmit", "transmission", "risk", "expose", "exposure", "infect", "catch", "spread"]},
+                "cases": [
+                    ({"user": ["how"]}, ["Risk levels?", "Prevention methods?", "Getting tested?"]),
+                    ({"any": ["partner"]}, ["How to tell partner?", "Protecting partners?", "U=U explained?"]),
+                ],
+                "suggest": ["Transmission risks?", "Prevention strategies?", "PrEP for partners?"],
+            },
+            # Symptoms & Health
+            {
+                "when": {"any": ["symptom", "sick", "fever", "rash", "tired", "fatigue", "health"]},
+                "cases": [
+                    ({"any": ["early", "first"]}, ["When to get tested?", "Acute HIV symptoms?", "Next steps?"]),
+                ],
+                "suggest": ["When to see a doctor?", "Managing symptoms?", "Health monitoring?"],
+            },
+            # Support & Resources
+            {
+                "when": {"any": ["support", "help", "resource", "counsel", "talk", "alone", "scared", "anxiety"]},
+                "cases": [
+                    ({"any": ["emotion", "mental", "depress"]},
+                     ["Mental health resources?", "Support groups?", "Counseling services?"]),
+                    ({"any": ["financial", "cost", "afford"]},
+                     ["Financial assistance?", "Insurance coverage?", "Free services?"]),
+                ],
+                "suggest": ["Support groups near me?", "Hotline numbers?", "Online communities?"],
+            },
+            # Pregnancy & Family
+            {
+                "when": {"any": ["pregnant", "pregnancy", "baby", "child", "mother", "breastfeed"]},
+                "suggest": ["Prevention during pregnancy?", "Safe delivery options?", "Infant testing?"],
+            },
+            # Stigma & Disclosure
+            {
+                "when": {"any": ["stigma", "discriminat", "tell", "disclose", "secret", "shame"]},
+                "suggest": ["Disclosure strategies?", "Legal protections?", "Finding support?"],
+            },
+            # Response-based suggestions when the agent mentions specific topics
+            {
+                "when": {"response": ["doctor", "healthcare", "medical"]},
+                "suggest": ["How to find a specialist?", "What to ask my doctor?", "Preparing for appointments?"],
+            },
+            {
+                "when": {"response": ["immediately", "urgent", "soon"]},
+                "suggest": ["Where to get immediate help?", "Emergency resources?", "What to do now?"],
+            },
+            {
+                "when": {"response": ["more information", "learn more"]},
+                "suggest": ["Tell me more", "Related topics?", "Where to read more?"],
+            },
+            # Question type
+            {
+                "when": {"user": ["?"]},
+                "cases": [
+                    ({"user": ["how"]}, ["Tell me more", "Next steps?", "Where to get help?"]),
+                    ({"user": ["what"]}, ["How does it work?", "Why is this important?", "Related information?"]),
+                    ({"user": ["where"]}, ["Other options?", "What to expect?", "Cost information?"]),
+                    ({"user": ["when"]}, ["What happens next?", "How long does it take?", "Other timing questions?"]),
+                    ({"user": ["why"]}, ["Tell me more", "What are alternatives?", "Related concerns?"]),
+                ],
+                "suggest": ["Tell me more", "Related topics?", "Where to get help?"],
+            },
+        ],
+        "default": ["Tell me more", "What are my options?", "Where can I get help?"],
+    },
+    "de": {
+        "rules": [
+            {
+                "when": {"any": ["test", "diagnose", "fensterphase", "diagnostische lücke"]},
+                "cases": [
+                    ({"user": ["wo ", "wohin"], "any": ["teststelle", "standort"]},
+                     ["Welche Testarten gibt es?", "Wie zuverlässig sind Tests?", "Was, wenn ich positiv bin?"]),
+                    ({"any": ["positiv", "ergebnis", "befund"]},
+                     ["Wie geht es weiter?", "Welche Behandlung gibt es?", "Wem sollte ich es sagen?"]),
+                    ({"any": ["fenster"], "user": ["wann"]},
+                     ["Wo kann ich mich testen lassen?", "Wie läuft ein Test ab?", "Was kostet ein Test?"]),
+                ],
+                "suggest": ["Wo kann ich mich testen lassen?", "Wann sollte ich testen?", "Wie genau sind Tests?"],
+            },
+            {
+                "when": {"any": ["behandlung", "therapie", "medikament", "antiretrovira", "tablette", "arznei"]},
+                "cases": [
+                    ({"any": ["nebenwirkung", "problem", "beschwerde"]},
+                     ["Umgang mit Nebenwirkungen?", "Andere Therapien?", "Wann zum Arzt?"]),
+                    ({"any": ["beginn", "anfang", "starten"]},
+                     ["Was erwartet mich bei der Therapie?", "Nebenwirkungen der Therapie?", "Kosten der Medikamente?"]),
+                    ({"any": ["absetzen", "vergess", "einnahme", "adhärenz"]},
+                     ["Warum ist regelmäßige Einnahme wichtig?", "Was, wenn ich eine Dosis vergesse?", "Tipps zur Erinnerung?"]),
+                ],
+                "suggest": ["Wie wirkt die Therapie?", "Nebenwirkungen der Therapie?", "Wie lange dauert die Therapie?"],
+            },
+            {
+                "when": {"any": ["schutz", "schütz", "vorbeug", "prävention", "prep", "pep", "prophylaxe"]},
+                "cases": [
+                    ({"any": ["prep"]}, ["Wie bekomme ich PrEP?", "Nebenwirkungen der PrEP?", "Wie wirksam ist PrEP?"]),
+                    ({"any": ["pep"]}, ["Wo bekomme ich PEP?", "Zeitfenster für PEP?", "PEP oder PrEP?"]),
+                    ({"any": ["kondom"]}, ["Andere Schutzmethoden?", "Was ist PrEP?", "Wie senke ich mein Risiko?"]),
+                ],
+                "suggest": ["Was ist PrEP?", "Was ist PEP?", "Wie senke ich mein Risiko?"],
+            },
+            {
+                "when": {"any": ["leben mit", "alltag", "lebensstil", "bewältig", "umgang mit", "nachweisgrenze", "nicht nachweisbar"]},
+                "cases": [
+                    ({"any": ["arbeit", "job", "beruf"]}, ["Offenlegung am Arbeitsplatz?", "Gesund bleiben?", "Selbsthilfegruppen?"]),
+                    ({"any": ["beziehung", "partner", "sex"]},
+                     ["Partner informieren?", "Safer Sex?", "Nicht nachweisbar = nicht übertragbar?"]),
+                    ({"any": ["n=n", "u=u", "nachweis"]},
+                     ["Wie werde ich nicht nachweisbar?", "Was bedeutet N=N?", "Kann ich Kinder bekommen?"]),
+                ],
+                "suggest": ["Tipps, um gesund zu bleiben?", "Hilfsangebote?", "Emotionale Unterstützung?"],
+            },
+            {
+                "when": {"any": ["übertrag", "ansteck", "risiko", "infektion", "infiziert", "exposition"]},
+                "cases": [
+                    ({"user": ["wie "]}, ["Wie hoch ist das Risiko?", "Schutzmethoden?", "Testen lassen?"]),
+                    ({"any": ["partner"]}, ["Wie sage ich es meinem Partner?", "Partner schützen?", "N=N erklärt?"]),
+                ],
+                "suggest": ["Übertragungsrisiken?", "Schutzstrategien?", "PrEP für Partner?"],
+            },
+            {
+                "when": {"any": ["symptom", "krank", "fieber", "ausschlag", "müde", "erschöpf", "gesundheit"]},
+                "cases": [
+                    ({"any": ["früh", "erste"]}, ["Wann testen lassen?", "Symptome einer akuten HIV-Infektion?", "Nächste Schritte?"]),
+                ],
+                "suggest": ["Wann zum Arzt?", "Umgang mit Symptomen?", "Gesundheitskontrollen?"],
+            },
+            {
+                "when": {"any": ["unterstütz", "hilfe", "beratung", "reden", "allein", "angst", "sorge"]},
+                "cases": [
+                    ({"any": ["psych", "seel", "depress", "gefühl"]},
+                     ["Psychologische Hilfe?", "Selbsthilfegruppen?", "Beratungsstellen?"]),
+                    ({"any": ["geld", "kosten", "finanz", "leisten"]},
+                     ["Finanzielle Hilfe?", "Übernimmt die Krankenkasse?", "Kostenlose Angebote?"]),
+                ],
+                "suggest": ["Selbsthilfegruppen in meiner Nähe?", "Beratungstelefon?", "Online-Communities?"],
+            },
+            {
+                "when": {"any": ["schwanger", "baby", "kind", "mutter", "stillen"]},
+                "suggest": ["Schutz in der Schwangerschaft?", "Sichere Geburt?", "Tests für Neugeborene?"],
+            },
+            {
+                "when": {"any": ["stigma", "diskriminier", "erzählen", "offenleg", "geheim", "scham"]},
+                "suggest": ["Wie erzähle ich es anderen?", "Rechtlicher Schutz?", "Wo finde ich Unterstützung?"],
+            },
+            {
+                "when": {"response": ["arzt", "ärzt", "medizinisch", "praxis"]},
+                "suggest": ["Wie finde ich eine Schwerpunktpraxis?", "Was frage ich meinen Arzt?", "Vorbereitung auf den Termin?"],
+            },
+            {
+                "when": {"response": ["sofort", "dringend", "schnellstmöglich", "umgehend"]},
+                "suggest": ["Wo bekomme ich sofort Hilfe?", "Notfallangebote?", "Was soll ich jetzt tun?"],
+            },
+            {
+                "when": {"response": ["weitere informationen", "mehr erfahren"]},
+                "suggest": ["Erzähl mir mehr", "Verwandte Themen?", "Wo kann ich mehr lesen?"],
+            },
+            {
+                "when": {"user": ["?"]},
+                "cases": [
+                    ({"user": ["wie "]}, ["Erzähl mir mehr", "Nächste Schritte?", "Wo bekomme ich Hilfe?"]),
+                    ({"user": ["was "]}, ["Wie funktioniert das?", "Warum ist das wichtig?", "Weitere Informationen?"]),
+                    ({"user": ["wo ", "wohin"]}, ["Andere Möglichkeiten?", "Was erwartet mich?", "Was kostet das?"]),
+                    ({"user": ["wann"]}, ["Wie geht es weiter?", "Wie lange dauert das?", "Weitere Fragen zum Zeitpunkt?"]),
+                    ({"user": ["warum", "wieso"]}, ["Erzähl mir mehr", "Welche Alternativen gibt es?", "Ähnliche Fragen?"]),
+                ],
+                "suggest": ["Erzähl mir mehr", "Verwandte Themen?", "Wo bekomme ich Hilfe?"],
+            },
+        ],
+        "default": ["Erzähl mir mehr", "Welche Möglichkeiten habe ich?", "Wo bekomme ich Hilfe?"],
+    },
+    "fr": {
+        "rules": [
+            {
+                "when": {"any": ["test", "dépistage", "diagnostic", "fenêtre"]},
+                "cases": [
+                    ({"user": ["où"], "any": ["lieu", "centre"]},
+                     ["Quels types de tests existent ?", "Les tests sont-ils fiables ?", "Et si je suis positif ?"]),
+                    ({"any": ["positi", "résultat"]},
+                     ["Que se passe-t-il ensuite ?", "Quels traitements ?", "À qui en parler ?"]),
+                    ({"any": ["fenêtre"], "user": ["quand"]},
+                     ["Où me faire dépister ?", "Comment se passe un test ?", "Combien coûte un test ?"]),
+                ],
+                "suggest": ["Où me faire dépister ?", "Quand faire un test ?", "Fiabilité des tests ?"],
+            },
+            {
+                "when": {"any": ["traitement", "médicament", "antirétrovira", "comprimé", "thérapie"]},
+                "cases": [
+                    ({"any": ["effet secondaire", "effets secondaires", "problème"]},
+                     ["Gérer les effets secondaires ?", "Autres traitements ?", "Quand consulter un médecin ?"]),
+                    ({"any": ["commencer", "début"]},
+                     ["À quoi s'attendre avec le traitement ?", "Effets secondaires du traitement ?", "Coût des médicaments ?"]),
+                    ({"any": ["arrêt", "oubli", "observance"]},
+                     ["Pourquoi l'observance est importante ?", "Et si j'oublie une prise ?", "Astuces pour ne pas oublier ?"]),
+                ],
+                "suggest": ["Comment agit le traitement ?", "Effets secondaires du traitement ?", "Durée du traitement ?"],
+            },
+            {
+                "when": {"any": ["prévention", "prévenir", "prep", "pep", "prophylaxie", "protég", "protection"]},
+                "cases": [
+                    ({"any": ["prep"]}, ["Comment obtenir la PrEP ?", "Effets secondaires de la PrEP ?", "Efficacité de la PrEP ?"]),
+                    ({"any": ["pep"]}, ["Où obtenir la PEP ?", "Délai pour la PEP ?", "PEP ou PrEP ?"]),
+                    ({"any": ["préservatif"]}, ["Autres moyens de prévention ?", "Qu'est-ce que la PrEP ?", "Réduire les risques ?"]),
+                ],
+                "suggest": ["Qu'est-ce que la PrEP ?", "Qu'est-ce que la PEP ?", "Comment réduire le risque ?"],
+            },
+            {
+                "when": {"any": ["vivre avec", "quotidien", "mode de vie", "faire face", "indétectable"]},
+                "cases": [
+                    ({"any": ["travail", "emploi"]}, ["En parler au travail ?", "Rester en bonne santé ?", "Groupes de soutien ?"]),
+                    ({"any": ["relation", "partenaire", "sex"]},
+                     ["Informer mes partenaires ?", "Rapports protégés ?", "Indétectable = intransmissible ?"]),
+                    ({"any": ["i=i", "u=u", "indétectable"]},
+                     ["Comment devenir indétectable ?", "Que signifie I=I ?", "Puis-je avoir des enfants ?"]),
+                ],
+                "suggest": ["Conseils pour rester en bonne santé ?", "Ressources de soutien ?", "Soutien émotionnel ?"],
+            },
+            {
+                "when": {"any": ["transmi", "risque", "exposition", "exposé", "infect", "contamin"]},
+                "cases": [
+                    ({"user": ["comment"]}, ["Niveaux de risque ?", "Moyens de prévention ?", "Se faire dépister ?"]),
+                    ({"any": ["partenaire"]}, ["Comment le dire à mon partenaire ?", "Protéger mes partenaires ?", "I=I expliqué ?"]),
+                ],
+                "suggest": ["Risques de transmission ?", "Stratégies de prévention ?", "PrEP pour les partenaires ?"],
+            },
+            {
+                "when": {"any": ["symptôme", "malade", "fièvre", "éruption", "fatigu", "santé"]},
+                "cases": [
+                    ({"any": ["précoce", "premier", "première"]},
+                     ["Quand se faire dépister ?", "Symptômes de la primo-infection ?", "Prochaines étapes ?"]),
+                ],
+                "suggest": ["Quand consulter un médecin ?", "Gérer les symptômes ?", "Suivi médical ?"],
+            },
+            {
+                "when": {"any": ["soutien", "aide", "ressource", "conseil", "parler", "seul", "peur", "anxi"]},
+                "cases": [
+                    ({"any": ["émotion", "mental", "psych", "dépress"]},
+                     ["Ressources en santé mentale ?", "Groupes de soutien ?", "Services d'écoute ?"]),
+                    ({"any": ["financ", "coût", "argent", "payer"]},
+                     ["Aide financière ?", "Prise en charge par l'assurance ?", "Services gratuits ?"]),
+                ],
+                "suggest": ["Groupes de soutien près de chez moi ?", "Lignes d'écoute ?", "Communautés en ligne ?"],
+            },
+            {
+                "when": {"any": ["enceinte", "grossesse", "bébé", "enfant", "mère", "allait"]},
+                "suggest": ["Prévention pendant la grossesse ?", "Accouchement sans risque ?", "Dépistage du nourrisson ?"],
+            },
+            {
+                "when": {"any": ["stigma", "discrimin", "annoncer", "dire à", "secret", "honte"]},
+                "suggest": ["Comment l'annoncer ?", "Protections juridiques ?", "Trouver du soutien ?"],
+            },
+            {
+                "when": {"response": ["médecin", "soignant", "médical"]},
+                "suggest": ["Trouver un spécialiste ?", "Que demander à mon médecin ?", "Préparer un rendez-vous ?"],
+            },
+            {
+                "when": {"response": ["immédiatement", "urgent", "rapidement"]},
+                "suggest": ["Où trouver de l'aide tout de suite ?", "Ressources d'urgence ?", "Que faire maintenant ?"],
+            },
+            {
+                "when": {"response": ["plus d'informations", "en savoir plus"]},
+                "suggest": ["Dis-m'en plus", "Sujets associés ?", "Où lire davantage ?"],
+            },
+            {
+                "when": {"user": ["?"]},
+                "cases": [
+                    ({"user": ["comment"]}, ["Dis-m'en plus", "Prochaines étapes ?", "Où trouver de l'aide ?"]),
+                    ({"user": ["quoi", "qu'est-ce", "quel"]}, ["Comment ça marche ?", "Pourquoi est-ce important ?", "Informations associées ?"]),
+                    ({"user": ["où"]}, ["Autres options ?", "À quoi s'attendre ?", "Combien ça coûte ?"]),
+                    ({"user": ["quand"]}, ["Que se passe-t-il ensuite ?", "Combien de temps ça prend ?", "Autres questions de délai ?"]),
+                    ({"user": ["pourquoi"]}, ["Dis-m'en plus", "Quelles alternatives ?", "Questions associées ?"]),
+                ],
+                "suggest": ["Dis-m'en plus", "Sujets associés ?", "Où trouver de l'aide ?"],
+            },
+        ],
+        "default": ["Dis-m'en plus", "Quelles sont mes options ?", "Où trouver de l'aide ?"],
+    },
+    "tr": {
+        "rules": [
+            {
+                "when": {"any": ["test", "tanı", "teşhis", "pencere dönemi"]},
+                "cases": [
+                    ({"user": ["nerede", "nereye"], "any": ["merkez", "konum"]},
+                     ["Hangi test türleri var?", "Testler ne kadar güvenilir?", "Sonucum pozitif çıkarsa?"]),
+                    ({"any": ["pozitif", "sonuç"]},
+                     ["Sonra ne olur?", "Tedavi seçenekleri?", "Kime söylemeliyim?"]),
+                    ({"any": ["pencere"], "user": ["ne zaman"]},
+                     ["Nerede test yaptırabilirim?", "Test nasıl yapılır?", "Testin maliyeti?"]),
+                ],
+                "suggest": ["Nerede test yaptırabilirim?", "Ne zaman test yaptırmalıyım?", "Testlerin doğruluğu?"],
+            },
+            {
+                "when": {"any": ["tedavi", "ilaç", "antiretroviral", "hap", "terapi"]},
+                "cases": [
+                    ({"any": ["yan etki", "sorun"]},
+                     ["Yan etkilerle nasıl başa çıkılır?", "Alternatif tedaviler?", "Ne zaman doktora gitmeli?"]),
+                    ({"any": ["başla"]},
+                     ["Tedaviden ne beklemeliyim?", "Tedavinin yan etkileri?", "İlaçların maliyeti?"]),
+                    ({"any": ["bırak", "unut", "kaçır", "uyum"]},
+                     ["Düzenli kullanım neden önemli?", "Doz kaçırırsam ne olur?", "Hatırlatma yöntemleri?"]),
+                ],
+                "suggest": ["Tedavi nasıl işler?", "Tedavinin yan etkileri?", "Tedavi ne kadar sürer?"],
+            },
+            {
+                "when": {"any": ["önle", "korun", "prep", "pep", "profilaksi"]},
+                "cases": [
+                    ({"any": ["prep"]}, ["PrEP'e nasıl ulaşırım?", "PrEP'in yan etkileri?", "PrEP ne kadar etkili?"]),
+                    ({"any": ["pep"]}, ["PEP'i nereden alabilirim?", "PEP için süre?", "PEP mi PrEP mi?"]),
+                    ({"any": ["prezervatif", "kondom"]}, ["Diğer korunma yöntemleri?", "PrEP nedir?", "Riski azaltma yolları?"]),
+                ],
+                "suggest": ["PrEP nedir?", "PEP nedir?", "Riski nasıl azaltırım?"],
+            },
+            {
+                "when": {"any": ["ile yaşa", "günlük yaşam", "yaşam tarzı", "başa çık", "saptanamaz"]},
+                "cases": [
+                    ({"any": ["iş", "çalış"]}, ["İş yerinde açıklamak?", "Sağlıklı kalmak?", "Destek grupları?"]),
+                    ({"any": ["ilişki", "partner", "seks", "cinsel"]},
+                     ["Partnerlere söylemek?", "Güvenli seks?", "Saptanamaz = Bulaştırmaz?"]),
+                    ({"any": ["s=b", "u=u", "saptanamaz"]},
+                     ["Nasıl saptanamaz olurum?", "S=B ne demek?", "Çocuk sahibi olabilir miyim?"]),
+                ],
+                "suggest": ["Sağlıklı kalma önerileri?", "Destek kaynakları?", "Duygusal destek?"],
+            },
+            {
+                "when": {"any": ["bulaş", "risk", "maruz", "enfeksiyon", "enfekte"]},
+                "cases": [
+                    ({"user": ["nasıl"]}, ["Risk seviyeleri?", "Korunma yöntemleri?", "Test yaptırmak?"]),
+                    ({"any": ["partner"]}, ["Partnerime nasıl söylerim?", "Partnerimi korumak?", "S=B nedir?"]),
+                ],
+                "suggest": ["Bulaş riskleri?", "Korunma stratejileri?", "Partnerler için PrEP?"],
+            },
+            {
+                "when": {"any": ["belirti", "semptom", "hasta", "ateş", "döküntü", "yorgun", "sağlık"]},
+                "cases": [
+                    ({"any": ["erken", "ilk"]}, ["Ne zaman test yaptırmalı?", "Akut HIV belirtileri?", "Sonraki adımlar?"]),
+                ],
+                "suggest": ["Ne zaman doktora gitmeli?", "Belirtilerle başa çıkmak?", "Sağlık takibi?"],
+            },
+            {
+                "when": {"any": ["destek", "yardım", "kaynak", "danış", "konuş", "yalnız", "kork", "kaygı"]},
+                "cases": [
+                    ({"any": ["duygu", "ruh", "psikoloj", "depres"]},
+                     ["Ruh sağlığı kaynakları?", "Destek grupları?", "Danışmanlık hizmetleri?"]),
+                    ({"any": ["maddi", "maliyet", "ücret", "para"]},
+                     ["Maddi yardım?", "Sigorta kapsamı?", "Ücretsiz hizmetler?"]),
+                ],
+                "suggest": ["Yakınımdaki destek grupları?", "Yardım hatları?", "Çevrimiçi topluluklar?"],
+            },
+            {
+                "when": {"any": ["hamile", "gebe", "bebek", "çocuk", "anne", "emzir"]},
+                "suggest": ["Hamilelikte korunma?", "Güvenli doğum seçenekleri?", "Bebek testi?"],
+            },
+            {
+                "when": {"any": ["damga", "ayrımcılık", "söyle", "açıkla", "sır", "utan"]},
+                "suggest": ["Açıklama stratejileri?", "Yasal korumalar?", "Destek bulmak?"],
+            },
+            {
+                "when": {"response": ["doktor", "hekim", "tıbbi"]},
+                "suggest": ["Uzman nasıl bulunur?", "Doktoruma ne sormalıyım?", "Randevuya hazırlık?"],
+            },
+            {
+                "when": {"response": ["hemen", "acil", "en kısa sürede"]},
+                "suggest": ["Hemen nereden yardım alabilirim?", "Acil durum kaynakları?", "Şimdi ne yapmalıyım?"],
+            },
+            {
+                "when": {"response": ["daha fazla bilgi"]},
+                "suggest": ["Daha fazla anlat", "İlgili konular?", "Daha fazlasını nerede okuyabilirim?"],
+            },
+            {
+                "when": {"user": ["?"]},
+                "cases": [
+                    ({"user": ["nasıl"]}, ["Daha fazla anlat", "Sonraki adımlar?", "Nereden yardım alabilirim?"]),
+                    ({"user": ["nedir", "ne "]}, ["Nasıl işler?", "Bu neden önemli?", "İlgili bilgiler?"]),
+                    ({"user": ["nerede", "nereye"]}, ["Başka seçenekler?", "Ne beklemeliyim?", "Maliyeti ne kadar?"]),
+                    ({"user": ["ne zaman"]}, ["Sonra ne olur?", "Ne kadar sürer?", "Zamanlamayla ilgili diğer sorular?"]),
+                    ({"user": ["neden", "niçin"]}, ["Daha fazla anlat", "Alternatifler neler?", "İlgili endişeler?"]),
+                ],
+                "suggest": ["Daha fazla anlat", "İlgili konular?", "Nereden yardım alabilirim?"],
+            },
+        ],
+        "default": ["Daha fazla anlat", "Seçeneklerim neler?", "Nereden yardım alabilirim?"],
+    },
+    "uk": {
+        "rules": [
+            {
+                "when": {"any": ["тест", "діагност", "аналіз", "період вікна"]},
+                "cases": [
+                    ({"user": ["де "], "any": ["пункт", "центр"]},
+                     ["Які бувають тести?", "Наскільки точні тести?", "Що, якщо результат позитивний?"]),
+                    ({"any": ["позитив", "результат"]},
+                     ["Що далі?", "Варіанти лікування?", "Кому варто сказати?"]),
+                    ({"any": ["вікна", "вікно"], "user": ["коли"]},
+                     ["Де пройти тест?", "Як проходить тестування?", "Скільки коштує тест?"]),
+                ],
+                "suggest": ["Де пройти тест?", "Коли варто тестуватися?", "Точність тестів?"],
+            },
+            {
+                "when": {"any": ["лікуван", "терапі", "ліки", "препарат", "таблет", "антиретровір"]},
+                "cases": [
+                    ({"any": ["побічн", "проблем"]},
+                     ["Як впоратися з побічними ефектами?", "Альтернативне лікування?", "Коли звернутися до лікаря?"]),
+                    ({"any": ["почат", "розпоч"]},
+                     ["Чого чекати від лікування?", "Побічні ефекти лікування?", "Вартість ліків?"]),
+                    ({"any": ["припин", "пропуст", "забу", "прихильн"]},
+                     ["Чому важливо приймати регулярно?", "Що, якщо я пропустив дозу?", "Способи не забувати?"]),
+                ],
+                "suggest": ["Як діє лікування?", "Побічні ефекти лікування?", "Скільки триває лікування?"],
+            },
+            {
+                "when": {"any": ["профілакти", "запобіг", "захист", "prep", "pep", "преп", "пеп", "доконтакт", "постконтакт"]},
+                "cases": [
+                    ({"any": ["prep", "преп", "доконтакт"]}, ["Як отримати PrEP?", "Побічні ефекти PrEP?", "Ефективність PrEP?"]),
+                    ({"any": ["pep", "пеп", "постконтакт"]}, ["Де отримати PEP?", "Терміни для PEP?", "PEP чи PrEP?"]),
+                    ({"any": ["презерватив"]}, ["Інші методи захисту?", "Що таке PrEP?", "Як знизити ризик?"]),
+                ],
+                "suggest": ["Що таке PrEP?", "Що таке PEP?", "Як знизити ризик?"],
+            },
+            {
+                "when": {"any": ["жити з", "життя з", "щоденн", "спосіб життя", "впорат", "невизначуван"]},
+                "cases": [
+                    ({"any": ["робот"]}, ["Розкриття статусу на роботі?", "Як залишатися здоровим?", "Групи підтримки?"]),
+                    ({"any": ["стосун", "партнер", "секс"]},
+                     ["Як сказати партнерам?", "Безпечний секс?", "Невизначуваний = Непередаваний?"]),
+                    ({"any": ["н=н", "u=u", "невизначуван"]},
+                     ["Як стати невизначуваним?", "Що означає Н=Н?", "Чи можу я мати дітей?"]),
+                ],
+                "suggest": ["Поради щодо здоров'я?", "Ресурси підтримки?", "Емоційна підтримка?"],
+            },
+            {
+                "when": {"any": ["переда", "ризик", "контакт", "інфік", "зараж"]},
+                "cases": [
+                    ({"user": ["як "]}, ["Рівні ризику?", "Методи профілактики?", "Пройти тест?"]),
+                    ({"any": ["партнер"]}, ["Як сказати партнеру?", "Захист партнерів?", "Що таке Н=Н?"]),
+                ],
+                "suggest": ["Ризики передачі?", "Стратегії профілактики?", "PrEP для партнерів?"],
+            },
+            {
+                "when": {"any": ["симптом", "хвор", "температур", "висип", "втом", "здоров"]},
+                "cases": [
+                    ({"any": ["ранн", "перш"]}, ["Коли тестуватися?", "Симптоми гострої ВІЛ-інфекції?", "Наступні кроки?"]),
+                ],
+                "suggest": ["Коли звернутися до лікаря?", "Як полегшити симптоми?", "Контроль здоров'я?"],
+            },
+            {
+                "when": {"any": ["підтрим", "допомог", "ресурс", "консульт", "поговор", "самотн", "страш", "тривог"]},
+                "cases": [
+                    ({"any": ["емоц", "психі", "психол", "депрес"]},
+                     ["Ресурси психічного здоров'я?", "Групи підтримки?", "Консультаційні послуги?"]),
+                    ({"any": ["фінанс", "вартіст", "кошт", "гроші"]},
+                     ["Фінансова допомога?", "Покриття страховкою?", "Безкоштовні послуги?"]),
+                ],
+                "suggest": ["Групи підтримки поруч?", "Гарячі лінії?", "Онлайн-спільноти?"],
+            },
+            {
+                "when": {"any": ["вагітн", "немовл", "дитин", "мати", "мам", "грудн"]},
+                "suggest": ["Профілактика під час вагітності?", "Безпечні пологи?", "Тестування немовлят?"],
+            },
+            {
+                "when": {"any": ["стигм", "дискримін", "розповіс", "розкри", "таємн", "сором"]},
+                "suggest": ["Як розкрити статус?", "Правовий захист?", "Де знайти підтримку?"],
+            },
+            {
+                "when": {"response": ["лікар", "медичн", "медик"]},
+                "suggest": ["Як знайти спеціаліста?", "Що запитати в лікаря?", "Як підготуватися до прийому?"],
+            },
+            {
+                "when": {"response": ["негайно", "терміново", "якнайшвидше"]},
+                "suggest": ["Де отримати допомогу негайно?", "Екстрені ресурси?", "Що робити зараз?"],
+            },
+            {
+                "when": {"response": ["більше інформації", "дізнатися більше"]},
+                "suggest": ["Розкажи більше", "Пов'язані теми?", "Де почитати більше?"],
+            },
+            {
+                "when": {"user": ["?"]},
+                "cases": [
+                    ({"user": ["як "]}, ["Розкажи більше", "Наступні кроки?", "Де отримати допомогу?"]),
+                    ({"user": ["що "]}, ["Як це працює?", "Чому це важливо?", "Пов'язана інформація?"]),
+                    ({"user": ["де "]}, ["Інші варіанти?", "Чого очікувати?", "Скільки це коштує?"]),
+                    ({"user": ["коли"]}, ["Що буде далі?", "Скільки часу це займає?", "Інші питання щодо термінів?"]),
+                    ({"user": ["чому", "навіщо"]}, ["Розкажи більше", "Які є альтернативи?", "Пов'язані питання?"]),
+                ],
+                "suggest": ["Розкажи більше", "Пов'язані теми?", "Де отримати допомогу?"],
+            },
+        ],
+        "default": ["Розкажи більше", "Які в мене варіанти?", "Де отримати допомогу?"],
+    },
+}
+
+# Frequent function words used to guess the locale of a message when the
+# client doesn't send one (Cyrillic text is treated as Ukrainian; ties go to English)
+LOCALE_MARKERS = {
+    "en": ["the", "is", "what", "how", "can", "i", "my", "and", "to", "do", "where", "should", "you"],
+    "de": ["ich", "und", "nicht", "wie", "was", "ist", "kann", "wo", "bei", "mit", "habe", "der", "die", "das"],
+    "fr": ["je", "est", "les", "la", "le", "et", "comment", "pour", "que", "une", "des", "avec", "suis", "où", "quand", "mon", "ma"],
+    "tr": ["ve", "bir", "nasıl", "ne", "mi", "mı", "için", "bu", "var", "nerede", "ben", "mıyım", "miyim"],
+}
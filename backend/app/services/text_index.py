@@ -0,0 +1,213 @@
+"""
+Text Index - Inverted index with BM25 ranking for short documents (FAQs)
+
+Text is analyzed once at build time: Unicode accent/case folding, word
+tokenization, stopword removal and a light suffix-stripping stemmer for
+English or German. Postings store each term's precomputed BM25 impact per
+document (idf x saturated, length-normalized term frequency) as NumPy
+arrays, so a query is one vectorized scatter-add per query term plus a
+partial sort for the top k.
+
+Fields are weighted by repeating their term frequencies (question > tags >
+answer), a simple form of BM25F.
+"""
+
+import math
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+STOPWORDS = {
+    "en": set(
+        "a an and are as at be but by can do does for from how i if in into is it its me my of on or "
+        "should so than that the their them then there these they this to was we what when where which "
+        "who why will with would you your".split()
+    ),
+    "de": set(
+        "aber als am an auch auf aus bei bin bis da das dass dem den der des die du ein eine einem einen "
+        "einer eines er es fur hat ich ihr im in ist ja kann mich mit muss nach nicht noch oder sich sie "
+        "sind so um und uns von war was welche wenn wie wir wo zu zum zur".split()
+    ),
+}
+
+
+def fold(text: str) -> str:
+    """Case- and accent-fold text: "Präexpositionsprophylaxe" -> "praexpositionsprophylaxe"."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _has_vowel(word: str) -> bool:
+    return any(c in "aeiouy" for c in word)
+
+
+def stem_en(word: str) -> str:
+    """Light English stemmer: plurals, -ing/-ed/-ly and a trailing -e (tests/testing/tested -> test)."""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ingly", "edly", "ing", "ed", "ly"):
+        if word.endswith(suffix) and _has_vowel(word[: -len(suffix)]) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            # stopping -> stopp -> stop
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def stem_de(word: str) -> str:
+    """Light German stemmer after CISTEM: strips -em/-er/-nd, then -t/-e/-s/-n (Umlauts are already folded)."""
+    if not word.isalpha():
+        return word
+    while len(word) > 3:
+        if len(word) > 5 and word[-2:] in ("em", "er", "nd"):
+            word = word[:-2]
+        elif word[-1] in "esnt":
+            word = word[:-1]
+        else:
+            break
+    return word
+
+
+STEMMERS: Dict[str, Callable[[str], str]] = {"en": stem_en, "de": stem_de}
+
+
+class Analyzer:
+    """Text -> index terms for one language."""
+
+    def __init__(self, language: str = "en", cache_size: int = 50000):
+        self.language = language
+        self.cache_size = cache_size
+        self._stopwords = {fold(w) for w in STOPWORDS.get(language, ())}
+        self._stem = STEMMERS.get(language, lambda word: word)
+        self._cache: Dict[str, str] = {}
+
+    def terms(self, text: str) -> List[str]:
+        terms = []
+        for word in _WORD.findall(fold(text)):
+            if word in self._stopwords:
+                continue
+            stemmed = self._cache.get(word)
+            if stemmed is None:
+                stemmed = self._stem(word)
+                if len(self._cache) < self.cache_size:
+                    self._cache[word] = stemmed
+            terms.append(stemmed)
+        return terms
+
+    def term_frequencies(self, fields: Sequence[Tuple[str, int]]) -> Dict[str, int]:
+        """Weighted term frequencies of a document made of (field text, field weight) pairs."""
+        freqs: Dict[str, int] = {}
+        for text, weight in fields:
+            for term in self.terms(text):
+                freqs[term] = freqs.get(term, 0) + weight
+        return freqs
+
+
+@dataclass
+class SearchHit:
+    doc_id: str
+    score: float
+    matched_terms: int
+
+
+class BM25Index:
+    """Immutable BM25 index over documents made of weighted text fields."""
+
+    def __init__(
+        self,
+        documents: Iterable[Tuple[str, Sequence[Tuple[str, int]]]],
+        analyzer: Optional[Analyzer] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        """documents: (doc_id, [(field text, field weight), ...])."""
+        analyzer = analyzer or Analyzer()
+        self._build(
+            ((doc_id, analyzer.term_frequencies(fields)) for doc_id, fields in documents),
+            analyzer, k1, b,
+        )
+
+    @classmethod
+    def from_term_frequencies(
+        cls,
+        documents: Iterable[Tuple[str, Dict[str, int]]],
+        analyzer: Optional[Analyzer] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        """Build from already analyzed documents (doc_id, term frequencies), e.g. to reuse unchanged ones."""
+        index = cls.__new__(cls)
+        index._build(documents, analyzer or Analyzer(), k1, b)
+        return index
+
+    def _build(self, documents: Iterable[Tuple[str, Dict[str, int]]], analyzer: Analyzer, k1: float, b: float) -> None:
+        self.analyzer = analyzer
+        self.doc_ids: List[str] = []
+        term_freqs: List[Dict[str, int]] = []
+        for doc_id, freqs in documents:
+            self.doc_ids.append(doc_id)
+            term_freqs.append(freqs)
+
+        n_docs = len(term_freqs)
+        lengths = [sum(freqs.values()) for freqs in term_freqs]
+        avg_length = (sum(lengths) / n_docs) if n_docs else 1.0
+
+        doc_freq: Dict[str, int] = {}
+        for freqs in term_freqs:
+            for term in freqs:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+
+        # term -> (doc indices, BM25 impacts)
+        postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        for doc, freqs in enumerate(term_freqs):
+            norm = k1 * (1 - b + b * lengths[doc] / avg_length)
+            for term, tf in freqs.items():
+                idf = math.log(1 + (n_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                docs, impacts = postings.setdefault(term, ([], []))
+                docs.append(doc)
+                impacts.append(idf * tf * (k1 + 1) / (tf + norm))
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: (np.array(docs, dtype=np.int32), np.array(impacts, dtype=np.float32))
+            for term, (docs, impacts) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def query_terms(self, query: str) -> List[str]:
+        """Distinct analyzed query terms that occur in the index."""
+        return [t for t in dict.fromkeys(self.analyzer.terms(query)) if t in self._postings]
+
+    def scores(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Dense BM25 scores and matched-term counts, one entry per document (in doc_ids order)."""
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        matched = np.zeros(len(self.doc_ids), dtype=np.int32)
+        for term in self.query_terms(query):
+            docs, impacts = self._postings[term]
+            # A term occurs once per document in its postings, so plain fancy-index adds are exact
+            scores[docs] += impacts
+            matched[docs] += 1
+        return scores, matched
+
+    def search(self, query: str, limit: Optional[int] = 10) -> List[SearchHit]:
+        """Documents matching any query term, best BM25 score first."""
+        scores, matched = self.scores(query)
+        candidates = np.flatnonzero(matched)
+        if limit is not None and len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [SearchHit(self.doc_ids[doc], float(scores[doc]), int(matched[doc])) for doc in ranked]
@@ -0,0 +1,231 @@
+"""
+Thread Cache - Reuse Azure agent threads across turns of the same session
+
+Each session keeps its own agent thread, so later turns only append the new
+user message instead of re-uploading history into a fresh thread. First turns
+draw from a warm pool of pre-created empty threads. Idle threads are evicted
+(LRU + TTL) and deleted on Azure by a background reaper.
+
+The cache is per process while sessions are shared by all workers: a lease
+can carry the session's revision, and a thread whose last turn did not leave
+the session at that revision (another worker answered in between) is
+replaced by a new one, which the caller fills from the full history.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+
+@dataclass
+class _CachedThread:
+    thread_id: Optional[str] = None
+    last_used: float = field(default_factory=time.monotonic)
+    turns: int = 0
+    revision: Any = None  # Session revision after this thread's last turn
+    retired: bool = False
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+@dataclass
+class ThreadLease:
+    """A session's thread, held exclusively for the duration of one turn."""
+    thread_id: str
+    is_new: bool  # True if no turn has completed on this thread yet
+
+
+class ThreadCache:
+    """Session-to-thread cache with TTL/LRU eviction and a warm thread pool."""
+
+    def __init__(
+        self,
+        create_thread: Callable[[], Awaitable[str]],
+        delete_thread: Callable[[str], Awaitable[None]],
+        ttl_seconds: float = 1800.0,
+        max_sessions: int = 1000,
+        pool_size: int = 4,
+        reap_interval: float = 60.0,
+    ):
+        self._create_thread = create_thread
+        self._delete_thread = delete_thread
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.pool_size = pool_size
+        self.reap_interval = reap_interval
+
+        self._entries: "OrderedDict[str, _CachedThread]" = OrderedDict()
+        self._pool: List[str] = []
+        self._refill_task: Optional[asyncio.Task] = None
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._background: Set[asyncio.Task] = set()
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.stale_threads = 0
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        """Start the background reaper (which also keeps the warm pool filled)."""
+        if self._reaper_task is None:
+            self._reaper_task = asyncio.create_task(self._reap_loop())
+
+    async def fill_pool(self) -> int:
+        """Fill the warm pool now (startup warm-up); returns the number of pooled threads."""
+        self._schedule_refill()
+        if self._refill_task:
+            await asyncio.shield(self._refill_task)
+        return len(self._pool)
+
+    async def stop(self) -> None:
+        """Stop the reaper and delete every cached and pooled thread."""
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        if self._refill_task:
+            self._refill_task.cancel()
+            self._refill_task = None
+
+        thread_ids = [e.thread_id for e in self._entries.values() if e.thread_id] + self._pool
+        self._entries.clear()
+        self._pool = []
+        await asyncio.gather(*(self._delete_quietly(t) for t in thread_ids))
+
+    # --- Leasing ---
+
+    @asynccontextmanager
+    async def lease(self, session_id: str, revision: Any = None) -> AsyncIterator[ThreadLease]:
+        """
+        Hold the session's thread for one turn. Turns of the same session are
+        serialized (Azure allows one active run per thread). If the turn fails
+        the thread is dropped, because it may contain a dangling message or run.
+
+        revision is the session state the caller's history reflects (with a
+        next() method giving the state after this turn is stored); a thread
+        that has not seen exactly that state is replaced.
+        """
+        entry = self._entries.get(session_id)
+        if entry is None or self._is_expired(entry):
+            if entry is not None:
+                self._discard(session_id, entry)
+            entry = _CachedThread()
+            self._entries[session_id] = entry
+            self._evict_overflow()
+        else:
+            self._entries.move_to_end(session_id)
+
+        async with entry.lock:
+            if revision is not None and entry.turns and entry.revision != revision:
+                # Turns were stored by another worker since this thread's last turn
+                self.stale_threads += 1
+                if entry.thread_id:
+                    self._delete_in_background(entry.thread_id)
+                entry.thread_id = None
+                entry.turns = 0
+            if entry.thread_id is None:
+                entry.thread_id = await self._take_pooled_thread()
+
+            try:
+                yield ThreadLease(thread_id=entry.thread_id, is_new=entry.turns == 0)
+            except BaseException:
+                self._discard(session_id, entry)
+                raise
+            else:
+                entry.turns += 1
+                entry.last_used = time.monotonic()
+                entry.revision = revision.next() if revision is not None else None
+            finally:
+                if entry.retired and entry.thread_id:
+                    self._delete_in_background(entry.thread_id)
+                    entry.thread_id = None
+
+    def invalidate(self, session_id: str) -> None:
+        """Forget a session's thread (e.g. when the session ends)."""
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            self._discard(session_id, entry)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._entries),
+            "pooled_threads": len(self._pool),
+            "pool_hits": self.pool_hits,
+            "pool_misses": self.pool_misses,
+            "stale_threads": self.stale_threads,
+        }
+
+    # --- Internals ---
+
+    def _is_expired(self, entry: _CachedThread) -> bool:
+        return time.monotonic() - entry.last_used > self.ttl_seconds
+
+    def _discard(self, session_id: str, entry: _CachedThread) -> None:
+        if self._entries.get(session_id) is entry:
+            del self._entries[session_id]
+        self._retire(entry)
+
+    def _retire(self, entry: _CachedThread) -> None:
+        # A thread in use is deleted when its lease is released
+        if entry.lock.locked():
+            entry.retired = True
+        elif entry.thread_id:
+            self._delete_in_background(entry.thread_id)
+            entry.thread_id = None
+
+    def _evict_overflow(self) -> None:
+        while len(self._entries) > self.max_sessions:
+            _, oldest = self._entries.popitem(last=False)
+            self._retire(oldest)
+
+    async def _take_pooled_thread(self) -> str:
+        thread_id = self._pool.pop() if self._pool else None
+        self._schedule_refill()
+        if thread_id is None:
+            self.pool_misses += 1
+            thread_id = await self._create_thread()
+        else:
+            self.pool_hits += 1
+        return thread_id
+
+    def _schedule_refill(self) -> None:
+        if self.pool_size > 0 and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.create_task(self._refill_pool())
+
+    async def _refill_pool(self) -> None:
+        while len(self._pool) < self.pool_size:
+            try:
+                self._pool.append(await self._create_thread())
+            except Exception as e:
+                print(f"Error pre-creating agent thread: {e}")
+                return
+
+    async def _reap_loop(self) -> None:
+        while True:
+            try:
+                self._reap_expired()
+                self._schedule_refill()
+            except Exception as e:
+                print(f"Error reaping agent threads: {e}")
+            await asyncio.sleep(self.reap_interval)
+
+    def _reap_expired(self) -> None:
+        expired = [
+            (session_id, entry)
+            for session_id, entry in self._entries.items()
+            if not entry.lock.locked() and self._is_expired(entry)
+        ]
+        for session_id, entry in expired:
+            self._discard(session_id, entry)
+
+    def _delete_in_background(self, thread_id: str) -> None:
+        task = asyncio.create_task(self._delete_quietly(thread_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _delete_quietly(self, thread_id: str) -> None:
+        try:
+            await self._delete_thread(thread_id)
+        except Exception:
+            pass
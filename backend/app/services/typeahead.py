@@ -0,0 +1,133 @@
+"""
+Typeahead - Prefix index for FAQ search autocomplete
+
+Completions (FAQ questions, FAQ tags and the follow-up suggestion phrases)
+are normalized once (accent/case folding, punctuation dropped) and stored
+as a sorted array of keys: the whole phrase plus one key per later word, so
+"hiv te" completes "How accurate are HIV tests?" and "tests" does too. A
+lookup is a binary search for the first key with the prefix followed by a
+scan of the matching range; candidates are ranked by popularity.
+
+Popularity is counted in-process (FAQ views, chat messages that are exactly
+a completion, e.g. a clicked suggestion) on top of a base score per kind,
+and survives FAQ reloads because it is keyed by locale and normalized text.
+"""
+
+import bisect
+import heapq
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.text_index import fold
+
+_WORD = re.compile(r"\w+")
+
+# Base popularity per kind: FAQ questions first, then suggestion phrases, then tags
+KIND_WEIGHTS = {"faq": 3.0, "suggestion": 2.0, "tag": 1.0}
+
+# Keep scans bounded for one-letter prefixes on large corpora
+MAX_SCAN = 2000
+
+
+def normalize(text: str) -> str:
+    """Folded words joined by single spaces: "What's PrEP?" -> "what s prep"."""
+    return " ".join(_WORD.findall(fold(text)))
+
+
+@dataclass(frozen=True)
+class Completion:
+    text: str
+    kind: str  # "faq", "tag" or "suggestion"
+    faq_id: Optional[str] = None
+    base: float = 0.0
+
+    def to_dict(self) -> Dict[str, str]:
+        item = {"text": self.text, "type": self.kind}
+        if self.faq_id is not None:
+            item["faqId"] = self.faq_id
+        return item
+
+
+class Popularity:
+    """Use counts per (locale, normalized completion text)."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+
+    def record(self, locale: str, text: str) -> None:
+        self._counts[(locale, normalize(text))] += 1
+
+    def get(self, locale: str, key: str) -> int:
+        return self._counts.get((locale, key), 0)
+
+
+popularity = Popularity()
+
+
+class PrefixIndex:
+    """Immutable sorted-array prefix index over the completions of one locale."""
+
+    def __init__(self, locale: str, completions: Iterable[Completion], counts: Popularity = popularity):
+        self.locale = locale
+        self._counts = counts
+        self._completions: List[Completion] = []
+        self._normalized: List[str] = []
+        by_text: Dict[str, int] = {}
+        keys: List[Tuple[str, int, int]] = []  # (key, word position, completion)
+        for completion in completions:
+            normalized = normalize(completion.text)
+            if not normalized or normalized in by_text:
+                continue
+            by_text[normalized] = len(self._completions)
+            self._completions.append(completion)
+            self._normalized.append(normalized)
+            words = normalized.split(" ")
+            for position in range(len(words)):
+                keys.append((" ".join(words[position:]), position, by_text[normalized]))
+        keys.sort()
+        self._keys = [key for key, _, _ in keys]
+        self._positions = [position for _, position, _ in keys]
+        self._targets = [target for _, _, target in keys]
+        self._by_text = by_text
+
+    def __len__(self) -> int:
+        return len(self._completions)
+
+    def contains(self, text: str) -> bool:
+        return normalize(text) in self._by_text
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Completion]:
+        """Completions with a word starting with the prefix, most popular first."""
+        query = normalize(prefix)
+        if not query:
+            return []
+        # Earliest matching word per completion
+        positions: Dict[int, int] = {}
+        start = bisect.bisect_left(self._keys, query)
+        end = bisect.bisect_left(self._keys, query + "\uffff", start, min(len(self._keys), start + MAX_SCAN))
+        for target, position in zip(self._targets[start:end], self._positions[start:end]):
+            if position < positions.get(target, MAX_SCAN):
+                positions[target] = position
+
+        # Most popular first; then matches at the start of the phrase, then shorter phrases
+        def rank(target: int) -> Tuple[float, int, int]:
+            return (
+                self._completions[target].base + self._counts.get(self.locale, self._normalized[target]),
+                -positions[target],
+                -len(self._normalized[target]),
+            )
+
+        return [self._completions[target] for target in heapq.nlargest(limit, positions, key=rank)]
+
+
+def build_index(locale: str, faqs: List[Dict], phrases: Iterable[str] = ()) -> PrefixIndex:
+    """Prefix index over a locale's FAQ questions and tags and the given suggestion phrases."""
+    completions: List[Completion] = []
+    for faq in faqs:
+        completions.append(Completion(faq["question"], "faq", faq["id"], KIND_WEIGHTS["faq"] + faq.get("popularity", 0)))
+    completions.extend(Completion(text, "suggestion", None, KIND_WEIGHTS["suggestion"]) for text in phrases)
+    for faq in faqs:
+        completions.extend(Completion(tag, "tag", None, KIND_WEIGHTS["tag"]) for tag in faq["tags"])
+    return PrefixIndex(locale, completions)
@@ -0,0 +1,151 @@
+"""
+Warm-up - Background startup warm-up and per-component readiness
+
+Heavy clients and models are built lazily on first use. At startup the
+registered warm-up steps run in the background (so the server starts
+listening at once) and pay those first-use costs before real traffic does:
+credential token fetch, agent connection pre-open, model and tokenizer load.
+
+Each component reports one of: pending, warming, ready, failed, disabled.
+The app is ready once every required component is ready and the optional
+ones have finished; an optional component that failed only means its first
+use stays slow (or degrades). A required component that failed is retried
+in the background with exponential backoff, so a credential or agent
+endpoint that was briefly unreachable at startup doesn't keep /ready at 503
+until the process restarts.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+
+@dataclass
+class _Component:
+    name: str
+    step: Callable[[], Awaitable[Optional[str]]]
+    required: bool
+    after: List[str]
+    enabled: Union[bool, Callable[[], bool]] = True
+    state: str = "pending"
+    detail: Optional[str] = None
+    seconds: Optional[float] = None
+    attempts: int = 0
+
+
+class Warmup:
+    """Runs registered warm-up steps concurrently (respecting `after`) and tracks their state."""
+
+    def __init__(self, retry_seconds: float = 5.0, max_retry_seconds: float = 300.0):
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._components: Dict[str, _Component] = {}
+        self._done: Dict[str, asyncio.Event] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._retries: Dict[str, asyncio.Task] = {}
+
+    def register(
+        self,
+        name: str,
+        step: Callable[[], Awaitable[Optional[str]]],
+        required: bool = True,
+        enabled: Union[bool, Callable[[], bool]] = True,
+        after: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Add a warm-up step. The step may return a short detail string for
+        /ready. Steps listed in `after` finish (successfully or not) first.
+        `enabled` may be a callable, checked when the step is about to run.
+        """
+        component = _Component(name=name, step=step, required=required, after=list(after or []), enabled=enabled)
+        if enabled is False:
+            component.state = "disabled"
+        self._components[name] = component
+
+    def start(self) -> None:
+        """Start warming up in the background (call from the app lifespan)."""
+        if self._task is None:
+            self._done = {name: asyncio.Event() for name in self._components}
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        retries = list(self._retries.values())
+        self._retries.clear()
+        for task in retries:
+            task.cancel()
+        await asyncio.gather(*retries, return_exceptions=True)
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def wait(self) -> None:
+        """Wait until every step has finished its first attempt (retries carry on in the background)."""
+        if self._task:
+            await asyncio.shield(self._task)
+
+    def is_ready(self) -> bool:
+        """Required components are warm and no optional one is still warming up."""
+        return all(
+            c.state in ("ready", "disabled") if c.required else c.state not in ("pending", "warming")
+            for c in self._components.values()
+        )
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready(),
+            "components": {
+                c.name: {
+                    "state": c.state,
+                    "required": c.required,
+                    "detail": c.detail,
+                    "seconds": round(c.seconds, 3) if c.seconds is not None else None,
+                    "attempts": c.attempts,
+                }
+                for c in self._components.values()
+            },
+        }
+
+    async def _run(self) -> None:
+        await asyncio.gather(*(self._run_component(c) for c in self._components.values()))
+
+    async def _run_component(self, component: _Component) -> None:
+        try:
+            for name in component.after:
+                if name in self._done:
+                    await self._done[name].wait()
+            if callable(component.enabled) and not component.enabled():
+                component.state = "disabled"
+            if component.state == "disabled":
+                return
+            await self._attempt(component)
+            if component.state == "failed" and component.required and self.retry_seconds > 0:
+                self._retries[component.name] = asyncio.create_task(self._retry(component))
+        finally:
+            self._done[component.name].set()
+
+    async def _attempt(self, component: _Component) -> None:
+        component.state = "warming"
+        component.attempts += 1
+        started = time.perf_counter()
+        try:
+            component.detail = await component.step()
+            component.state = "ready"
+        except Exception as e:
+            component.state = "failed"
+            component.detail = f"{type(e).__name__}: {e}"
+            print(f"Warm-up of {component.name} failed (attempt {component.attempts}): {e}")
+        component.seconds = time.perf_counter() - started
+
+    async def _retry(self, component: _Component) -> None:
+        """Run a failed required step again, doubling the wait each time, until it succeeds."""
+        delay = self.retry_seconds
+        while component.state == "failed":
+            await asyncio.sleep(delay)
+            await self._attempt(component)
+            delay = min(delay * 2, self.max_retry_seconds)
+        self._retries.pop(component.name, None)
@@ -0,0 +1,232 @@
+"""
+Micro-benchmark: precompiled suggestion engine vs. the original if/elif chain
+
+Checks that both produce the same English suggestions on a sample corpus,
+then times them for short and long assistant responses. The engine is meant
+to cost about the same as the chain, not less.
+
+Usage: python benchmark_suggestions.py [--repeat N]
+"""
+
+import argparse
+import random
+import timeit
+from typing import List
+
+from app.services.suggestions import SuggestionEngine
+
+SAMPLE_QUESTIONS = [
+    "Where can I get tested for HIV?",
+    "What is the window period?",
+    "I missed two doses of my medication, what should I do?",
+    "How does PrEP work?",
+    "Can I get PEP after the weekend?",
+    "How is HIV transmitted?",
+    "I feel tired and have a rash, is it HIV?",
+    "I'm scared and alone, who can I talk to?",
+    "I'm pregnant and HIV positive",
+    "How do I tell my partner?",
+    "What does U=U mean for my relationship?",
+    "Why should I start treatment early?",
+    "Hello",
+    "When will I get my result?",
+]
+
+SAMPLE_SENTENCES = [
+    "Modern HIV tests are highly accurate.",
+    "Please talk to your doctor about your options.",
+    "Treatment with antiretroviral therapy keeps the virus under control.",
+    "PrEP is a daily pill that protects you from HIV.",
+    "PEP must be started within 72 hours after a possible exposure.",
+    "Many counseling centres offer free and anonymous support.",
+    "People living with HIV who are undetectable cannot transmit the virus.",
+    "You can find more information on the Deutsche Aidshilfe website.",
+    "If you have symptoms, see a healthcare provider soon.",
+    "Condoms remain an effective prevention method.",
+]
+
+# Sentences without any topic keyword: the original chain has to run every
+# substring scan before falling through to the question-type rules
+GENERIC_SENTENCES = [
+    "Thank you for your question.",
+    "Everyone deserves a clear and friendly answer.",
+    "We are here for you.",
+    "Feel free to ask anything else.",
+    "This is a common question.",
+]
+
+
+# The original implementation, kept here as the baseline
+DEFAULT_SUGGESTIONS = ["Tell me more", "What are my options?", "Where can I get help?"]
+
+
+def legacy_generate_suggestions(user_message: str, assistant_response: str) -> List[str]:
+    """
+    Generate intelligent, context-aware follow-up suggestions based on both
+    the user's question and the agent's response.
+    """
+    user_lower = user_message.lower()
+    response_lower = assistant_response.lower()
+    
+    # Combine both for better context
+    combined_text = user_lower + " " + response_lower
+    
+    # Testing & Diagnosis
+    if any(word in combined_text for word in ["test", "testing", "diagnosis", "hiv test", "window period"]):
+        if "where" in user_lower or "location" in combined_text:
+            return ["What types of tests exist?", "How accurate are tests?", "What if I test positive?"]
+        elif "positive" in combined_text or "result" in combined_text:
+            return ["What happens next?", "Treatment options?", "Who should I tell?"]
+        elif "window" in combined_text or "when" in user_lower:
+            return ["Where to get tested?", "What happens during testing?", "Cost of testing?"]
+        else:
+            return ["Where can I get tested?", "When should I test?", "Test accuracy rates?"]
+    
+    # Treatment & Medication
+    elif any(word in combined_text for word in ["treatment", "medication", "art", "antiretroviral", "drugs", "pills", "medicine"]):
+        if "side effect" in combined_text or "problem" in combined_text:
+            return ["How to manage side effects?", "Alternative treatments?", "When to see a doctor?"]
+        elif "start" in combined_text or "begin" in combined_text:
+            return ["What to expect from treatment?", "Treatment side effects?", "Cost of medication?"]
+        elif "stop" in combined_text or "miss" in combined_text or "adhere" in combined_text:
+            return ["Importance of adherence?", "What if I miss doses?", "Reminder strategies?"]
+        else:
+            return ["How does treatment work?", "Treatment side effects?", "How long is treatment?"]
+    
+    # Prevention (PrEP/PEP)
+    elif any(word in combined_text for word in ["prevent", "prevention", "prep", "pep", "prophylaxis", "protect"]):
+        if "prep" in combined_text:
+            return ["How to get PrEP?", "PrEP side effects?", "PrEP effectiveness?"]
+        elif "pep" in combined_text:
+            return ["Where to get PEP?", "PEP timeline?", "PEP vs PrEP?"]
+        elif "condom" in combined_text:
+            return ["Other prevention methods?", "What is PrEP?", "Risk reduction strategies?"]
+        else:
+            return ["What is PrEP?", "What is PEP?", "How to reduce risk?"]
+    
+    # Living with HIV
+    elif any(word in combined_text for word in ["living with", "daily life", "lifestyle", "cope", "coping", "manage", "undetectable"]):
+        if "work" in combined_text or "job" in combined_text:
+            return ["Disclosure at work?", "Staying healthy?", "Support groups?"]
+        elif "relation" in combined_text or "partner" in combined_text or "sex" in combined_text:
+            return ["Telling partners?", "Safe sex practices?", "Undetectable = Untransmittable?"]
+        elif "u=u" in combined_text or "undetectable" in combined_text:
+            return ["How to become undetectable?", "What does U=U mean?", "Can I have children?"]
+        else:
+            return ["Staying healthy tips?", "Support resources?", "Emotional support?"]
+    
+    # Transmission & Risk
+    elif any(word in combined_text for word in ["transmit", "transmission", "risk", "expose", "exposure", "infect", "catch", "spread"]):
+        if "how" in user_lower:
+            return ["Risk levels?", "Prevention methods?", "Getting tested?"]
+        elif "partner" in combined_text:
+            return ["How to tell partner?", "Protecting partners?", "U=U explained?"]
+        else:
+            return ["Transmission risks?", "Prevention strategies?", "PrEP for partners?"]
+    
+    # Symptoms & Health
+    elif any(word in combined_text for word in ["symptom", "sick", "fever", "rash", "tired", "fatigue", "health"]):
+        if "early" in combined_text or "first" in combined_text:
+            return ["When to get tested?", "Acute HIV symptoms?", "Next steps?"]
+        else:
+            return ["When to see a doctor?", "Managing symptoms?", "Health monitoring?"]
+    
+    # Support & Resources
+    elif any(word in combined_text for word in ["support", "help", "resource", "counsel", "talk", "alone", "scared", "anxiety"]):
+        if "emotion" in combined_text or "mental" in combined_text or "depress" in combined_text:
+            return ["Mental health resources?", "Support groups?", "Counseling services?"]
+        elif "financial" in combined_text or "cost" in combined_text or "afford" in combined_text:
+            return ["Financial assistance?", "Insurance coverage?", "Free services?"]
+        else:
+            return ["Support groups near me?", "Hotline numbers?", "Online communities?"]
+    
+    # Pregnancy & Family
+    elif any(word in combined_text for word in ["pregnant", "pregnancy", "baby", "child", "mother", "breastfeed"]):
+        return ["Prevention during pregnancy?", "Safe delivery options?", "Infant testing?"]
+    
+    # Stigma & Disclosure
+    elif any(word in combined_text for word in ["stigma", "discriminat", "tell", "disclose", "secret", "shame"]):
+        return ["Disclosure strategies?", "Legal protections?", "Finding support?"]
+    
+    # Response-based suggestions when agent mentions specific topics
+    elif "doctor" in response_lower or "healthcare" in response_lower or "medical" in response_lower:
+        return ["How to find a specialist?", "What to ask my doctor?", "Preparing for appointments?"]
+    elif "immediately" in response_lower or "urgent" in response_lower or "soon" in response_lower:
+        return ["Where to get immediate help?", "Emergency resources?", "What to do now?"]
+    elif "more information" in response_lower or "learn more" in response_lower:
+        return ["Tell me more", "Related topics?", "Where to read more?"]
+    
+    # Default contextual suggestions based on question type
+    elif "?" in user_message:
+        if "how" in user_lower:
+            return ["Tell me more", "Next steps?", "Where to get help?"]
+        elif "what" in user_lower:
+            return ["How does it work?", "Why is this important?", "Related information?"]
+        elif "where" in user_lower:
+            return ["Other options?", "What to expect?", "Cost information?"]
+        elif "when" in user_lower:
+            return ["What happens next?", "How long does it take?", "Other timing questions?"]
+        elif "why" in user_lower:
+            return ["Tell me more", "What are alternatives?", "Related concerns?"]
+        else:
+            return ["Tell me more", "Related topics?", "Where to get help?"]
+    
+    # Final fallback
+    return list(DEFAULT_SUGGESTIONS)
+
+def _responses(sentences: int, count: int, pool: List[str] = SAMPLE_SENTENCES) -> List[str]:
+    rng = random.Random(sentences)
+    return [" ".join(rng.choice(pool) for _ in range(sentences)) for _ in range(count)]
+
+
+def _time_case(engine: SuggestionEngine, questions: List[str], responses: List[str], repeat: int) -> None:
+    pairs = [(q, r) for q in questions for r in responses]
+
+    def run_legacy():
+        for question, response in pairs:
+            legacy_generate_suggestions(question, response)
+
+    def run_engine():
+        for question, response in pairs:
+            engine.suggest(question, response, "en")
+
+    legacy = min(timeit.repeat(run_legacy, number=1, repeat=repeat)) / len(pairs)
+    compiled = min(timeit.repeat(run_engine, number=1, repeat=repeat)) / len(pairs)
+    chars = sum(len(r) for r in responses) // len(responses)
+    print(f"{chars:>12} chars {legacy * 1e6:>15.1f} {compiled * 1e6:>15.1f} {legacy / compiled:>7.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200, help="Timing repetitions per case")
+    args = parser.parse_args()
+
+    started = timeit.default_timer()
+    engine = SuggestionEngine()
+    print(f"Compiled {len(engine.locales)} locales in {(timeit.default_timer() - started) * 1000:.1f} ms")
+
+    # Same answers as the original for English
+    mismatches = 0
+    cases = [(q, r) for q in SAMPLE_QUESTIONS for r in _responses(3, 5) + [""]]
+    for question, response in cases:
+        if engine.suggest(question, response, "en") != legacy_generate_suggestions(question, response):
+            mismatches += 1
+            print(f"  mismatch: {question!r}")
+    print(f"Equivalence: {len(cases) - mismatches}/{len(cases)} cases identical")
+
+    repeat = max(1, args.repeat // 20)
+    header = f"{'response':>18} {'legacy us/call':>15} {'engine us/call':>15} {'speedup':>8}"
+
+    print("\nTopic keywords in the response (the original chain stops early)")
+    print(header)
+    for sentences in (1, 5, 20, 80):
+        _time_case(engine, SAMPLE_QUESTIONS, _responses(sentences, 20), repeat)
+
+    print("\nNo topic keywords (the original chain runs every scan)")
+    print(header)
+    generic_questions = ["Hello", "Thanks!", "Can you explain that again?"]
+    for sentences in (1, 5, 20, 80):
+        _time_case(engine, generic_questions, _responses(sentences, 20, GENERIC_SENTENCES), repeat)
+
+if __name__ == "__main__":
+    main()
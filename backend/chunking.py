@@ -0,0 +1,275 @@
+"""
+Chunking - Split document text into sentence-aligned retrieval chunks
+
+Chunk length is measured in the embedding model's own word-piece tokens, so
+a chunk never exceeds what the model actually embeds (128 tokens for
+paraphrase-multilingual-MiniLM-L12-v2; anything longer is truncated). Text
+is split into sentences, protecting German and English abbreviations
+("z. B.", "bzw.", "Dr.", "e.g.") and ordinals ("am 1. Dezember"), and
+sentences are packed into chunks, preferably ending at a paragraph break.
+Consecutive chunks overlap by whole sentences.
+
+With parent windows enabled, sentences are first packed into larger parent
+windows and each parent is split into child chunks: the children are
+embedded, and the parent is what retrieval returns to the LLM.
+
+chunk_pages() works over a stream of pages: it only buffers the sentence
+that may continue on the next page, and tokenizes a page's sentences in one
+batch call.
+"""
+
+import bisect
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+# Lowercase, without the trailing period; single letters ("z. B.", initials) are handled separately
+ABBREVIATIONS = frozenset({
+    # German
+    "abb", "abs", "abschn", "anm", "bd", "bspw", "bzgl", "bzw", "ca", "dgl", "dipl", "dr", "ebd",
+    "einschl", "entspr", "evtl", "gem", "ggf", "ggü", "hrsg", "inkl", "insb", "jh", "kap", "lt",
+    "med", "mio", "mrd", "nr", "prof", "rd", "sog", "str", "tab", "tel", "usw", "usf", "uvm",
+    "vgl", "zzgl", "ziff",
+    # English
+    "al", "approx", "cf", "dept", "eg", "etc", "fig", "figs", "ie", "incl", "mr", "mrs", "ms",
+    "pp", "ref", "resp", "vol", "vs",
+})
+
+_BREAK = re.compile(r"\n[ \t]*\n\s*|(?P<end>(?P<mark>[.!?…]+)[\"'»«“”„)\]]*)\s+")
+_PARAGRAPH = re.compile(r"\n[ \t]*\n")
+_LAST_WORD = re.compile(r"(\S+)$")
+_WORD = re.compile(r"\S+")
+_MAX_PENDING = 10_000  # Characters of an unfinished sentence carried over to the next page
+
+
+@dataclass
+class Chunk:
+    text: str
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    tokens: int = 0
+    parent: Optional[str] = None  # Enclosing parent window, if enabled
+    parent_index: Optional[int] = None
+
+
+@dataclass
+class _Sentence:
+    text: str
+    tokens: int
+    page_start: Optional[int]
+    page_end: Optional[int]
+    paragraph_end: bool
+
+
+def _is_sentence_end(text: str, match: re.Match) -> bool:
+    """False if the period at match is an abbreviation or ordinal rather than the end of a sentence."""
+    if match.group("mark") != ".":
+        return True
+    if _PARAGRAPH.search(match.group()):
+        return True
+    following = text[match.end():match.end() + 1]
+    if following and (following.islower() or following.isdigit()):
+        return False
+    word = _LAST_WORD.search(text, max(0, match.start() - 40), match.start())
+    if word is None:
+        return True
+    word = word.group(1).lstrip("([\"'„“»«").lower()
+    if len(word) == 1 and word.isalpha():
+        return False  # Initials, "z. B.", "u. a."
+    if "." in word:
+        return False  # "z.B.", "e.g.", "d.h."
+    if word.isdigit() and len(word) <= 2:
+        return False  # Ordinals and list numbers ("1. Dezember", "2. Diagnostik")
+    return word not in ABBREVIATIONS
+
+
+def split_sentences(text: str) -> list[tuple[int, int, bool]]:
+    """(start, end, ends paragraph) spans of the sentences in text; the last may be unfinished."""
+    spans = []
+    start = 0
+    for match in _BREAK.finditer(text):
+        if match.group("end") is not None and not _is_sentence_end(text, match):
+            continue
+        end = match.start() + len(match.group("end") or "")
+        if text[start:end].strip():
+            spans.append((start, end, bool(_PARAGRAPH.search(match.group()))))
+        elif spans and _PARAGRAPH.search(match.group()):
+            spans[-1] = (spans[-1][0], spans[-1][1], True)
+        start = match.end()
+    if text[start:].strip():
+        spans.append((start, len(text), False))
+    return spans
+
+
+class TokenChunker:
+    """Sentence-aligned chunks measured in the embedding model's tokens."""
+
+    def __init__(
+        self,
+        tokenizer=None,
+        max_tokens: int = 128,
+        overlap_tokens: int = 32,
+        parent_tokens: int = 0,
+    ):
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.parent_tokens = parent_tokens if parent_tokens > max_tokens else 0
+
+    @classmethod
+    def for_model(cls, model, max_tokens: Optional[int] = None, **kwargs) -> "TokenChunker":
+        """Chunker using a SentenceTransformer's tokenizer, sized to its sequence limit by default."""
+        if max_tokens is None:
+            # The limit includes the two special tokens the model adds ([CLS]/[SEP] or <s>/</s>)
+            max_tokens = (getattr(model, "max_seq_length", None) or 128) - 2
+        return cls(getattr(model, "tokenizer", None), max_tokens=max_tokens, **kwargs)
+
+    @property
+    def settings(self) -> str:
+        return f"tokens:{self.max_tokens}/{self.overlap_tokens}/{self.parent_tokens}"
+
+    def count_tokens(self, texts: list[str]) -> list[int]:
+        """Word-piece token counts (estimated if there is no tokenizer), in one batch call."""
+        if not texts:
+            return []
+        if self.tokenizer is None:
+            # Multilingual text averages roughly 3 characters per token
+            return [-(-len(text) // 3) for text in texts]
+        return [len(ids) for ids in self.tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+    def chunk_pages(self, pages: Iterable[tuple[Optional[int], str]]) -> Iterator[Chunk]:
+        """Chunk a stream of (page number, text) pages; each chunk carries the pages it spans."""
+        sentences = self._sentences(pages)
+        if not self.parent_tokens:
+            for group in self._pack(sentences, self.max_tokens, self.overlap_tokens):
+                yield self._chunk(group)
+            return
+        for parent_index, parent_group in enumerate(self._pack(sentences, self.parent_tokens, 0)):
+            parent = _join(parent_group, paragraphs=True)
+            for group in self._pack(parent_group, self.max_tokens, self.overlap_tokens):
+                chunk = self._chunk(group)
+                chunk.parent = parent
+                chunk.parent_index = parent_index
+                yield chunk
+
+    def chunk_text(self, text: str) -> list[Chunk]:
+        return list(self.chunk_pages([(None, text)]))
+
+    def _chunk(self, group: list[_Sentence]) -> Chunk:
+        return Chunk(
+            _join(group),
+            group[0].page_start,
+            group[-1].page_end,
+            sum(sentence.tokens for sentence in group),
+        )
+
+    def _sentences(self, pages: Iterable[tuple[Optional[int], str]]) -> Iterator[_Sentence]:
+        buffer = ""
+        offset = 0  # Document position of buffer[0]
+        page_offsets: list[int] = []  # Document position where each buffered page begins
+        page_numbers: list[Optional[int]] = []
+
+        def page_at(position: int) -> Optional[int]:
+            return page_numbers[max(0, bisect.bisect_right(page_offsets, position) - 1)]
+
+        def measure(spans: list[tuple[int, int, bool]]) -> Iterator[_Sentence]:
+            # Line breaks inside a sentence are PDF layout, not structure
+            texts = [" ".join(buffer[start:end].split()) for start, end, _ in spans]
+            for (start, end, paragraph_end), text, tokens in zip(spans, texts, self.count_tokens(texts)):
+                first, last = page_at(offset + start), page_at(offset + end - 1)
+                if tokens <= self.max_tokens:
+                    yield _Sentence(text, tokens, first, last, paragraph_end)
+                else:
+                    yield from self._split_long(text, first, last, paragraph_end)
+
+        for page_number, text in pages:
+            page_offsets.append(offset + len(buffer))
+            page_numbers.append(page_number)
+            buffer += text
+            spans = split_sentences(buffer)
+            if not spans:
+                continue
+            # The last sentence may continue on the next page (unless it is already implausibly long)
+            keep = 0 if spans[-1][2] or len(buffer) - spans[-1][0] > _MAX_PENDING else 1
+            done = spans[:len(spans) - keep]
+            yield from measure(done)
+            cut = spans[-1][0] if keep else len(buffer)
+            buffer = buffer[cut:]
+            offset += cut
+            first = max(0, bisect.bisect_right(page_offsets, offset) - 1)
+            del page_offsets[:first], page_numbers[:first]
+
+        yield from measure(split_sentences(buffer))
+
+    def _split_long(self, text: str, page_start, page_end, paragraph_end: bool) -> Iterator[_Sentence]:
+        """
+        Split a sentence longer than max_tokens (tables, lists without periods)
+        at word boundaries; a single word over the limit stays whole.
+        """
+        words = _WORD.findall(text)
+        pieces: list[str] = []
+        size = 0
+        for word, tokens in zip(words, self.count_tokens(words)):
+            if pieces and size + tokens > self.max_tokens:
+                yield _Sentence(" ".join(pieces), size, page_start, page_end, False)
+                pieces, size = [], 0
+            pieces.append(word)
+            size += tokens
+        if pieces:
+            yield _Sentence(" ".join(pieces), size, page_start, page_end, paragraph_end)
+
+    @staticmethod
+    def _pack(sentences: Iterable[_Sentence], budget: int, overlap: int) -> Iterator[list[_Sentence]]:
+        """
+        Greedily pack sentences into groups of at most budget tokens, ending at a
+        paragraph break in the second half if there is one; each group starts
+        with up to overlap tokens of trailing sentences from the previous one.
+        """
+        current: list[_Sentence] = []
+        size = 0
+        carried = 0  # Leading sentences repeated from the previous group
+        paragraph_cut = 0  # len(current) at the last paragraph break
+
+        for sentence in sentences:
+            while current and size + sentence.tokens > budget:
+                cut = len(current)
+                if carried < paragraph_cut < cut and sum(s.tokens for s in current[:paragraph_cut]) >= budget // 2:
+                    cut = paragraph_cut
+                if cut <= carried:
+                    # Only the overlap is left and the sentence doesn't fit with it: drop the overlap
+                    current = current[carried:]
+                    paragraph_cut = max(0, paragraph_cut - carried)
+                    carried = 0
+                    size = sum(s.tokens for s in current)
+                    continue
+                yield current[:cut]
+                tail: list[_Sentence] = []
+                tail_size = 0
+                for previous in reversed(current[carried:cut]):
+                    if tail_size + previous.tokens > overlap or len(tail) + 1 >= cut - carried:
+                        break
+                    tail.insert(0, previous)
+                    tail_size += previous.tokens
+                current = tail + current[cut:]
+                carried = len(tail)
+                paragraph_cut = max((i + 1 for i in range(carried, len(current)) if current[i].paragraph_end), default=0)
+                size = sum(s.tokens for s in current)
+            current.append(sentence)
+            size += sentence.tokens
+            if sentence.paragraph_end:
+                paragraph_cut = len(current)
+
+        if len(current) > carried:
+            yield current
+
+
+def _join(sentences: list[_Sentence], paragraphs: bool = False) -> str:
+    # Embedded chunks are joined with plain spaces so their token count is the sum of their sentences'
+    if not paragraphs:
+        return " ".join(sentence.text for sentence in sentences)
+    parts = []
+    for sentence in sentences[:-1]:
+        parts.append(sentence.text)
+        parts.append("\n\n" if sentence.paragraph_end else " ")
+    parts.append(sentences[-1].text)
+    return "".join(parts)
@@ -0,0 +1,47 @@
+"""
+Shared pytest setup
+
+The app is imported with offline defaults: the fake agent backend, no model
+loading at startup and a throwaway session database, so the tests need no
+Azure credentials, downloaded models or network access.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault("AGENT_BACKEND", "fake")
+os.environ.setdefault("WARMUP_LOAD_MODELS", "false")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "false")
+os.environ.setdefault("FAQ_RELOAD_INTERVAL", "0")
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("SESSION_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="sessions-"), "sessions.sqlite3"))
+
+# Needs a populated vector database and the embedding model; run it directly instead
+collect_ignore = ["test_knowledge_base.py"]
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    """
+    A fast, deterministic fake agent client in place of the shared one, with
+    fresh per-loop chat pipeline state (each test runs its own event loop).
+    """
+    from app.services import chat_service
+    from app.services.fake_agent import FakeAgentConfig, FakeProjectClient
+    from app.services.resilience import CircuitBreaker
+    from app.services.single_flight import SingleFlight
+    from app.services.thread_cache import ThreadCache
+
+    client = FakeProjectClient(FakeAgentConfig(api_latency=0.0, queue_seconds=0.0, run_seconds=0.05, run_sigma=0.0, seed=1))
+    monkeypatch.setattr(chat_service, "client", client)
+    monkeypatch.setattr(chat_service, "_run_semaphore", None)
+    monkeypatch.setattr(chat_service, "coalescer", SingleFlight())
+    monkeypatch.setattr(chat_service, "circuit_breaker", CircuitBreaker())
+    monkeypatch.setattr(chat_service, "thread_cache", ThreadCache(
+        create_thread=chat_service._create_empty_thread,
+        delete_thread=chat_service._delete_thread,
+        pool_size=0,
+    ))
+    return client
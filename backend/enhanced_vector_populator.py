@@ -1,20 +1,38 @@
 import os
 import logging
-import uuid
+import time
 import asyncio
+from collections import Counter
+from typing import Iterable
 from chromadb import PersistentClient
-from sentence_transformers import SentenceTransformer
-import fitz  # PyMuPDF for PDF Parsing
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
 from urllib.parse import urlparse
 import re
 
+from chunking import Chunk, TokenChunker
+from ingest_manifest import IngestManifest, chunk_id, content_sha256, file_sha256
+from pdf_extractor import PdfExtractor
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger("EnhancedVectorPopulator")
 
-# Initialize SentenceTransformer model
-model = SentenceTransformer("sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+# The model, database and chunker are created on first use, not at import, so
+# importing this script (worker processes, tests) stays cheap
+_model = None
+_chroma_client = None
+_collection = None
+_chunker = None
+
+
+def get_model():
+    """Load the SentenceTransformer model once."""
+    global _model
+    if _model is None:
+        from sentence_transformers import SentenceTransformer
+        _model = SentenceTransformer(MODEL_NAME)
+    return _model
 
 class EmbeddingFunction:
     def __init__(self, model):
@@ -38,17 +56,187 @@ class EmbeddingFunction:
         return embedding.tolist()
 
     def name(self):
-        return "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+        return MODEL_NAME
 
-# Initialize persistent ChromaDB client
+# Persistent ChromaDB storage
 persist_directory = "./hybrid_database"
-chroma_client = PersistentClient(path=persist_directory)
 
-# Create or load the collection with the embedding function
-embedding_fn = EmbeddingFunction(model)
-collection = chroma_client.get_or_create_collection(
-    name="hybrid-rag-knowledge-base", embedding_function=embedding_fn
-)
+
+def get_chroma_client() -> PersistentClient:
+    global _chroma_client
+    if _chroma_client is None:
+        _chroma_client = PersistentClient(path=persist_directory)
+    return _chroma_client
+
+
+def get_collection():
+    """Create or load the collection with the embedding function."""
+    global _collection
+    if _collection is None:
+        _collection = get_chroma_client().get_or_create_collection(
+            name="hybrid-rag-knowledge-base", embedding_function=EmbeddingFunction(get_model())
+        )
+    return _collection
+
+# Incremental ingestion: per-source content hashes; a change of model or
+# chunking settings re-embeds everything (as does INGEST_FORCE=true)
+MANIFEST_PATH = os.path.join(persist_directory, "ingest_manifest.json")
+
+# Chunks are sized in model tokens, up to what the model embeds (its sequence
+# limit by default); each is stored with its enclosing parent window, which is
+# what retrieval returns (INGEST_PARENT_TOKENS=0 stores chunks on their own)
+chunk_limit = os.getenv("INGEST_CHUNK_TOKENS")
+CHUNK_OVERLAP_TOKENS = int(os.getenv("INGEST_CHUNK_OVERLAP_TOKENS", "32"))
+PARENT_TOKENS = int(os.getenv("INGEST_PARENT_TOKENS", "384"))
+INGEST_FORCE = os.getenv("INGEST_FORCE", "false").lower() == "true"
+
+
+def get_chunker() -> TokenChunker:
+    global _chunker
+    if _chunker is None:
+        _chunker = TokenChunker.for_model(
+            get_model(),
+            max_tokens=int(chunk_limit) if chunk_limit else None,
+            overlap_tokens=CHUNK_OVERLAP_TOKENS,
+            parent_tokens=PARENT_TOKENS,
+        )
+    return _chunker
+
+
+def ingest_version() -> str:
+    """Model and chunking settings; stored chunks are re-embedded when this changes."""
+    return f"{MODEL_NAME}|{get_chunker().settings}"
+
+
+def load_manifest() -> IngestManifest:
+    manifest = IngestManifest(MANIFEST_PATH, ingest_version())
+    if manifest.rebuild:
+        logger.info("Ingestion settings changed since the last run: re-embedding all sources")
+    manifest.rebuild = manifest.rebuild or INGEST_FORCE
+    return manifest
+
+
+# Ingestion batching: chunks are buffered and written with few large encode and
+# upsert calls instead of one model call and one SQLite/HNSW write per chunk
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "4096"))  # Chunks buffered before a flush
+ENCODE_BATCH_SIZE = int(os.getenv("INGEST_ENCODE_BATCH_SIZE", "64"))  # Texts per model forward pass
+# Encoder processes; >1 spreads encoding over a sentence-transformers process pool (0 = all cores)
+ENCODE_PROCESSES = int(os.getenv("INGEST_ENCODE_PROCESSES", "1"))
+
+
+class BatchedUpserter:
+    """Buffers chunks, encodes them in large batches and writes them with batched upserts."""
+
+    def __init__(self, collection, model, batch_size: int = INGEST_BATCH_SIZE,
+                 encode_batch_size: int = ENCODE_BATCH_SIZE, processes: int = ENCODE_PROCESSES,
+                 max_upsert: int | None = None):
+        self.collection = collection
+        self.model = model
+        self.batch_size = batch_size
+        self.encode_batch_size = encode_batch_size
+        self.processes = processes if processes > 0 else (os.cpu_count() or 1)
+        # Chroma rejects writes above the client's maximum batch size
+        self.max_upsert = max_upsert or get_chroma_client().get_max_batch_size()
+        self._pool = None
+        self._ids: list[str] = []
+        self._documents: list[str] = []
+        self._metadatas: list[dict] = []
+        self.chunks_written = 0
+        self.encode_seconds = 0.0
+        self.upsert_seconds = 0.0
+
+    def __enter__(self):
+        if self.processes > 1:
+            self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.processes)
+            logger.info(f"Started {self.processes} encoder processes")
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            if self._pool is not None:
+                self.model.stop_multi_process_pool(self._pool)
+                self._pool = None
+        elapsed = time.perf_counter() - self._started
+        if self.chunks_written:
+            logger.info(
+                f"Wrote {self.chunks_written} chunks in {elapsed:.1f}s "
+                f"({self.chunks_written / elapsed:.1f} chunks/s; encode {self.encode_seconds:.1f}s, "
+                f"upsert {self.upsert_seconds:.1f}s)"
+            )
+
+    def add(self, chunk_id: str, document: str, metadata: dict) -> None:
+        self._ids.append(chunk_id)
+        self._documents.append(document)
+        self._metadatas.append(metadata)
+        if len(self._ids) >= self.batch_size:
+            self.flush()
+
+    def rewrite_metadata(self, ids: list[str], metadatas: list[dict]) -> None:
+        """
+        Apply metadata changed after add() (e.g. totals known only at the end of
+        a source): buffered chunks already share the dicts, written ones are updated.
+        """
+        pending = set(self._ids)
+        written = [(chunk_id, metadata) for chunk_id, metadata in zip(ids, metadatas) if chunk_id not in pending]
+        for start in range(0, len(written), self.max_upsert):
+            batch = written[start:start + self.max_upsert]
+            self.collection.update(ids=[chunk_id for chunk_id, _ in batch], metadatas=[metadata for _, metadata in batch])
+
+    def discard(self, ids: list[str]) -> None:
+        """Drop chunks added earlier (e.g. of a source that failed halfway), buffered or written."""
+        if not ids:
+            return
+        dropped = set(ids)
+        pending = set(self._ids)
+        kept = [i for i, chunk_id in enumerate(self._ids) if chunk_id not in dropped]
+        self._ids = [self._ids[i] for i in kept]
+        self._documents = [self._documents[i] for i in kept]
+        self._metadatas = [self._metadatas[i] for i in kept]
+        written = [chunk_id for chunk_id in ids if chunk_id not in pending]
+        self.delete(written)
+        self.chunks_written -= len(written)
+
+    def delete(self, ids: list[str]) -> None:
+        """Delete stored chunks by ID, in batches."""
+        for start in range(0, len(ids), self.max_upsert):
+            self.collection.delete(ids=ids[start:start + self.max_upsert])
+
+    def flush(self) -> None:
+        if not self._ids:
+            return
+        ids, documents, metadatas = self._ids, self._documents, self._metadatas
+        self._ids, self._documents, self._metadatas = [], [], []
+
+        started = time.perf_counter()
+        embeddings = self.model.encode(
+            documents,
+            batch_size=self.encode_batch_size,
+            show_progress_bar=False,
+            pool=self._pool,
+        )
+        encoded = time.perf_counter()
+        for start in range(0, len(ids), self.max_upsert):
+            end = start + self.max_upsert
+            self.collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+            )
+        upserted = time.perf_counter()
+
+        self.encode_seconds += encoded - started
+        self.upsert_seconds += upserted - encoded
+        self.chunks_written += len(ids)
+        logger.info(
+            f"Flushed {len(ids)} chunks: {len(ids) / max(upserted - started, 1e-9):.1f} chunks/s "
+            f"(encode {encoded - started:.1f}s, upsert {upserted - encoded:.1f}s)"
+        )
+
 
 def clean_markdown_content(content: str) -> str:
     """Clean markdown content to remove navigation, headers, and boilerplate."""
@@ -74,64 +262,10 @@ def clean_markdown_content(content: str) -> str:
     
     return content.strip()
 
-def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 200) -> list[str]:
-    """
-    Split text into overlapping chunks for better retrieval.
-    
-    Args:
-        text: The text to chunk
-        chunk_size: Maximum characters per chunk
-        overlap: Number of characters to overlap between chunks
-    """
-    if len(text) <= chunk_size:
-        return [text]
-    
-    chunks = []
-    start = 0
-    
-    while start < len(text):
-        end = start + chunk_size
-        
-        # Try to break at a sentence or paragraph boundary
-        if end < len(text):
-            # Look for paragraph break first
-            paragraph_break = text.rfind('\n\n', start, end)
-            if paragraph_break > start + chunk_size // 2:
-                end = paragraph_break
-            else:
-                # Look for sentence break
-                sentence_break = max(
-                    text.rfind('. ', start, end),
-                    text.rfind('! ', start, end),
-                    text.rfind('? ', start, end)
-                )
-                if sentence_break > start + chunk_size // 2:
-                    end = sentence_break + 1
-        
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        
-        start = end - overlap if end < len(text) else len(text)
-    
-    return chunks
-
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text from a PDF file using PyMuPDF."""
-    text = ""
-    try:
-        logger.info(f"Reading PDF: {pdf_path}")
-        document = fitz.open(pdf_path)
-        for page_num, page in enumerate(document):
-            text += page.get_text()
-            logger.info(f"Extracted text from Page {page_num + 1}")
-        logger.info(f"Total text extracted: {len(text)} characters from {pdf_path}")
-    except Exception as e:
-        logger.error(f"Error reading PDF file '{pdf_path}': {e}")
-    return text
-
 async def crawl_urls_batch(urls: list[str]) -> list[dict]:
     """Crawl multiple URLs using the modern Crawl4AI API."""
+    from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+
     logger.info(f"Starting to crawl {len(urls)} URLs...")
     
     run_config = CrawlerRunConfig(
@@ -180,90 +314,184 @@ async def crawl_urls_batch(urls: list[str]) -> list[dict]:
     
     return crawled_data
 
-def populate_pdfs(pdf_folder: str):
-    """Populate the ChromaDB vector collection with PDFs."""
+def sync_source(
+    writer: BatchedUpserter,
+    source: str,
+    chunks: Iterable[Chunk],
+    base_metadata: dict,
+    rebuild: bool = False,
+    min_length: int = 200,
+) -> tuple[int, int, int] | None:
+    """
+    Bring one source's chunks in the collection up to date. Chunk IDs are
+    derived from source and text: new chunks are embedded and written,
+    chunks with unchanged text only get their metadata refreshed (unless
+    rebuilding), and chunks the source no longer produces are deleted.
+    Returns (added, kept, deleted), or None if the source had too little
+    text (nothing is changed then).
+    """
+    existing = set(writer.collection.get(where={"source": source}, include=[])["ids"])
+    ids: list[str] = []
+    metadatas: list[dict] = []
+    added: list[str] = []
+    occurrences: Counter = Counter()
+    characters = 0
+    try:
+        for i, chunk in enumerate(chunks):
+            # Repeated text (e.g. a running header) gets one ID per occurrence
+            text_hash = content_sha256(chunk.text)
+            occurrence = occurrences[text_hash]
+            occurrences[text_hash] += 1
+            chunk_key = chunk_id(source, chunk.text, occurrence)
+            metadata = {**base_metadata, "chunk_index": i, "content_length": len(chunk.text), "token_count": chunk.tokens}
+            if chunk.page_start is not None:
+                metadata["page_start"] = chunk.page_start
+                metadata["page_end"] = chunk.page_end
+            if chunk.parent is not None:
+                metadata["parent_index"] = chunk.parent_index
+                metadata["parent"] = chunk.parent
+            if chunk_key not in existing or rebuild:
+                writer.add(chunk_key, chunk.text, metadata)
+                added.append(chunk_key)
+            ids.append(chunk_key)
+            metadatas.append(metadata)
+            characters += len(chunk.text)
+    except Exception:
+        writer.discard(added)
+        raise
+
+    if characters <= min_length:
+        writer.discard(added)
+        return None
+
+    # The chunk count is known only once the whole source has been streamed
+    for metadata in metadatas:
+        metadata["total_chunks"] = len(ids)
+    writer.rewrite_metadata(ids, metadatas)
+    stale = list(existing - set(ids))
+    writer.delete(stale)
+    return len(added), len(ids) - len(added), len(stale)
+
+
+def remove_sources(manifest: IngestManifest, source_type: str, current: set[str]) -> int:
+    """Delete the chunks of sources that are no longer configured (file removed, URL dropped)."""
+    removed = 0
+    for source in manifest.of_type(source_type):
+        if source not in current:
+            get_collection().delete(where={"source": source})
+            manifest.forget(source)
+            logger.info(f"Removed chunks of deleted source '{source}'")
+            removed += 1
+    return removed
+
+
+def populate_pdfs(pdf_folder: str, writer: BatchedUpserter | None = None, manifest: IngestManifest | None = None):
+    """
+    Populate the ChromaDB vector collection with PDFs. Pages are extracted in
+    parallel and streamed into the chunker; each chunk records its page range.
+    PDFs whose file hash is in the manifest are skipped.
+    """
     logger.info(f"Loading PDFs from folder: {pdf_folder}")
     
     if not os.path.exists(pdf_folder):
         logger.warning(f"PDF folder '{pdf_folder}' does not exist. Skipping PDF processing.")
         return
+    if writer is None or manifest is None:
+        manifest = manifest or load_manifest()
+        with BatchedUpserter(get_collection(), get_model()) as writer:
+            populate_pdfs(pdf_folder, writer, manifest)
+        manifest.save()
+        return
     
-    pdf_count = 0
-    chunk_count = 0
+    file_names = sorted(name for name in os.listdir(pdf_folder) if name.endswith(".pdf"))
+    unchanged = updated = 0
+    added = kept = deleted = 0
     
-    for file_name in os.listdir(pdf_folder):
-        if file_name.endswith(".pdf"):
+    with PdfExtractor() as extractor:
+        for file_name in file_names:
             pdf_path = os.path.join(pdf_folder, file_name)
+            content_hash = file_sha256(pdf_path)
+            if manifest.is_current(file_name, content_hash):
+                unchanged += 1
+                continue
             logger.info(f"Processing PDF: {file_name}")
             
-            text = extract_text_from_pdf(pdf_path)
-            
-            if text.strip() and len(text) > 200:
-                # Chunk the PDF content
-                chunks = chunk_text(text, chunk_size=1000, overlap=200)
-                logger.info(f"Split PDF into {len(chunks)} chunks")
-                
-                for i, chunk in enumerate(chunks):
-                    unique_id = str(uuid.uuid4())
-                    collection.add(
-                        ids=[unique_id],
-                        documents=[chunk],
-                        metadatas=[{
-                            "source": file_name,
-                            "source_type": "pdf",
-                            "title": file_name.replace(".pdf", ""),
-                            "chunk_index": i,
-                            "total_chunks": len(chunks),
-                            "content_length": len(chunk)
-                        }]
-                    )
-                    chunk_count += 1
-                
-                pdf_count += 1
-                logger.info(f"Successfully added PDF '{file_name}' ({len(chunks)} chunks) to vector store.")
-            else:
+            try:
+                result = sync_source(
+                    writer,
+                    file_name,
+                    get_chunker().chunk_pages(extractor.iter_pages(pdf_path)),
+                    {"source": file_name, "source_type": "pdf", "title": file_name.replace(".pdf", "")},
+                    rebuild=manifest.rebuild,
+                )
+            except Exception as e:
+                logger.error(f"Error reading PDF file '{pdf_path}': {e}")
+                continue
+            if result is None:
                 logger.warning(f"Could not extract sufficient content from PDF '{file_name}'.")
+                continue
+            
+            manifest.record(file_name, "pdf", content_hash, sum(result[:2]))
+            updated += 1
+            added, kept, deleted = added + result[0], kept + result[1], deleted + result[2]
+            logger.info(f"Synced PDF '{file_name}': {result[0]} new, {result[1]} unchanged, {result[2]} deleted chunks.")
     
-    logger.info(f"Total PDFs processed: {pdf_count} ({chunk_count} chunks)")
+    removed = remove_sources(manifest, "pdf", set(file_names))
+    logger.info(
+        f"PDFs: {updated} updated, {unchanged} unchanged, {removed} removed "
+        f"({added} chunks added, {kept} kept, {deleted} deleted)"
+    )
 
-async def populate_urls(urls: list[str]):
-    """Populate the ChromaDB vector collection with URL content using modern Crawl4AI."""
+async def populate_urls(urls: list[str], writer: BatchedUpserter | None = None, manifest: IngestManifest | None = None):
+    """
+    Populate the ChromaDB vector collection with URL content using modern Crawl4AI.
+    Pages whose normalized content hash is in the manifest are skipped.
+    """
     logger.info(f"Processing {len(urls)} URLs...")
+    if writer is None or manifest is None:
+        manifest = manifest or load_manifest()
+        with BatchedUpserter(get_collection(), get_model()) as writer:
+            await populate_urls(urls, writer, manifest)
+        manifest.save()
+        return
     
     crawled_data = await crawl_urls_batch(urls)
     
-    url_count = 0
-    chunk_count = 0
+    unchanged = updated = 0
+    added = kept = deleted = 0
     
     for data in crawled_data:
+        content_hash = content_sha256(data['content'])
+        if manifest.is_current(data['url'], content_hash):
+            unchanged += 1
+            continue
         try:
             # Chunk the content for better retrieval
-            chunks = chunk_text(data['content'], chunk_size=1000, overlap=200)
-            logger.info(f"Split '{data['title']}' into {len(chunks)} chunks")
-            
-            for i, chunk in enumerate(chunks):
-                unique_id = str(uuid.uuid4())
-                collection.add(
-                    ids=[unique_id],
-                    documents=[chunk],
-                    metadatas=[{
-                        "source": data['url'],
-                        "source_type": "url",
-                        "title": data['title'],
-                        "chunk_index": i,
-                        "total_chunks": len(chunks),
-                        "content_length": len(chunk)
-                    }]
-                )
-                chunk_count += 1
+            result = sync_source(
+                writer,
+                data['url'],
+                get_chunker().chunk_pages([(None, data['content'])]),
+                {"source": data['url'], "source_type": "url", "title": data['title']},
+                rebuild=manifest.rebuild,
+            )
+            if result is None:
+                continue
             
-            url_count += 1
-            logger.info(f"Successfully added URL '{data['title']}' ({len(chunks)} chunks) to vector store.")
+            manifest.record(data['url'], "url", content_hash, sum(result[:2]))
+            updated += 1
+            added, kept, deleted = added + result[0], kept + result[1], deleted + result[2]
+            logger.info(f"Synced URL '{data['title']}': {result[0]} new, {result[1]} unchanged, {result[2]} deleted chunks.")
             
         except Exception as e:
             logger.error(f"Error adding URL {data['url']} to vector store: {e}")
     
-    logger.info(f"Total URLs processed: {url_count} ({chunk_count} chunks)")
+    # Pages that failed to crawl this time keep their chunks; only dropped URLs are removed
+    # (crawled URLs count too, as a redirect can change the URL a page is stored under)
+    removed = remove_sources(manifest, "url", set(urls) | {data['url'] for data in crawled_data})
+    logger.info(
+        f"URLs: {updated} updated, {unchanged} unchanged, {removed} removed "
+        f"({added} chunks added, {kept} kept, {deleted} deleted)"
+    )
 
 async def populate_knowledge_base():
     """Main function to populate knowledge base from both PDFs and URLs."""
@@ -289,17 +517,22 @@ async def populate_knowledge_base():
     ]
     
     try:
+        collection = get_collection()
         initial_count = collection.count()
         logger.info(f"Initial collection size: {initial_count} documents")
         
-        populate_pdfs(pdf_folder_path)
-        await populate_urls(hiv_urls)
+        # One writer for all sources, so batches span documents; the manifest
+        # is saved only once everything it records has been written
+        manifest = load_manifest()
+        with BatchedUpserter(collection, get_model()) as writer:
+            populate_pdfs(pdf_folder_path, writer, manifest)
+            await populate_urls(hiv_urls, writer, manifest)
+        manifest.save()
         
         final_count = collection.count()
-        new_docs = final_count - initial_count
         
         logger.info("Knowledge base population completed!")
-        logger.info(f"Added {new_docs} new document chunks")
+        logger.info(f"Collection size changed by {final_count - initial_count:+d} chunks")
         logger.info(f"Total documents in collection: {final_count}")
         
         try:
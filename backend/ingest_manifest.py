@@ -0,0 +1,79 @@
+"""
+Ingest Manifest - Content hashes for incremental, idempotent re-ingestion
+
+The manifest (JSON, next to the vector database) records a content hash per
+source: the file hash for PDFs and the hash of the normalized crawled text
+for URLs. A source whose hash is unchanged is skipped. Chunk IDs are derived
+from the source and the chunk text, so re-ingesting a changed source
+rewrites the same IDs instead of adding duplicates, and chunks that are gone
+can be found and deleted.
+
+The manifest also records the pipeline version (embedding model and chunking
+settings); if that changes, every source counts as changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Optional
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_sha256(text: str) -> str:
+    """Hash of text with whitespace runs collapsed, so reflowed pages hash the same."""
+    return hashlib.sha256(re.sub(r"\s+", " ", text).strip().encode("utf-8")).hexdigest()
+
+
+def chunk_id(source: str, text: str, occurrence: int = 0) -> str:
+    """Deterministic ID of the occurrence-th chunk with this text in a source."""
+    return hashlib.sha256(f"{source}\0{occurrence}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+
+class IngestManifest:
+    """Per-source content hashes, persisted as JSON."""
+
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+        self.sources: dict[str, dict] = {}
+        self.rebuild = False  # Re-embed everything (pipeline version changed, or forced)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == version:
+                self.sources = data.get("sources", {})
+            else:
+                self.rebuild = True
+
+    def is_current(self, source: str, content_hash: str) -> bool:
+        if self.rebuild:
+            return False
+        entry = self.sources.get(source)
+        return entry is not None and entry["hash"] == content_hash
+
+    def record(self, source: str, source_type: str, content_hash: str, chunks: int) -> None:
+        self.sources[source] = {"type": source_type, "hash": content_hash, "chunks": chunks}
+
+    def forget(self, source: str) -> None:
+        self.sources.pop(source, None)
+
+    def of_type(self, source_type: str) -> list[str]:
+        return [source for source, entry in self.sources.items() if entry["type"] == source_type]
+
+    def get(self, source: str) -> Optional[dict]:
+        return self.sources.get(source)
+
+    def save(self) -> None:
+        # Write to a temporary file and rename, so an interrupted run never leaves a partial manifest
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "sources": self.sources}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,195 @@
+"""
+Load test for the chat API
+
+Drives POST /api/chat/text (or /text/stream) at one or more concurrency
+levels and reports throughput and p50/p95/p99 latency per level.
+
+By default the FastAPI app is served by uvicorn inside this process (on a
+free localhost port) against the fake agent backend (AGENT_BACKEND=fake, see
+app/services/fake_agent.py), so no Azure access is needed. Requests go over
+real HTTP, so streamed tokens arrive as they are sent and the time to first
+token is measured. Use --url to load-test a running server instead.
+
+Usage:
+    python load_test.py --concurrency 1,8,32 --requests 200
+    python load_test.py --stream --turns 3 --unique 0.2
+    python load_test.py --url http://localhost:8000 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+QUESTIONS = [
+    "Where can I get tested for HIV?",
+    "What is PrEP and who should take it?",
+    "How soon after exposure should I take PEP?",
+    "What does undetectable mean?",
+    "Can HIV be transmitted through kissing?",
+    "How accurate are HIV self-tests?",
+    "What are the side effects of HIV treatment?",
+    "Is HIV treatment free in Germany?",
+    "Wo kann ich mich anonym testen lassen?",
+    "Comment obtenir la PrEP ?",
+]
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    latencies: List[float] = field(default_factory=list)
+    first_token: List[float] = field(default_factory=list)
+    errors: int = 0
+    models: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _question(rng: random.Random, unique_ratio: float, n: int) -> str:
+    """A question from the shared pool, or (unique_ratio of the time) one nobody asked before."""
+    if rng.random() < unique_ratio:
+        return f"Question {n}: {rng.choice(QUESTIONS)} (variant {rng.random():.6f})"
+    return rng.choice(QUESTIONS)
+
+
+@asynccontextmanager
+async def _client(url: Optional[str]) -> AsyncIterator[httpx.AsyncClient]:
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=300) as client:
+            yield client
+        return
+
+    # In-process: serve the app with uvicorn on a free local port. An ASGI
+    # transport would buffer each response, hiding the time to first token.
+    os.environ.setdefault("AGENT_BACKEND", "fake")
+    os.environ.setdefault("SESSION_DB_PATH", os.path.join(tempfile.mkdtemp(), "sessions.sqlite3"))
+    import uvicorn
+    from main import app
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            if serving.done():
+                serving.result()  # Surface the startup error
+                raise RuntimeError("uvicorn exited during startup")
+            await asyncio.sleep(0.05)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300) as client:
+            yield client
+    finally:
+        server.should_exit = True
+        await serving
+
+
+async def _chat(client: httpx.AsyncClient, stream: bool, payload: Dict, result: LevelResult) -> None:
+    started = time.perf_counter()
+    first_token = None
+    try:
+        if stream:
+            data = None
+            async with client.stream("POST", "/api/chat/text/stream", json=payload) as response:
+                response.raise_for_status()
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                        if event == "token" and first_token is None:
+                            first_token = time.perf_counter() - started
+                    elif line.startswith("data: ") and event in ("done", "error"):
+                        data = json.loads(line[len("data: "):])
+            if data is None or event == "error":
+                raise RuntimeError((data or {}).get("error", "stream ended without a done event"))
+        else:
+            response = await client.post("/api/chat/text", json=payload)
+            response.raise_for_status()
+            data = response.json()
+            if data.get("model_used") is None:
+                raise RuntimeError("error response")
+        result.models[data.get("model_used")] += 1
+        result.latencies.append(time.perf_counter() - started)
+        if first_token is not None:
+            result.first_token.append(first_token)
+    except Exception:
+        result.errors += 1
+
+
+async def _run_level(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    total: int,
+    turns: int,
+    unique_ratio: float,
+    stream: bool,
+    seed: int,
+) -> LevelResult:
+    result = LevelResult(concurrency=concurrency)
+    rng = random.Random(seed)
+    counter = iter(range(total))
+
+    async def user() -> None:
+        # Each simulated user has its own session and asks `turns` questions in a row
+        while True:
+            session = (await client.post("/api/session")).json()["sessionId"]
+            for _ in range(turns):
+                n = next(counter, None)
+                if n is None:
+                    return
+                payload = {"message": _question(rng, unique_ratio, n), "sessionId": session}
+                await _chat(client, stream, payload, result)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _report(result: LevelResult) -> None:
+    done = len(result.latencies)
+    line = f"{result.concurrency:>11} {done:>6} {result.errors:>6} {done / result.elapsed:>9.2f}"
+    if done:
+        line += "".join(f" {_percentile(result.latencies, q) * 1000:>9.0f}" for q in (0.50, 0.95, 0.99))
+    if result.first_token:
+        line += f" {_percentile(result.first_token, 0.50) * 1000:>11.0f}"
+    print(line + "   " + ", ".join(f"{m}={c}" for m, c in result.models.most_common()))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test for the chat API")
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app with the fake agent)")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Chat requests per concurrency level")
+    parser.add_argument("--turns", type=int, default=1, help="Questions per session")
+    parser.add_argument("--unique", type=float, default=1.0, help="Share of questions that are unique (rest repeat a small pool)")
+    parser.add_argument("--stream", action="store_true", help="Use the SSE streaming endpoint")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    async with _client(args.url) as client:
+        header = f"{'concurrency':>11} {'ok':>6} {'errors':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        if args.stream:
+            header += f" {'ttft p50 ms':>11}"
+        print(header + "   model_used")
+        for level in (int(c) for c in args.concurrency.split(",")):
+            _report(await _run_level(client, level, args.requests, args.turns, args.unique, args.stream, args.seed))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
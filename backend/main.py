@@ -1,11 +1,12 @@
 """
 FastAPI application for HIV Care Assistance backend
-TODO: Add authentication, rate limiting, logging, and monitoring
+TODO: Add authentication and logging
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
 import uvicorn
 import os
@@ -18,12 +19,34 @@ if not os.getenv("API_KEY"):
 else:
     print("✓ API_KEY loaded successfully")
 
+from app.middleware.metrics import MetricsMiddleware
 from app.routers import chat, faq, session
+from app.services import chat_service, faq_service, metrics
+from app.services.session_store import session_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep a warm pool of agent threads and reap idle session threads
+    chat_service.thread_cache.start()
+    # Open the session database and expire idle sessions in the background
+    session_store.start()
+    # Fetch the Azure token, open agent connections and load models in the background
+    chat_service.warmup.start()
+    # Reload FAQ content when the data file changes
+    faq_service.start_watching()
+    yield
+    faq_service.stop_watching()
+    # Release cached threads and pooled agent connections on shutdown
+    await chat_service.close_client()
+    await session_store.stop()
+
 
 app = FastAPI(
     title="HIV Care Support API",
     description="Backend API for HIV care support application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -37,6 +60,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency histograms and in-flight gauge for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers with API prefix
 app.include_router(chat.router, prefix="/api")
 app.include_router(faq.router, prefix="/api")
@@ -53,15 +79,30 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 503 until the startup warm-up has finished (per-component state in the body)."""
+    report = chat_service.warmup.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text-format metrics (request/stage latency, in-flight, cache and error counters)."""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/api")
 async def api_root():
     return {
         "message": "HIV Care Support API",
         "endpoints": {
             "chat": "/api/chat/text",
+            "chat_stream": "/api/chat/text/stream",
             "voice_transcribe": "/api/chat/voice/transcribe",
             "faq_search": "/api/faq/search",
-            "session": "/api/session"
+            "session": "/api/session",
+            "ready": "/ready"
         }
     }
 
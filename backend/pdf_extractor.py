@@ -0,0 +1,89 @@
+"""
+PDF Extractor - Streaming, parallel page extraction with PyMuPDF
+
+Pages are yielded one at a time, in order, as (page number, text), so a
+document is never held as one string. Large PDFs are split into page ranges
+that a process pool extracts in parallel; only a few ranges are in flight at
+once, which keeps memory bounded however long the document is.
+"""
+
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterator, Optional
+
+import fitz  # PyMuPDF for PDF Parsing
+
+logger = logging.getLogger("PdfExtractor")
+
+# Pages per worker task; PDFs with at most this many pages are read in-process
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "32"))
+# Extraction processes (0 = all cores, 1 = no pool)
+EXTRACT_PROCESSES = int(os.getenv("PDF_EXTRACT_PROCESSES", "0"))
+
+# Workers are spawned, not forked: forking a parent that has loaded torch (or
+# started any other threads) can deadlock the children. Spawned workers import
+# the calling script again, so it must not load models at import time.
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+Page = tuple[int, str]  # (1-based page number, text)
+
+
+def _extract_range(pdf_path: str, start: int, end: int) -> list[Page]:
+    """Text of pages [start, end) (0-based), numbered from 1."""
+    with fitz.open(pdf_path) as document:
+        return [(number + 1, document[number].get_text()) for number in range(start, end)]
+
+
+class PdfExtractor:
+    """Reusable page extractor; keep one open across PDFs to reuse the worker pool."""
+
+    def __init__(self, processes: int = EXTRACT_PROCESSES, pages_per_task: int = PAGES_PER_TASK):
+        self.processes = processes if processes > 0 else (os.cpu_count() or 1)
+        self.pages_per_task = max(1, pages_per_task)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def iter_pages(self, pdf_path: str) -> Iterator[Page]:
+        """Yield (page number, text) for every page, in order."""
+        with fitz.open(pdf_path) as document:
+            page_count = document.page_count
+        logger.info(f"Reading PDF: {pdf_path} ({page_count} pages)")
+
+        if self.processes <= 1 or page_count <= self.pages_per_task:
+            for start in range(0, page_count, self.pages_per_task):
+                yield from _extract_range(pdf_path, start, min(start + self.pages_per_task, page_count))
+            return
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=_MP_CONTEXT)
+        ranges = iter(range(0, page_count, self.pages_per_task))
+        in_flight: Deque[Future] = deque()
+        try:
+            while True:
+                # Keep every worker busy, plus one range queued each, but no more
+                while len(in_flight) < 2 * self.processes:
+                    start = next(ranges, None)
+                    if start is None:
+                        break
+                    end = min(start + self.pages_per_task, page_count)
+                    in_flight.append(self._executor.submit(_extract_range, pdf_path, start, end))
+                if not in_flight:
+                    return
+                yield from in_flight.popleft().result()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
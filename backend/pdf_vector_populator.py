@@ -1,9 +1,9 @@
 import os
 import logging
-import uuid
 from chromadb import PersistentClient
 from sentence_transformers import SentenceTransformer
 import fitz  # PyMuPDF for PDF Parsing
+from ingest_manifest import chunk_id, file_sha256
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -57,20 +57,30 @@ def populate_vector_store(pdf_folder: str):
     for file_name in os.listdir(pdf_folder):
         if file_name.endswith(".pdf"):
             pdf_path = os.path.join(pdf_folder, file_name)
+            # One document per PDF, under an ID derived from the file name, so
+            # re-running replaces it instead of adding a duplicate
+            content_hash = file_sha256(pdf_path)
+            document_id = chunk_id(file_name, "")
+            stored = collection.get(where={"source": file_name}, include=["metadatas"])
+            if stored["ids"] == [document_id] and stored["metadatas"][0].get("content_hash") == content_hash:
+                logger.info(f" Skipped unchanged file: {file_name}")
+                continue
             logger.info(f" Processing file: {file_name}")
 
             # Extract the content of the PDF file
             text = extract_text_from_pdf(pdf_path)
 
-            # Generate unique IDs and add extracted text to the collection
             if text.strip():
-                unique_id = str(uuid.uuid4())  # Generate a unique document ID
-                collection.add(
-                    ids=[unique_id],    # Add the unique ID
+                collection.upsert(
+                    ids=[document_id],
                     documents=[text],   # Extracted content
-                    metadatas=[{"source": file_name}]  # Metadata about source
+                    metadatas=[{"source": file_name, "content_hash": content_hash}]  # Metadata about source
                 )
-                logger.info(f" Successfully added '{file_name}' to the vector store (ID: {unique_id}).")
+                # Remove copies added under random IDs by earlier versions of this script
+                stale = [stored_id for stored_id in stored["ids"] if stored_id != document_id]
+                if stale:
+                    collection.delete(ids=stale)
+                logger.info(f" Successfully added '{file_name}' to the vector store (ID: {document_id}).")
             else:
                 logger.warning(f"⚠️ Could not extract content from '{file_name}'.")
         else:
@@ -0,0 +1,88 @@
+"""Tests for chat admission control and rate limiting."""
+
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected, RateLimiter
+
+
+def test_requests_queue_for_a_slot_in_order():
+    admission = AdmissionController(max_concurrent=1, max_queue=4, max_queue_wait=10.0, initial_service_time=0.1)
+    order = []
+
+    async def request(name):
+        ticket = await admission.acquire()
+        order.append(name)
+        await asyncio.sleep(0.01)
+        ticket.release()
+        ticket.release()  # Idempotent
+
+    async def scenario():
+        await asyncio.gather(*(request(n) for n in "abc"))
+
+    asyncio.run(scenario())
+    assert order == ["a", "b", "c"]
+    assert admission.stats()["active"] == 0 and admission.stats()["admitted"] == 3
+
+
+def test_full_queue_and_long_expected_wait_are_rejected_at_once():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=1, max_queue_wait=10.0, initial_service_time=1.0)
+        held = await admission.acquire()
+        queued = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as full:
+            await admission.acquire()
+        held.release()
+        (await queued).release()
+
+        slow = AdmissionController(max_concurrent=1, max_queue=8, max_queue_wait=10.0, initial_service_time=30.0)
+        slow_held = await slow.acquire()
+        with pytest.raises(AdmissionRejected) as too_long:
+            await slow.acquire()
+        # The request's own deadline also bounds the wait
+        fast = AdmissionController(max_concurrent=1, max_queue=8, max_queue_wait=10.0, initial_service_time=2.0)
+        await fast.acquire()
+        with pytest.raises(AdmissionRejected) as past_deadline:
+            await fast.acquire(max_wait=1.0)
+        slow_held.release()
+        return full.value, too_long.value, past_deadline.value
+
+    full, too_long, past_deadline = asyncio.run(scenario())
+    assert full.reason == "queue_full"
+    assert too_long.reason == "queue_wait" and too_long.retry_after_header == "30"
+    assert past_deadline.reason == "queue_wait"
+
+
+def test_waiter_that_times_out_leaves_the_queue():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=4, max_queue_wait=0.05, initial_service_time=0.01)
+        held = await admission.acquire()
+        with pytest.raises(AdmissionRejected) as timeout:
+            await admission.acquire()
+        queued_after = admission.stats()["queued"]
+        held.release()
+        return timeout.value, queued_after, admission.stats()["active"]
+
+    timeout, queued, active = asyncio.run(scenario())
+    assert timeout.reason == "queue_timeout"
+    assert queued == 0 and active == 0
+
+
+def test_rate_limiter_allows_a_burst_then_limits(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.admission.time.monotonic", lambda: now[0])
+    limiter = RateLimiter("session", rate_per_minute=60, burst=2)
+
+    assert [limiter.check("s1") for _ in range(2)] == [0.0, 0.0]
+    assert limiter.check("s1") == pytest.approx(1.0)
+    assert limiter.check("s2") == 0.0  # Separate bucket per key
+    now[0] += 1.0
+    assert limiter.check("s1") == 0.0  # One token refilled
+    assert limiter.stats()["limited"] == 1
+
+
+def test_disabled_rate_limiter_never_limits():
+    limiter = RateLimiter("ip")
+    assert all(limiter.check("1.2.3.4") == 0.0 for _ in range(100))
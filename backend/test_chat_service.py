@@ -0,0 +1,61 @@
+"""Tests for the chat pipeline, run against the in-process fake agent backend."""
+
+import asyncio
+import time
+
+from app.services import chat_service
+
+
+def test_single_turn_run_returns_answer_and_deletes_thread(fake_client):
+    answer = asyncio.run(chat_service.call_llm_with_history([{"role": "user", "content": "What is PrEP?"}]))
+
+    assert "You asked: What is PrEP?" in answer
+    assert fake_client.agents._backend.threads == {}
+
+
+def test_concurrent_runs_do_not_block_each_other(fake_client):
+    async def run_many():
+        messages = [{"role": "user", "content": f"Question {i}"} for i in range(8)]
+        return await asyncio.gather(*(chat_service.call_llm_with_history([m]) for m in messages))
+
+    started = time.perf_counter()
+    answers = asyncio.run(run_many())
+
+    assert [a.split(". ")[0] for a in answers] == [f"(simulated) You asked: Question {i}" for i in range(8)]
+    # Eight 50 ms runs waited on concurrently, not one after another
+    assert time.perf_counter() - started < 0.3
+
+
+async def _collect(events):
+    return [event async for event in events]
+
+
+def test_stream_yields_tokens_then_done(fake_client):
+    events = asyncio.run(_collect(chat_service.stream_text_message(
+        "Tell me something about the weather in Munich", session_id="stream-test",
+    )))
+
+    tokens = [e["data"]["text"] for e in events if e["event"] == "token"]
+    assert len(tokens) > 1
+    assert [e["event"] for e in events[len(tokens):]] == ["done"]
+    done = events[-1]["data"]
+    assert done["response"] == "".join(tokens)
+    assert done["model_used"] == "azure-agent"
+
+
+def test_stream_endpoint_sends_server_sent_events(fake_client):
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as http:
+        response = http.post(
+            "/api/chat/text/stream",
+            json={"message": "Tell me something about the weather in Munich", "sessionId": "sse-test"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [b for b in response.text.split("\n\n") if b]
+    assert all(b.startswith("event: ") and "\ndata: " in b for b in blocks)
+    assert blocks[0].startswith("event: token")
+    assert blocks[-1].startswith("event: done")
@@ -0,0 +1,86 @@
+"""Tests for sentence splitting and token-sized chunking."""
+
+import pytest
+
+from chunking import TokenChunker, split_sentences
+
+
+def _word_tokenizer(texts, add_special_tokens=False):
+    """One token per word."""
+    return {"input_ids": [[0] * len(text.split()) for text in texts]}
+
+
+def _sentences(text):
+    return [text[start:end] for start, end, _ in split_sentences(text)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Die PEP wirkt z. B. gut. Sie ist wichtig.", ["Die PEP wirkt z. B. gut.", "Sie ist wichtig."]),
+    ("Siehe Dr. Meier bzw. die Klinik. Danach testen.", ["Siehe Dr. Meier bzw. die Klinik.", "Danach testen."]),
+    ("Am 1. Dezember ist Welt-AIDS-Tag. Er ist wichtig.", ["Am 1. Dezember ist Welt-AIDS-Tag.", "Er ist wichtig."]),
+    ("Use a test, e.g. a rapid one. It works!", ["Use a test, e.g. a rapid one.", "It works!"]),
+    ("Is it safe? Yes. Really…", ["Is it safe?", "Yes.", "Really…"]),
+])
+def test_split_sentences_protects_abbreviations_and_ordinals(text, expected):
+    assert _sentences(text) == expected
+
+
+def test_split_sentences_marks_paragraph_ends():
+    spans = split_sentences("First one. Second one\n\nThird one.")
+    assert [paragraph_end for _, _, paragraph_end in spans] == [False, True, False]
+
+
+def _document(sentences=12, words=6):
+    return " ".join(f"Sentence {i} " + "word " * (words - 3) + "end." for i in range(sentences))
+
+
+def test_chunks_stay_within_the_token_limit_and_overlap():
+    chunker = TokenChunker(_word_tokenizer, max_tokens=20, overlap_tokens=6)
+
+    chunks = chunker.chunk_text(_document())
+
+    assert len(chunks) > 1
+    assert all(chunk.tokens <= 20 and chunk.tokens == len(chunk.text.split()) for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        last_sentence = previous.text.split("Sentence")[-1]
+        assert chunk.text.startswith("Sentence" + last_sentence)
+
+
+def test_overlong_sentence_is_split_at_words():
+    chunker = TokenChunker(_word_tokenizer, max_tokens=10, overlap_tokens=0)
+
+    chunks = chunker.chunk_text(" ".join(["cell"] * 25))
+
+    assert [chunk.tokens for chunk in chunks] == [10, 10, 5]
+
+
+def test_children_carry_their_parent_window():
+    chunker = TokenChunker(_word_tokenizer, max_tokens=12, overlap_tokens=0, parent_tokens=24)
+
+    chunks = chunker.chunk_text(_document())
+
+    parents = {}
+    for chunk in chunks:
+        assert chunk.text in chunk.parent
+        parents.setdefault(chunk.parent_index, chunk.parent)
+        assert parents[chunk.parent_index] == chunk.parent
+    assert len(parents) == 3 and all(len(parent.split()) <= 24 for parent in parents.values())
+
+
+def test_streamed_pages_chunk_like_the_whole_text_and_record_pages():
+    chunker = TokenChunker(_word_tokenizer, max_tokens=20, overlap_tokens=6)
+    text = _document()
+    # Page breaks in the middle of sentences
+    pages = [(1, text[:50]), (2, text[50:170]), (3, text[170:])]
+
+    streamed = list(chunker.chunk_pages(pages))
+
+    assert [chunk.text for chunk in streamed] == [chunk.text for chunk in chunker.chunk_text(text)]
+    assert streamed[0].page_start == 1 and streamed[-1].page_end == 3
+    assert all(chunk.page_start <= chunk.page_end for chunk in streamed)
+
+
+def test_without_a_tokenizer_tokens_are_estimated():
+    chunker = TokenChunker(None)
+    assert chunker.count_tokens(["abcdefg", ""]) == [3, 0]
+    assert chunker.settings == "tokens:128/32/0"
@@ -0,0 +1,107 @@
+"""Tests for request deadlines and how an expired client deadline is accounted."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services import chat_service
+from app.services.deadline import Deadline, DeadlineExceeded
+from app.services.resilience import CircuitBreaker
+
+
+def _budget(header=None, field=None) -> float:
+    return Deadline.from_request(header, field, default_seconds=60.0, max_seconds=120.0, min_seconds=1.0).budget_seconds
+
+
+@pytest.mark.parametrize("header, field, expected", [
+    ("30", None, 30.0),
+    ("30", 10.0, 30.0),       # Header wins
+    (None, 10.0, 10.0),
+    (None, None, 60.0),
+    ("soon", None, 60.0),
+    ("0", None, 60.0),
+    ("-5", None, 60.0),
+    ("nan", None, 60.0),
+    ("inf", None, 60.0),
+    (None, float("nan"), 60.0),
+    ("0.01", None, 1.0),      # Clamped up to the minimum
+    ("1e9", None, 120.0),     # Clamped down to the maximum
+])
+def test_budget_from_request(header, field, expected):
+    assert _budget(header, field) == expected
+
+
+def test_check_raises_once_expired():
+    deadline = Deadline(0.0)
+    assert deadline.expired() and deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded):
+        deadline.check("agent run")
+    Deadline(10.0).check("agent run")
+
+
+@pytest.fixture
+def slow_agent(fake_client, monkeypatch):
+    """A fake agent slower than the test deadlines, and a breaker that would open on one failure."""
+    fake_client.agents._backend.config.run_seconds = 0.5
+    breaker = CircuitBreaker(failure_threshold=0.5, min_calls=1)
+    monkeypatch.setattr(chat_service, "circuit_breaker", breaker)
+    return breaker
+
+
+QUESTION = "Tell me something about the weather in Munich"
+
+
+def test_client_deadline_does_not_count_as_backend_failure(slow_agent):
+    result = asyncio.run(chat_service.process_text_message(QUESTION, "deadline-a", deadline=Deadline(0.05)))
+
+    assert "deadline" in result["error"]
+    assert slow_agent.state == CircuitBreaker.CLOSED
+    assert slow_agent.stats()["timeouts"] == 0 and slow_agent.stats()["errors"] == 0
+
+
+def test_client_deadline_mid_stream_does_not_count_as_backend_failure(slow_agent):
+    async def collect():
+        events = chat_service.stream_text_message(QUESTION, "deadline-b", deadline=Deadline(0.3))
+        return [event async for event in events]
+
+    events = asyncio.run(collect())
+
+    assert events[-1]["event"] == "error"
+    assert slow_agent.state == CircuitBreaker.CLOSED
+    assert slow_agent.stats()["timeouts"] == 0 and slow_agent.stats()["errors"] == 0
+
+
+def _stream(question, session_id, deadline):
+    async def collect():
+        events = chat_service.stream_text_message(question, session_id, deadline=deadline)
+        return [event async for event in events]
+
+    started = time.perf_counter()
+    events = asyncio.run(collect())
+    return events, time.perf_counter() - started
+
+
+def test_stream_deadline_covers_a_queued_run(slow_agent):
+    backend = chat_service.client.agents._backend
+    backend.config.queue_seconds = 5.0
+
+    events, elapsed = _stream(QUESTION, "deadline-c", Deadline(0.3))
+
+    assert events[-1]["event"] == "error" and "deadline" in events[-1]["data"]["error"]
+    assert elapsed < 1.0
+    assert [run.cancelled for run in backend.runs.values()] == [True]
+    assert slow_agent.state == CircuitBreaker.CLOSED and slow_agent.stats()["errors"] == 0
+
+
+def test_stream_run_timeout_cancels_the_run_and_counts_against_the_agent(slow_agent, monkeypatch):
+    backend = chat_service.client.agents._backend
+    backend.config.queue_seconds = 5.0
+    monkeypatch.setattr(chat_service.run_waiter, "timeout", 0.2)
+
+    events, elapsed = _stream(QUESTION, "deadline-d", Deadline(10.0))
+
+    assert events[-1]["event"] == "error" and "timeout" in events[-1]["data"]["error"]
+    assert elapsed < 1.0
+    assert [run.cancelled for run in backend.runs.values()] == [True]
+    assert slow_agent.stats()["timeouts"] == 1
@@ -0,0 +1,43 @@
+"""Tests for loading the shared embedding model."""
+
+import sys
+import types
+
+import pytest
+
+from app.services import embeddings
+
+
+@pytest.fixture
+def failing_model(monkeypatch):
+    """sentence_transformers whose model can't be loaded (as offline without a cached model)."""
+    attempts = []
+
+    class SentenceTransformer:
+        def __init__(self, name):
+            attempts.append(name)
+            raise OSError("model not cached and the hub is offline")
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=SentenceTransformer))
+    for name, value in (("_model", None), ("_model_failed", False), ("_model_failed_at", 0.0), ("_model_error", "")):
+        monkeypatch.setattr(embeddings, name, value)
+    return attempts
+
+
+def test_failed_load_is_not_retried_on_every_call(failing_model):
+    with pytest.raises(OSError):
+        embeddings.get_model()
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match="offline"):
+            embeddings.get_model()
+
+    assert len(failing_model) == 1
+
+
+def test_failed_load_is_retried_after_the_interval(failing_model, monkeypatch):
+    monkeypatch.setattr(embeddings, "MODEL_RETRY_SECONDS", 0.0)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            embeddings.get_model()
+
+    assert len(failing_model) == 2
@@ -0,0 +1,85 @@
+"""Tests for chat answers that skip the agent: the FAQ fast path and the semantic cache."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services import chat_service, embeddings
+from app.services.faq_fast_path import FaqFastPath
+from app.services.semantic_cache import CacheLookup, CachedAnswer
+
+
+def test_exact_question_matches_lexically():
+    fast_path = FaqFastPath(min_lexical=0.75)
+
+    match = fast_path.match_lexical("how accurate are hiv tests", "en")
+
+    assert match.faq["question"] == "How accurate are HIV tests?" and match.method == "lexical"
+    assert fast_path.match_lexical("Are HIV tests accurate when I had a cold last week?", "en") is None
+    assert fast_path.stats()["lexical_hits"] == 1 and fast_path.stats()["checked"] == 2
+
+
+def test_disabled_fast_path_never_matches():
+    assert FaqFastPath(enabled=False).match_lexical("How accurate are HIV tests?") is None
+
+
+async def _ask(stream: bool, message: str, session_id: str, **kwargs) -> dict:
+    if not stream:
+        return await chat_service.process_text_message(message, session_id, **kwargs)
+    events = [event async for event in chat_service.stream_text_message(message, session_id, **kwargs)]
+    return events[-1]["data"]
+
+
+@pytest.fixture
+def cached_answer(monkeypatch):
+    """Every single-turn question after the first is answered from the semantic cache."""
+    lookup = chat_service._lookup_answer_cache
+
+    async def lookup_answer(message, conversation_history):
+        if message == "Is there a cure yet?":
+            answer = CachedAnswer(message, "Not yet, but treatment works.", [], time.time())
+            return CacheLookup(answer=answer, vector=None)
+        return await lookup(message, conversation_history)
+
+    monkeypatch.setattr(chat_service, "_lookup_answer_cache", lookup_answer)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("question, model_used", [
+    ("How accurate are HIV tests?", "faq"),
+    ("Is there a cure yet?", "semantic-cache"),
+])
+def test_local_answer_drops_the_session_thread(fake_client, cached_answer, monkeypatch, stream, question, model_used):
+    monkeypatch.setattr(embeddings, "_tokenizer_failed", True)  # Estimate history tokens; no transformers import
+    session_id = f"local-answer-{stream}-{model_used}"
+
+    async def scenario():
+        first = await _ask(stream, "Tell me something about the weather in Munich", session_id)
+        cached = chat_service.thread_cache.stats()["sessions"]
+        # Sent as a fresh conversation, so the semantic cache is consulted
+        answer = await _ask(stream, question, session_id, conversation_history=[])
+        return first, cached, answer
+
+    first, cached, answer = asyncio.run(scenario())
+
+    assert first["model_used"] == "azure-agent" and cached == 1
+    assert answer["model_used"] == model_used
+    # The agent's thread never saw this answer; the next agent turn starts a new one
+    assert chat_service.thread_cache.stats()["sessions"] == 0
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_follow_up_with_history_skips_the_faq_match(fake_client, monkeypatch, stream):
+    monkeypatch.setattr(embeddings, "_tokenizer_failed", True)
+    monkeypatch.setattr(chat_service, "faq_fast_path", FaqFastPath())
+    history = [
+        {"role": "user", "content": "I started PrEP last week"},
+        {"role": "assistant", "content": "Great, take it every day."},
+    ]
+
+    # Word for word a curated FAQ question, but asked mid-conversation
+    answer = asyncio.run(_ask(stream, "How accurate are HIV tests?", "follow-up", conversation_history=history))
+
+    assert answer["model_used"] == "azure-agent"
+    assert chat_service.faq_fast_path.stats()["checked"] == 0
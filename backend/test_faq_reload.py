@@ -0,0 +1,96 @@
+"""Tests for reloading the FAQ data without a restart."""
+
+import asyncio
+import json
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.routers import faq as faq_router
+from app.services import faq_service
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    """A copy of the FAQ data to edit; the module's catalog is restored afterwards."""
+    for name in ("_catalog", "FAQ_DATA", "FAQ_CATEGORIES"):
+        monkeypatch.setattr(faq_service, name, getattr(faq_service, name))
+    path = tmp_path / "faqs.json"
+    shutil.copy(faq_service.FAQ_DATA_PATH, path)
+    return path
+
+
+def _edit(path, change):
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    change(raw)
+    path.write_text(json.dumps(raw, ensure_ascii=False), encoding="utf-8")
+
+
+def test_unchanged_file_is_not_reloaded(data_file):
+    report = asyncio.run(faq_service.reload(str(data_file)))
+    assert report == {"reloaded": False, "version": faq_service.get_catalog().version}
+
+
+def test_only_changed_faqs_are_reanalyzed(data_file):
+    previous = faq_service.get_catalog()
+    _edit(data_file, lambda raw: raw["de"][0].update(answer="Neue Antwort zur Prophylaxe"))
+
+    report = asyncio.run(faq_service.reload(str(data_file)))
+
+    catalog = faq_service.get_catalog()
+    assert report["reloaded"] and report["version"] == catalog.version != previous.version
+    assert report["changed"]["de"] == 1 and report["changed"]["en"] == 0
+    assert faq_service.get_faq("1", "de")["answer"] == "Neue Antwort zur Prophylaxe"
+    # Unchanged FAQs keep their serialized bodies (and ETags)
+    assert catalog.locales["en"].responses[("faq", "1")] is previous.locales["en"].responses[("faq", "1")]
+    assert faq_service.search_faqs("Prophylaxe", locale="de")[0]["id"] == "1"
+
+
+def test_force_rebuilds_an_unchanged_file(data_file):
+    report = asyncio.run(faq_service.reload(str(data_file), force=True))
+    assert report["reloaded"] and report["changed"]["en"] == 0
+
+
+@pytest.mark.parametrize("change", [
+    lambda raw: raw["en"][0].pop("answer"),
+    lambda raw: raw["en"].append(dict(raw["en"][0])),
+    lambda raw: raw.update(en=[]),
+    lambda raw: raw.update(de="Häufige Fragen"),
+    lambda raw: raw.update(fr={"1": raw["fr"][0]}),
+    lambda raw: raw.update(tr=[]),
+    lambda raw: raw["uk"].append("Що таке ПрЕП?"),
+    lambda raw: raw["en"][0].update(tags="prep"),
+    lambda raw: raw["en"][0].update(tags=["prep", 1]),
+    lambda raw: raw["en"][0].update(question=None),
+    lambda raw: raw["en"][0].update(id=["1"]),
+])
+def test_invalid_file_keeps_the_current_catalog(data_file, change):
+    previous = faq_service.get_catalog()
+    _edit(data_file, change)
+
+    with pytest.raises(ValueError):
+        asyncio.run(faq_service.reload(str(data_file)))
+    assert faq_service.get_catalog() is previous
+
+
+def test_integer_ids_are_read_as_strings(data_file):
+    _edit(data_file, lambda raw: raw["en"][0].update(id=1))
+    raw, _ = faq_service.read_data_file(str(data_file))
+    assert raw["en"][0]["id"] == "1"
+
+
+def test_reload_endpoint_needs_the_admin_token(monkeypatch):
+    monkeypatch.setattr(faq_router, "ADMIN_TOKEN", "secret")
+    with TestClient(main.app) as http:
+        assert http.post("/api/faq/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        response = http.post("/api/faq/reload", headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 200 and response.json()["reloaded"] is False
+
+
+def test_reload_endpoint_is_disabled_without_a_token(monkeypatch):
+    monkeypatch.setattr(faq_router, "ADMIN_TOKEN", "")
+    with TestClient(main.app) as http:
+        assert http.post("/api/faq/reload", headers={"X-Admin-Token": ""}).status_code == 403
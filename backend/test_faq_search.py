@@ -0,0 +1,47 @@
+"""Tests for the FAQ search endpoint's search modes."""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.services import faq_service
+
+
+@pytest.fixture
+def http():
+    faq_service.search_response_cache.clear()
+    with TestClient(main.app) as client:
+        yield client
+    faq_service.search_response_cache.clear()
+
+
+def test_lexical_search_ranks_matching_faqs(http):
+    response = http.get("/api/faq/search", params={"q": "HIV test"})
+
+    body = response.json()
+    assert response.status_code == 200 and body["mode"] == "lexical"
+    scores = [faq["score"] for faq in body["results"]]
+    assert scores and scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize("mode", ["semantic", "hybrid"])
+def test_model_failure_falls_back_to_lexical(http, monkeypatch, mode):
+    async def unavailable(*args, **kwargs):
+        raise OSError("model not cached and the hub is offline")
+
+    monkeypatch.setattr(faq_service, "semantic_search_available", lambda: True)
+    monkeypatch.setattr(faq_service, "semantic_search", unavailable)
+    monkeypatch.setattr(faq_service, "hybrid_search", unavailable)
+    lexical = http.get("/api/faq/search", params={"q": "HIV test"}).json()
+
+    response = http.get("/api/faq/search", params={"q": "HIV test", "mode": mode})
+
+    assert response.status_code == 200
+    assert response.json() == lexical
+
+
+def test_embeddings_are_stored_next_to_the_faq_data():
+    data_dir = os.path.dirname(os.path.abspath(faq_service.FAQ_DATA_PATH))
+    assert os.path.dirname(os.path.abspath(faq_service.FAQ_EMBEDDINGS_PATH)) == data_dir
@@ -0,0 +1,121 @@
+"""Tests for token-budgeted history and how it reaches the agent's threads."""
+
+import asyncio
+
+from app.services import chat_service, embeddings
+from app.services.history import HistoryCompactor
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+def _turns(count: int):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"Turn {i} has five words. More detail follows."}
+        for i in range(count)
+    ]
+
+
+def test_recent_turns_fit_the_budget_and_older_ones_are_summarized():
+    compactor = HistoryCompactor(token_budget=40, summary_token_budget=20, count_tokens=_words)
+
+    messages = compactor.compact("s", _turns(6))
+
+    summary, recent = messages[0], messages[1:]
+    assert summary["role"] == "assistant" and summary["content"].startswith("Summary of the earlier conversation:")
+    # Two 8-word turns fit the 20 tokens left for recent turns
+    assert [m["content"].split()[1] for m in recent] == ["4", "5"]
+    # Four turns are summarized; the oldest lines are trimmed to the summary budget
+    assert compactor.stats()["summarized_turns"] == 4
+    assert "- User: Turn 2 has five words." in summary["content"]
+    assert "Turn 0" not in summary["content"]
+
+
+def test_short_history_is_sent_as_is():
+    compactor = HistoryCompactor(token_budget=1000, count_tokens=_words)
+    history = _turns(4)
+
+    assert compactor.compact("s", history) == history
+    assert compactor.stats()["compactions"] == 0
+
+
+def test_oversized_latest_turn_is_cut_to_the_budget():
+    compactor = HistoryCompactor(token_budget=20, summary_token_budget=10, count_tokens=_words)
+
+    [message] = compactor.compact(None, [{"role": "user", "content": " ".join(["word"] * 40)}])
+    assert _words(message["content"]) <= 10
+
+
+class _CompactionSpy:
+    def __init__(self):
+        self.calls = []
+
+    async def compact_async(self, session_id, history):
+        self.calls.append(len(history))
+        return list(history)
+
+    def stats(self):
+        return {}
+
+
+def test_reused_thread_skips_compaction_and_limits_prompt_tokens(fake_client, monkeypatch):
+    spy = _CompactionSpy()
+    monkeypatch.setattr(chat_service, "history_compactor", spy)
+    runs = []
+    stream = fake_client.agents.runs.stream
+
+    async def recording_stream(**kwargs):
+        runs.append(kwargs)
+        return await stream(**kwargs)
+
+    monkeypatch.setattr(fake_client.agents.runs, "stream", recording_stream)
+    history = _turns(4)
+
+    async def turn(message):
+        messages = chat_service.format_messages(message, history)
+        answer = await chat_service.call_llm_with_history(messages, session_id="history-test")
+        history.extend([{"role": "user", "content": message}, {"role": "assistant", "content": answer}])
+
+    async def scenario():
+        await turn("First question")   # New thread: the history is compacted and sent
+        await turn("Second question")  # Reused thread: only the new message is sent
+        chat_service.thread_cache.invalidate("history-test")
+        await turn("Third question")   # New thread again
+
+    asyncio.run(scenario())
+
+    assert spy.calls == [4, 8]
+    assert [len(run["additional_messages"]) for run in runs] == [5, 1, 9]
+    assert all(run["max_prompt_tokens"] == chat_service.THREAD_MAX_PROMPT_TOKENS for run in runs)
+
+
+def test_turn_answered_by_another_worker_starts_a_new_thread(fake_client, monkeypatch):
+    from app.services.session_store import session_store
+
+    monkeypatch.setattr(chat_service.faq_fast_path, "enabled", False)
+    monkeypatch.setattr(embeddings, "_tokenizer_failed", True)  # Estimate history tokens; no transformers import
+    runs = []
+    stream = fake_client.agents.runs.stream
+
+    async def recording_stream(**kwargs):
+        runs.append(kwargs)
+        return await stream(**kwargs)
+
+    monkeypatch.setattr(fake_client.agents.runs, "stream", recording_stream)
+
+    async def scenario():
+        session_id = await session_store.create_session()
+        await chat_service.process_text_message("Tell me something about the weather in Munich", session_id)
+        await chat_service.process_text_message("And what about Berlin today?", session_id)
+        # Another worker (its own thread cache) answers the next turn
+        await session_store.append_turns(session_id, [("user", "And in Hamburg?"), ("assistant", "Rainy.")])
+        await chat_service.process_text_message("Which of them is warmest?", session_id)
+
+    asyncio.run(scenario())
+
+    first, second, third = runs
+    assert second["thread_id"] == first["thread_id"] and len(second["additional_messages"]) == 1
+    # The stale thread never saw the Hamburg turn: a new thread gets the full history
+    assert third["thread_id"] != first["thread_id"]
+    assert "And in Hamburg?" in [m["content"] for m in third["additional_messages"]]
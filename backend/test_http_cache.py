@@ -0,0 +1,65 @@
+"""Tests for pre-serialized FAQ responses and conditional requests."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.services.http_cache import BodyCache, CachedBody
+
+
+@pytest.fixture
+def http():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_etag_follows_the_body():
+    body = CachedBody.from_obj({"answer": "Ja, täglich"})
+
+    assert body.body == '{"answer":"Ja, täglich"}'.encode("utf-8")
+    assert body.etag == CachedBody.from_obj({"answer": "Ja, täglich"}).etag
+    assert body.etag != CachedBody.from_obj({"answer": "Nein"}).etag
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    ('"other", {etag}', True),
+    ("W/{etag}", True),
+    ('"other"', False),
+])
+def test_if_none_match(header, expected):
+    body = CachedBody.from_obj([1, 2, 3])
+    assert body.matches(header.format(etag=body.etag) if header else header) is expected
+
+
+def test_body_cache_evicts_the_least_recently_used():
+    cache = BodyCache(max_entries=2)
+    cache.put("a", CachedBody.from_obj("a"))
+    cache.put("b", CachedBody.from_obj("b"))
+    cache.get("a")
+    cache.put("c", CachedBody.from_obj("c"))
+
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.mark.parametrize("path", ["/api/faq", "/api/faq/categories", "/api/faq/1", "/api/faq/search?q=PEP"])
+def test_matching_etag_gets_304_without_a_body(http, path):
+    first = http.get(path)
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("public, max-age=")
+
+    second = http.get(path, headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 304 and second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
+
+
+def test_locales_have_their_own_etag(http):
+    english = http.get("/api/faq/1", params={"locale": "en"})
+    german = http.get("/api/faq/1", params={"locale": "de"}, headers={"If-None-Match": english.headers["etag"]})
+
+    assert german.status_code == 200
+    assert german.json()["question"].startswith("Was soll ich tun")
@@ -0,0 +1,55 @@
+"""Tests for the incremental ingestion manifest and chunk IDs."""
+
+from ingest_manifest import IngestManifest, chunk_id, content_sha256, file_sha256
+
+
+def test_content_hash_ignores_whitespace_reflow():
+    assert content_sha256("HIV  test\nresults ") == content_sha256("HIV test results")
+    assert content_sha256("HIV test results") != content_sha256("HIV test result")
+
+
+def test_file_hash_reads_in_blocks(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"x" * 10)
+    assert file_sha256(str(path), block_size=3) == file_sha256(str(path))
+
+
+def test_chunk_ids_are_stable_and_distinct():
+    assert chunk_id("a.pdf", "text") == chunk_id("a.pdf", "text")
+    ids = {chunk_id("a.pdf", "text"), chunk_id("b.pdf", "text"), chunk_id("a.pdf", "text", 1)}
+    assert len(ids) == 3
+    assert len(chunk_id("a.pdf", "text")) == 32
+
+
+def test_saved_sources_are_current_on_the_next_run(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = IngestManifest(path, "model|settings")
+    manifest.record("a.pdf", "pdf", "hash-a", 4)
+    manifest.record("https://example.org", "url", "hash-u", 2)
+    manifest.save()
+
+    reloaded = IngestManifest(path, "model|settings")
+
+    assert not reloaded.rebuild
+    assert reloaded.is_current("a.pdf", "hash-a") and not reloaded.is_current("a.pdf", "changed")
+    assert reloaded.of_type("url") == ["https://example.org"]
+    reloaded.forget("a.pdf")
+    assert reloaded.get("a.pdf") is None
+    assert not (tmp_path / "manifest.json.tmp").exists()
+
+
+def test_changed_pipeline_version_rebuilds_everything(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = IngestManifest(path, "model|v1")
+    manifest.record("a.pdf", "pdf", "hash-a", 4)
+    manifest.save()
+
+    reloaded = IngestManifest(path, "model|v2")
+
+    assert reloaded.rebuild and reloaded.sources == {}
+    assert not reloaded.is_current("a.pdf", "hash-a")
+
+
+def test_missing_manifest_starts_empty(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "missing.json"), "v")
+    assert manifest.sources == {} and not manifest.rebuild
@@ -0,0 +1,28 @@
+"""Tests for the load-test driver against the in-process server."""
+
+import asyncio
+
+import load_test
+
+
+def test_streaming_run_measures_first_token_before_completion(fake_client):
+    async def scenario():
+        async with load_test._client(None) as client:
+            return await load_test._run_level(
+                client, concurrency=2, total=4, turns=1, unique_ratio=1.0, stream=True, seed=1,
+            )
+
+    result = asyncio.run(scenario())
+
+    assert result.errors == 0 and len(result.latencies) == 4
+    assert result.models == {"azure-agent": 4}
+    # Tokens arrive over real HTTP as they are sent, not buffered until the end
+    assert len(result.first_token) == 4
+    assert max(result.first_token) < min(result.latencies)
+
+
+def test_percentile_picks_the_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert load_test._percentile(values, 0.50) == 51.0
+    assert load_test._percentile(values, 0.99) == 100.0
+    assert load_test._percentile([3.0], 0.95) == 3.0
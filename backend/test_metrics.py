@@ -0,0 +1,62 @@
+"""Tests for the in-process metrics registry and the /metrics endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.metrics import Registry, _Metric
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+    child = latency.labels("run")
+    for value in (0.05, 0.5, 0.5, 3.0):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+    assert lines[2:] == [
+        'latency_seconds_bucket{stage="run",le="0.1"} 1',
+        'latency_seconds_bucket{stage="run",le="1"} 3',
+        'latency_seconds_bucket{stage="run",le="+Inf"} 4',
+        'latency_seconds_sum{stage="run"} 4.05',
+        'latency_seconds_count{stage="run"} 4',
+    ]
+
+
+def test_counters_gauges_and_collectors():
+    registry = Registry()
+    errors = registry.counter("errors", "Errors", ["component"])
+    errors.labels('say "hi"\n').inc(2)
+    registry.gauge("in_flight", "In flight").inc()
+    assert registry.counter("errors", "Errors", ["component"]) is errors  # Registered once
+    registry.register_collector(lambda: [("cache_entries", "gauge", "Entries", [("", {}, 7)])])
+    registry.register_collector(lambda: 1 / 0)  # A failing collector doesn't break the scrape
+
+    text = registry.render()
+
+    assert '# TYPE errors_total counter\nerrors_total{component="say \\"hi\\"\\n"} 2' in text
+    assert "in_flight 1" in text
+    assert "cache_entries 7" in text
+
+
+def test_metrics_endpoint_labels_requests_by_route_template():
+    import main
+
+    with TestClient(main.app) as http:
+        assert http.get("/api/faq/1").status_code in (200, 404)
+        response = http.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/faq/{faq_id}"' in response.text
+    assert 'route="/metrics"' not in response.text
+
+
+def test_metric_types_must_define_children_and_collection():
+    class Summary(_Metric):
+        type = "summary"
+
+    with pytest.raises(TypeError):
+        Summary("rpc_seconds", "RPC latency")
@@ -0,0 +1,43 @@
+"""Tests for streaming, parallel PDF page extraction."""
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+import pdf_extractor
+from pdf_extractor import PdfExtractor
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "pages.pdf"
+    document = fitz.open()
+    for number in range(1, 8):
+        document.new_page().insert_text((72, 72), f"Page {number} text")
+    document.save(str(path))
+    document.close()
+    return str(path)
+
+
+def _numbers_and_text(pages):
+    return [(number, text.strip()) for number, text in pages]
+
+
+def test_pages_come_in_order_in_process(pdf_path):
+    with PdfExtractor(processes=1, pages_per_task=3) as extractor:
+        pages = _numbers_and_text(extractor.iter_pages(pdf_path))
+
+    assert pages == [(n, f"Page {n} text") for n in range(1, 8)]
+
+
+def test_worker_pool_yields_the_same_pages(pdf_path):
+    with PdfExtractor(processes=2, pages_per_task=2) as extractor:
+        pooled = _numbers_and_text(extractor.iter_pages(pdf_path))
+        again = _numbers_and_text(extractor.iter_pages(pdf_path))  # The pool is reused
+
+    assert pooled == again == [(n, f"Page {n} text") for n in range(1, 8)]
+
+
+def test_workers_are_spawned_not_forked():
+    assert pdf_extractor._MP_CONTEXT.get_start_method() == "spawn"
+
@@ -0,0 +1,109 @@
+"""Tests for hedged agent calls, the circuit breaker and the FAQ fallback."""
+
+import asyncio
+
+import pytest
+
+from app.services import chat_service, embeddings
+from app.services.resilience import CircuitBreaker, Hedger
+
+
+def _tripped_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=0.5, min_calls=2, open_seconds=60.0)
+    breaker.record_success()
+    breaker.record_failure(timeout=True)
+    return breaker
+
+
+def test_breaker_opens_at_the_failure_rate_and_rejects_calls():
+    breaker = CircuitBreaker(failure_threshold=0.5, min_calls=4)
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED  # Fewer than min_calls outcomes
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN  # 2 in 4
+    assert not breaker.allow()
+    assert breaker.stats()["rejections"] == 1 and breaker.stats()["times_opened"] == 1
+
+
+def test_half_open_probe_closes_or_reopens_the_circuit():
+    breaker = _tripped_breaker()
+    breaker.open_seconds = 0.0
+
+    assert breaker.allow() and breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # One probe at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+def test_abandoned_probe_frees_the_probe_slot():
+    breaker = _tripped_breaker()
+    breaker.open_seconds = 0.0
+
+    assert breaker.allow()
+    breaker.record_abandoned()
+    assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.allow()
+
+
+def _call(delay: float, result: str, log: list):
+    async def call():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log.append(f"{result} cancelled")
+            raise
+        return result
+    return call
+
+
+def test_hedge_starts_after_the_delay_and_the_faster_call_wins():
+    hedger = Hedger(enabled=True, min_delay=0.02)
+    log = []
+
+    result = asyncio.run(hedger.run(primary=_call(0.5, "primary", log), backup=_call(0.01, "backup", log)))
+
+    assert result == "backup"
+    assert log == ["primary cancelled"]
+    assert hedger.stats()["hedges"] == 1 and hedger.stats()["hedge_wins"] == 1
+
+
+def test_fast_primary_is_not_hedged():
+    hedger = Hedger(enabled=True, min_delay=0.1)
+    log = []
+
+    assert asyncio.run(hedger.run(primary=_call(0.0, "primary", log), backup=_call(0.0, "backup", log))) == "primary"
+    assert hedger.stats()["hedges"] == 0
+
+
+def test_hedge_delay_follows_observed_latencies():
+    hedger = Hedger(quantile=0.9, min_delay=0.5, min_samples=10)
+    assert hedger.delay() == 0.5
+    for latency in range(1, 11):
+        hedger.observe(float(latency))
+    assert hedger.delay() == 10.0
+
+
+def test_open_circuit_answers_from_the_faq_and_drops_the_session_thread(fake_client, monkeypatch):
+    monkeypatch.setattr(chat_service.faq_fast_path, "enabled", False)
+    monkeypatch.setattr(embeddings, "_tokenizer_failed", True)  # Estimate history tokens; no transformers import
+    session_id = "fallback-test"
+
+    async def scenario():
+        first = await chat_service.process_text_message("Tell me something about the weather in Munich", session_id)
+        cached = chat_service.thread_cache.stats()["sessions"]
+        chat_service.circuit_breaker = _tripped_breaker()
+        fallback = await chat_service.process_text_message("How accurate are HIV tests?", session_id)
+        return first, cached, fallback
+
+    first, cached, fallback = asyncio.run(scenario())
+
+    assert first["model_used"] == "azure-agent" and cached == 1
+    assert fallback["model_used"] == "faq-fallback"
+    # The agent's thread never saw the fallback answer; the next agent turn starts a new one
+    assert chat_service.thread_cache.stats()["sessions"] == 0
@@ -0,0 +1,92 @@
+"""Tests for the agent run completion strategies, run against the fake agent backend."""
+
+import asyncio
+
+import pytest
+
+from app.services.fake_agent import FakeAgentConfig, FakeAgentsClient
+from app.services.run_waiter import (
+    AdaptiveBackoffWaiter,
+    AgentRunTimeout,
+    FixedScheduleWaiter,
+    RunTimings,
+    RunWaiter,
+    StreamRunWaiter,
+    create_run_waiter,
+)
+
+
+def _agents(run_seconds: float = 0.05) -> FakeAgentsClient:
+    return FakeAgentsClient(FakeAgentConfig(api_latency=0.0, queue_seconds=0.0, run_seconds=run_seconds, run_sigma=0.0, seed=1))
+
+
+async def _start(agents: FakeAgentsClient):
+    return await agents.create_thread_and_run(agent_id="agent", thread={"messages": [{"role": "user", "content": "Hi"}]})
+
+
+def test_base_waiter_needs_a_poll_schedule():
+    with pytest.raises(TypeError):
+        RunWaiter()
+
+
+def test_fixed_schedule_speeds_down_after_two_seconds():
+    waiter = FixedScheduleWaiter()
+    assert [waiter.next_delay(n) for n in (0, 39, 40)] == [0.05, 0.05, 0.2]
+
+
+def test_adaptive_first_delay_follows_observed_durations():
+    waiter = AdaptiveBackoffWaiter(min_interval=0.05, max_interval=1.0, backoff=2.0)
+    assert waiter.next_delay(0) == 0.05  # Too few observations
+    for _ in range(10):
+        waiter.observe(2.0)
+    assert waiter.next_delay(0) == pytest.approx(1.6)
+    assert [waiter.next_delay(n) for n in (1, 2, 3, 10)] == [0.05, 0.1, 0.2, 1.0]
+
+
+def test_polling_waiter_records_timings():
+    agents = _agents()
+    waiter = AdaptiveBackoffWaiter()
+    timings = RunTimings()
+
+    async def scenario():
+        return await waiter.wait(agents, await _start(agents), timings)
+
+    run = asyncio.run(scenario())
+    assert run.status == "completed"
+    assert timings.strategy == "adaptive" and timings.polls >= 1
+    assert timings.queue_wait + timings.run >= 0.05
+
+
+def test_polling_waiter_times_out():
+    agents = _agents(run_seconds=1.0)
+    waiter = FixedScheduleWaiter(timeout=0.05)
+
+    async def scenario():
+        await waiter.wait(agents, await _start(agents), RunTimings())
+
+    with pytest.raises(AgentRunTimeout):
+        asyncio.run(scenario())
+
+
+def test_stream_waiter_completes_on_the_terminal_event():
+    agents = _agents()
+    waiter = StreamRunWaiter()
+    timings = RunTimings()
+    seen = []
+
+    async def scenario():
+        thread = await agents.threads.create()
+        stream = await agents.runs.stream(thread_id=thread.id, agent_id="agent")
+        return await waiter.wait_stream(stream, timings, on_run=seen.append)
+
+    run = asyncio.run(scenario())
+    assert run.status == "completed"
+    assert timings.strategy == "stream" and timings.polls == 0
+    assert seen[-1].id == run.id
+
+
+def test_create_run_waiter_picks_the_strategy():
+    assert isinstance(create_run_waiter("fixed"), FixedScheduleWaiter)
+    assert isinstance(create_run_waiter("Stream"), StreamRunWaiter)
+    assert isinstance(create_run_waiter("adaptive"), AdaptiveBackoffWaiter)
+    assert isinstance(create_run_waiter("unknown"), AdaptiveBackoffWaiter)
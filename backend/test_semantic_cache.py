@@ -0,0 +1,80 @@
+"""Tests for the embedding-keyed answer cache, with a stub encoder instead of the model."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services import embeddings
+from app.services.semantic_cache import SemanticCache
+
+# Questions that mean the same thing share a vector; "what's prep" is close to "What is PrEP?"
+VECTORS = {
+    "What is PrEP?": [1.0, 0.0, 0.0],
+    "what's prep": [0.99, 0.141, 0.0],
+    "Where can I get tested?": [0.0, 1.0, 0.0],
+    "Is HIV curable?": [0.0, 0.0, 1.0],
+}
+
+
+@pytest.fixture(autouse=True)
+def stub_encoder(monkeypatch):
+    async def encode_async(texts):
+        vectors = np.array([VECTORS[t] for t in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    monkeypatch.setattr(embeddings, "encode_async", encode_async)
+    monkeypatch.setattr(embeddings, "is_available", lambda: True)
+
+
+def _ask(cache: SemanticCache, question: str, answer: str = None):
+    """Look the question up; on a miss store `answer` (if given) under it."""
+    async def run():
+        lookup = await cache.lookup(question)
+        if lookup.answer is None and answer is not None:
+            cache.store(lookup, question, answer, [f"about {answer}"])
+        return lookup.answer
+
+    return asyncio.run(run())
+
+
+def test_paraphrase_hits_and_unrelated_question_misses():
+    cache = SemanticCache(threshold=0.95)
+    _ask(cache, "What is PrEP?", "PrEP answer")
+
+    hit = _ask(cache, "what's prep")
+    assert hit.response == "PrEP answer" and hit.suggestions == ["about PrEP answer"]
+    assert hit.similarity == pytest.approx(0.99, abs=1e-3)
+    assert _ask(cache, "Where can I get tested?") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_answer_is_evicted():
+    cache = SemanticCache(max_entries=2)
+    _ask(cache, "What is PrEP?", "PrEP answer")
+    _ask(cache, "Where can I get tested?", "testing answer")
+    _ask(cache, "What is PrEP?")  # Touch: the testing answer is now the oldest
+    _ask(cache, "Is HIV curable?", "cure answer")
+
+    assert cache.stats()["entries"] == 2
+    assert _ask(cache, "What is PrEP?").response == "PrEP answer"
+    assert _ask(cache, "Where can I get tested?") is None
+
+
+def test_expired_answers_are_not_returned():
+    cache = SemanticCache(ttl_seconds=0.0)
+    _ask(cache, "What is PrEP?", "PrEP answer")
+
+    assert _ask(cache, "What is PrEP?") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_disabled_cache_never_encodes(monkeypatch):
+    cache = SemanticCache(enabled=False)
+
+    async def fail(texts):
+        raise AssertionError("encoded while disabled")
+
+    monkeypatch.setattr(embeddings, "encode_async", fail)
+    assert _ask(cache, "What is PrEP?", "PrEP answer") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,113 @@
+"""Tests for the SQLite-backed session store and ending sessions."""
+
+import asyncio
+import os
+
+from app.services import session_store as session_store_module
+from app.services.session_store import SessionStore
+
+
+def _store(tmp_path, **kwargs) -> SessionStore:
+    return SessionStore(db_path=str(tmp_path / "state" / "sessions.sqlite3"), **kwargs)
+
+
+def test_turns_are_kept_as_a_ring_buffer(tmp_path):
+    store = _store(tmp_path, max_turns=4)
+
+    async def scenario():
+        session_id = await store.create_session()
+        for i in range(3):
+            await store.append_turns(session_id, [("user", f"q{i}"), ("assistant", f"a{i}")])
+        return await store.get_history(session_id)
+
+    history = asyncio.run(scenario())
+    assert [t["content"] for t in history] == ["q1", "a1", "q2", "a2"]
+    assert os.path.exists(tmp_path / "state" / "sessions.sqlite3")  # Directory created on first use
+
+
+def test_turns_appended_by_another_worker_are_seen(tmp_path):
+    worker_a, worker_b = _store(tmp_path), _store(tmp_path)
+
+    async def scenario():
+        await worker_a.append_turns("shared", [("user", "q0")])
+        assert [t["content"] for t in await worker_a.get_history("shared")] == ["q0"]
+        await worker_b.append_turns("shared", [("assistant", "a0")])
+        return await worker_a.get_history("shared")
+
+    assert [t["content"] for t in asyncio.run(scenario())] == ["q0", "a0"]
+
+
+def test_expired_session_starts_over(tmp_path):
+    store = _store(tmp_path, ttl_seconds=3600.0)
+
+    async def scenario():
+        await store.append_turns("old", [("user", "q0"), ("assistant", "a0")])
+        # Idle past the TTL, and not yet removed by the cleanup loop
+        store._connect().execute("UPDATE sessions SET last_seen = last_seen - 7200")
+        expired = await store.get_history("old")
+        await store.append_turns("old", [("user", "q1")])
+        return expired, await store.get_history("old")
+
+    expired, history = asyncio.run(scenario())
+    assert expired is None
+    assert [t["content"] for t in history] == ["q1"]
+
+
+def test_revision_identifies_the_stored_turns(tmp_path):
+    store = _store(tmp_path, ttl_seconds=3600.0)
+
+    async def scenario():
+        await store.append_turns("s", [("user", "q0")])
+        first = (await store.get_session("s")).revision
+        await store.append_turns("s", [("assistant", "a0")])
+        second = (await store.get_session("s")).revision
+        await store.delete_session("s")
+        await store.append_turns("s", [("user", "q0")])
+        await store.append_turns("s", [("assistant", "a0")])
+        return first, second, (await store.get_session("s")).revision
+
+    first, second, recreated = asyncio.run(scenario())
+    assert second == first.next()
+    # Same version count, but a different session
+    assert recreated.version == second.version and recreated != second
+
+
+def test_cleanup_deletes_expired_sessions(tmp_path):
+    store = _store(tmp_path, ttl_seconds=3600.0)
+
+    async def scenario():
+        await store.append_turns("old", [("user", "q0")])
+        await store.append_turns("new", [("user", "q0")])
+        store._connect().execute("UPDATE sessions SET last_seen = last_seen - 7200 WHERE session_id = 'old'")
+        removed = store._delete_expired()
+        return removed, await store.delete_session("old"), await store.delete_session("new")
+
+    assert asyncio.run(scenario()) == (1, False, True)
+
+
+def test_default_database_is_outside_the_source_tree():
+    backend = os.path.dirname(os.path.abspath(__file__))
+    assert not os.path.abspath(session_store_module.DEFAULT_DB_PATH).startswith(backend)
+
+
+def test_ending_a_session_forgets_its_agent_thread_and_summary(fake_client, monkeypatch):
+    from app.routers import session as session_router
+    from app.services import chat_service, embeddings
+    from app.services.history import HistoryCompactor
+
+    monkeypatch.setattr(embeddings, "_tokenizer_failed", True)  # Estimate history tokens; no transformers import
+    monkeypatch.setattr(chat_service.faq_fast_path, "enabled", False)
+    compactor = HistoryCompactor(token_budget=40, summary_token_budget=20, count_tokens=lambda text: len(text.split()))
+    monkeypatch.setattr(chat_service, "history_compactor", compactor)
+
+    async def scenario():
+        session_id = await session_store_module.session_store.create_session()
+        await chat_service.process_text_message("Tell me something about the weather in Munich", session_id)
+        compactor.compact(session_id, [{"role": "user", "content": f"Turn {i} has several words in it"} for i in range(8)])
+        before = chat_service.thread_cache.stats()["sessions"], compactor.stats()["sessions"]
+        await session_router.end_session(session_id)
+        return before, (chat_service.thread_cache.stats()["sessions"], compactor.stats()["sessions"])
+
+    before, after = asyncio.run(scenario())
+    assert before == (1, 1)
+    assert after == (0, 0)
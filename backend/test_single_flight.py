@@ -0,0 +1,94 @@
+"""Tests for coalescing identical concurrent calls."""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("q", work) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert calls == [1]
+    assert [r for r, _ in results] == ["answer"] * 5
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert flight.stats() == {"in_flight": 0, "waiters": 0, "executions": 1, "coalesced": 4}
+
+
+def test_failures_reach_every_waiter_but_are_not_replayed():
+    flight = SingleFlight()
+    attempts = []
+
+    async def work():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("agent failed")
+        return "answer"
+
+    async def scenario():
+        failed = await asyncio.gather(flight.do("q", work), flight.do("q", work), return_exceptions=True)
+        return failed, await flight.do("q", work)
+
+    failed, retry = asyncio.run(scenario())
+    assert all(isinstance(e, RuntimeError) for e in failed)
+    assert retry == ("answer", False)
+
+
+def test_one_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "answer"
+
+    async def scenario():
+        leaving = asyncio.create_task(flight.do("q", work))
+        staying = asyncio.create_task(flight.do("q", work))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(scenario()) == ("answer", True)
+    assert cancelled == []
+
+
+def test_work_is_cancelled_when_every_caller_leaves():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def scenario():
+        caller = asyncio.create_task(flight.do("q", work))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert cancelled == [1]
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,52 @@
+"""Tests for the table-driven follow-up suggestion engine."""
+
+import pytest
+
+from app.services.suggestion_rules import RULES
+from app.services.suggestions import SuggestionEngine, _minimal_keywords, phrases
+from benchmark_suggestions import (
+    GENERIC_SENTENCES,
+    SAMPLE_QUESTIONS,
+    SAMPLE_SENTENCES,
+    legacy_generate_suggestions,
+)
+
+engine = SuggestionEngine()
+
+
+@pytest.mark.parametrize("question", SAMPLE_QUESTIONS)
+def test_english_table_matches_the_original_chain(question):
+    for response in ["", *SAMPLE_SENTENCES, *GENERIC_SENTENCES, " ".join(SAMPLE_SENTENCES)]:
+        assert engine.suggest(question, response, "en") == legacy_generate_suggestions(question, response)
+
+
+@pytest.mark.parametrize("text, locale", [
+    ("Where can I get tested?", "en"),
+    ("Wo kann ich mich testen lassen?", "de"),
+    ("Où est-ce que je peux faire un test ?", "fr"),
+    ("Nerede test yaptırabilirim, bu ücretsiz mi?", "tr"),
+    ("Де можна пройти тест?", "uk"),
+    ("PrEP", "en"),  # No markers: English
+])
+def test_locale_is_detected_from_the_message(text, locale):
+    assert engine.detect_locale(text) == locale
+
+
+def test_suggestions_follow_the_detected_locale():
+    suggestions = engine.suggest("Wo kann ich mich auf HIV testen lassen?", "")
+    assert suggestions == ["Welche Testarten gibt es?", "Wie zuverlässig sind Tests?", "Was, wenn ich positiv bin?"]
+
+
+def test_unknown_locale_falls_back_to_english():
+    assert engine.suggest("Hello", "", "xx") == RULES["en"]["default"]
+    assert engine.default("xx") == RULES["en"]["default"]
+
+
+def test_keywords_containing_a_shorter_keyword_are_dropped():
+    assert _minimal_keywords(["test", "testing", "hiv test", "window period", "test"]) == ("test", "window period")
+
+
+def test_phrases_are_unique_and_include_the_defaults():
+    texts = phrases("de")
+    assert len(texts) == len(set(texts))
+    assert set(RULES["de"]["default"]) <= set(texts)
@@ -0,0 +1,69 @@
+"""Tests for text analysis and BM25 ranking."""
+
+import pytest
+
+from app.services.text_index import Analyzer, BM25Index, fold, stem_de, stem_en
+
+DOCS = [
+    ("prep", [("What is PrEP?", 3), ("prevention pill", 2), ("PrEP is a pill that prevents HIV infection.", 1)]),
+    ("side-effects", [("What are the side effects of PrEP?", 3), ("prep medication", 2), ("Most people have none.", 1)]),
+    ("testing", [("Where can I get tested?", 3), ("test", 2), ("Testing is free at many health centres.", 1)]),
+]
+
+
+def test_fold_removes_case_and_accents():
+    assert fold("Präexpositionsprophylaxe ÉTÉ") == "praexpositionsprophylaxe ete"
+
+
+@pytest.mark.parametrize("word, stem", [
+    ("tests", "test"), ("testing", "test"), ("tested", "test"), ("stopping", "stop"),
+    ("studies", "study"), ("virus", "virus"), ("hiv", "hiv"),
+])
+def test_english_stemmer(word, stem):
+    assert stem_en(word) == stem
+
+
+def test_german_stemmer_conflates_inflections():
+    assert stem_de("testen") == stem_de("tests") == stem_de("test")
+
+
+def test_analyzer_drops_stopwords_and_stems():
+    assert Analyzer("en").terms("Where can I get the tests?") == ["get", "test"]
+    german = Analyzer("de")
+    assert german.terms("Wo kann ich mich testen lassen?") == german.terms("Test lassen") == [stem_de("test"), stem_de("lassen")]
+
+
+def test_multi_word_query_ranks_the_best_match_first():
+    index = BM25Index(DOCS)
+
+    hits = index.search("prep side effects")
+
+    assert [hit.doc_id for hit in hits] == ["side-effects", "prep"]
+    assert hits[0].matched_terms == 3 and hits[1].matched_terms == 1
+    assert hits[0].score > hits[1].score > 0
+
+
+def test_field_weights_favour_question_matches():
+    index = BM25Index([
+        ("in-question", [("HIV testing", 3), ("Some answer text here.", 1)]),
+        ("in-answer", [("Something else", 3), ("Covers HIV testing too.", 1)]),
+    ])
+    assert [hit.doc_id for hit in index.search("testing")] == ["in-question", "in-answer"]
+
+
+def test_limit_and_unknown_terms():
+    index = BM25Index(DOCS)
+
+    assert len(index.search("prep", limit=1)) == 1
+    assert index.search("xylophone") == []
+    assert index.query_terms("xylophone prep PrEP") == ["prep"]
+
+
+def test_index_from_term_frequencies_matches_a_fresh_build():
+    analyzer = Analyzer()
+    rebuilt = BM25Index.from_term_frequencies(
+        ((doc_id, analyzer.term_frequencies(fields)) for doc_id, fields in DOCS), analyzer,
+    )
+    fresh = BM25Index(DOCS)
+
+    assert [(h.doc_id, h.score) for h in rebuilt.search("prep test")] == [(h.doc_id, h.score) for h in fresh.search("prep test")]
@@ -0,0 +1,122 @@
+"""Tests for the per-session agent thread cache."""
+
+import asyncio
+import itertools
+
+import pytest
+
+from app.services.session_store import SessionRevision
+from app.services.thread_cache import ThreadCache
+
+
+class FakeThreads:
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self.created = []
+        self.deleted = []
+
+    async def create(self) -> str:
+        thread_id = f"thread_{next(self._ids)}"
+        self.created.append(thread_id)
+        return thread_id
+
+    async def delete(self, thread_id: str) -> None:
+        self.deleted.append(thread_id)
+
+
+def _cache(threads: FakeThreads, **kwargs) -> ThreadCache:
+    kwargs.setdefault("pool_size", 0)
+    return ThreadCache(create_thread=threads.create, delete_thread=threads.delete, **kwargs)
+
+
+async def _turn(cache: ThreadCache, session_id: str, revision=None):
+    async with cache.lease(session_id, revision) as lease:
+        return lease
+
+
+def test_session_reuses_its_thread_after_the_first_turn():
+    threads = FakeThreads()
+    cache = _cache(threads)
+
+    async def scenario():
+        return await _turn(cache, "a"), await _turn(cache, "a"), await _turn(cache, "b")
+
+    first, second, other = asyncio.run(scenario())
+    assert first.is_new and not second.is_new
+    assert second.thread_id == first.thread_id
+    assert other.is_new and other.thread_id != first.thread_id
+
+
+def test_failed_turn_drops_the_thread():
+    threads = FakeThreads()
+    cache = _cache(threads)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            async with cache.lease("a") as lease:
+                failed = lease.thread_id
+                raise RuntimeError("run failed")
+        await asyncio.sleep(0)  # Let the background delete run
+        return failed, await _turn(cache, "a")
+
+    failed, retry = asyncio.run(scenario())
+    assert threads.deleted == [failed]
+    assert retry.is_new and retry.thread_id != failed
+
+
+def test_expired_and_overflowing_sessions_are_deleted():
+    threads = FakeThreads()
+    cache = _cache(threads, ttl_seconds=0.0, max_sessions=2)
+
+    async def scenario():
+        first = await _turn(cache, "a")
+        again = await _turn(cache, "a")  # Idle longer than the TTL: new thread
+        await _turn(cache, "b")
+        await _turn(cache, "c")  # Evicts the least recently used session ("a")
+        await asyncio.sleep(0)
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert again.is_new and again.thread_id != first.thread_id
+    assert set(threads.deleted) == {first.thread_id, again.thread_id}
+    assert cache.stats()["sessions"] == 2
+
+
+def test_first_turns_draw_from_the_warm_pool():
+    threads = FakeThreads()
+    cache = _cache(threads, pool_size=2)
+
+    async def scenario():
+        pooled = await cache.fill_pool()
+        lease = await _turn(cache, "a")
+        await cache.stop()
+        return pooled, lease
+
+    pooled, lease = asyncio.run(scenario())
+    assert pooled == 2
+    assert lease.thread_id in threads.created[:2]
+    assert cache.stats()["pool_hits"] == 1
+    # stop() deletes cached and pooled threads
+    assert set(threads.deleted) == set(threads.created)
+
+
+def test_thread_behind_the_session_revision_is_replaced():
+    threads = FakeThreads()
+    cache = _cache(threads)
+    start = SessionRevision(created_at=1.0, version=0)
+
+    async def scenario():
+        first = await _turn(cache, "s", start)
+        # This worker's turn was stored as version 1: the thread is current
+        second = await _turn(cache, "s", start.next())
+        # Another worker stored version 3 meanwhile
+        third = await _turn(cache, "s", start.next().next().next())
+        await asyncio.sleep(0)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert second.thread_id == first.thread_id and not second.is_new
+    assert third.is_new and third.thread_id != first.thread_id
+    assert threads.deleted == [first.thread_id]
+    assert cache.stats()["stale_threads"] == 1
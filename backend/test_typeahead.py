@@ -0,0 +1,68 @@
+"""Tests for the FAQ autocomplete prefix index."""
+
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+import main
+from app.services import typeahead
+from app.services.typeahead import Completion, Popularity, PrefixIndex, build_index, normalize
+
+
+def _index(counts=None) -> PrefixIndex:
+    completions = [
+        Completion("How accurate are HIV tests?", "faq", "1", 3.0),
+        Completion("Where can I get tested?", "faq", "2", 3.0),
+        Completion("testing", "tag", None, 1.0),
+        Completion("Testing", "tag", None, 1.0),  # Same text once normalized
+    ]
+    return PrefixIndex("en", completions, counts or Popularity())
+
+
+def _texts(completions):
+    return [completion.text for completion in completions]
+
+
+def test_normalize_folds_accents_case_and_punctuation():
+    assert normalize("What's  PrEP?") == "what s prep"
+    assert normalize("Übertragung, Ärztin") == "ubertragung arztin"
+
+
+def test_prefix_matches_any_word_and_duplicates_are_dropped():
+    index = _index()
+
+    assert len(index) == 3
+    assert _texts(index.suggest("hiv te")) == ["How accurate are HIV tests?"]
+    assert set(_texts(index.suggest("test"))) == {"How accurate are HIV tests?", "Where can I get tested?", "testing"}
+    assert index.suggest("  ?! ") == [] and index.suggest("xyz") == []
+
+
+def test_ranking_prefers_popular_then_earlier_and_shorter_matches():
+    counts = Popularity()
+    index = _index(counts)
+    # FAQ questions outrank tags; between them the shorter phrase wins
+    assert _texts(index.suggest("test")) == ["Where can I get tested?", "How accurate are HIV tests?", "testing"]
+
+    counts.record("en", "how accurate are hiv TESTS")
+    assert _texts(index.suggest("test", limit=1)) == ["How accurate are HIV tests?"]
+    assert counts.get("de", "how accurate are hiv tests") == 0  # Counted per locale
+
+
+def test_build_index_covers_questions_suggestions_and_tags():
+    faqs = [{"id": "7", "question": "What is PrEP?", "tags": ["prevention", "prep"]}]
+    index = build_index("en", faqs, ["What are the side effects of PrEP?"])
+
+    assert [(c.kind, c.faq_id) for c in index.suggest("prep")] == [("faq", "7"), ("suggestion", None), ("tag", None)]
+    assert index.contains("what is prep") and not index.contains("what is")
+
+
+def test_suggest_endpoint_counts_faq_views(monkeypatch):
+    monkeypatch.setattr(typeahead.popularity, "_counts", Counter())
+    with TestClient(main.app) as http:
+        before = http.get("/api/faq/suggest", params={"prefix": "hiv", "limit": 50}).json()
+        faq = [s for s in before["suggestions"] if s["type"] == "faq"][-1]
+        for _ in range(50):
+            http.get(f"/api/faq/{faq['faqId']}")
+        after = http.get("/api/faq/suggest", params={"prefix": "hiv", "limit": 1}).json()
+
+    assert after["locale"] == "en" and after["suggestions"] == [faq]
@@ -0,0 +1,126 @@
+"""Tests for batched ingestion writes, with an in-memory collection and a stub model."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from chunking import Chunk
+from enhanced_vector_populator import BatchedUpserter, sync_source
+
+
+class FakeCollection:
+    def __init__(self):
+        self.rows = {}  # id -> (document, metadata)
+        self.calls = []
+
+    def get(self, where, include):
+        return {"ids": [i for i, (_, metadata) in self.rows.items() if metadata["source"] == where["source"]]}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.calls.append(("upsert", len(ids)))
+        for chunk_id, document, metadata in zip(ids, documents, metadatas):
+            self.rows[chunk_id] = (document, dict(metadata))
+
+    def update(self, ids, metadatas):
+        self.calls.append(("update", len(ids)))
+        for chunk_id, metadata in zip(ids, metadatas):
+            self.rows[chunk_id] = (self.rows[chunk_id][0], dict(metadata))
+
+    def delete(self, ids):
+        self.calls.append(("delete", len(ids)))
+        for chunk_id in ids:
+            self.rows.pop(chunk_id, None)
+
+
+class FakeModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size, show_progress_bar, pool):
+        self.encoded.append(len(texts))
+        return [[float(len(text))] for text in texts]
+
+
+def _writer(collection, model, batch_size=4, max_upsert=3):
+    return BatchedUpserter(collection, model, batch_size=batch_size, processes=1, max_upsert=max_upsert)
+
+
+def _chunks(*texts):
+    return [Chunk(text, page_start=1, page_end=1, tokens=len(text.split())) for text in texts]
+
+
+def test_chunks_are_encoded_in_batches_and_upserted_within_the_limit():
+    collection, model = FakeCollection(), FakeModel()
+
+    with _writer(collection, model) as writer:
+        for i in range(6):
+            writer.add(f"id{i}", f"text {i}", {"source": "a.pdf"})
+
+    assert model.encoded == [4, 2]  # One flush at the batch size, one on exit
+    assert collection.calls == [("upsert", 3), ("upsert", 1), ("upsert", 2)]
+    assert writer.chunks_written == 6 and len(collection.rows) == 6
+
+
+def test_discard_drops_buffered_and_written_chunks():
+    collection, model = FakeCollection(), FakeModel()
+
+    with _writer(collection, model) as writer:
+        for i in range(5):
+            writer.add(f"id{i}", f"text {i}", {"source": "a.pdf"})
+        writer.discard(["id0", "id4"])  # id0 was flushed, id4 still buffered
+
+    assert sorted(collection.rows) == ["id1", "id2", "id3"]
+    assert writer.chunks_written == 3
+
+
+def test_nothing_is_flushed_after_an_error():
+    collection, model = FakeCollection(), FakeModel()
+
+    with pytest.raises(RuntimeError):
+        with _writer(collection, model) as writer:
+            writer.add("id0", "text", {"source": "a.pdf"})
+            raise RuntimeError("extraction failed")
+
+    assert model.encoded == [] and collection.rows == {}
+
+
+def test_sync_source_embeds_only_new_text_and_deletes_stale_chunks():
+    collection, model = FakeCollection(), FakeModel()
+    base = {"source": "a.pdf", "source_type": "pdf"}
+
+    with _writer(collection, model, batch_size=100) as writer:
+        first = sync_source(writer, "a.pdf", _chunks("alpha " * 50, "beta " * 50, "alpha " * 50), dict(base))
+    model.encoded.clear()
+    with _writer(collection, model, batch_size=100) as writer:
+        second = sync_source(writer, "a.pdf", _chunks("alpha " * 50, "gamma " * 50), dict(base))
+
+    assert first == (3, 0, 0)  # The repeated chunk gets its own ID
+    assert second == (1, 1, 2)
+    assert model.encoded == [1]
+    assert sorted(metadata["total_chunks"] for _, metadata in collection.rows.values()) == [2, 2]
+
+
+def test_sync_source_rejects_sources_with_too_little_text():
+    collection, model = FakeCollection(), FakeModel()
+
+    with _writer(collection, model) as writer:
+        result = sync_source(writer, "a.pdf", _chunks("short"), {"source": "a.pdf"})
+
+    assert result is None and collection.rows == {}
+
+
+def test_import_loads_no_model():
+    heavy = ["torch", "sentence_transformers", "transformers", "crawl4ai"]
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, enhanced_vector_populator; print([m for m in {heavy!r} if m in sys.modules])"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
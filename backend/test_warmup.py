@@ -0,0 +1,150 @@
+"""Tests for the background startup warm-up."""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from app.services.warmup import Warmup
+
+
+def _run(warmup: Warmup) -> dict:
+    async def scenario():
+        warmup.start()
+        await warmup.wait()
+        return warmup.report()
+
+    return asyncio.run(scenario())
+
+
+def test_steps_run_after_their_dependencies():
+    order = []
+
+    def step(name, delay=0.0):
+        async def run():
+            await asyncio.sleep(delay)
+            order.append(name)
+            return f"{name} ok"
+        return run
+
+    warmup = Warmup()
+    warmup.register("model", step("model"), after=["credential"])
+    warmup.register("credential", step("credential", delay=0.02))
+    report = _run(warmup)
+
+    assert order == ["credential", "model"]
+    assert report["ready"]
+    assert report["components"]["model"]["state"] == "ready"
+    assert report["components"]["model"]["detail"] == "model ok"
+
+
+def test_failed_optional_step_still_becomes_ready_but_required_does_not():
+    async def fail():
+        raise RuntimeError("offline")
+
+    async def ok():
+        return None
+
+    optional = Warmup()
+    optional.register("agent", ok)
+    optional.register("tokenizer", fail, required=False)
+    report = _run(optional)
+    assert report["ready"]
+    assert report["components"]["tokenizer"]["state"] == "failed"
+    assert report["components"]["tokenizer"]["detail"] == "RuntimeError: offline"
+
+    required = Warmup()
+    required.register("agent", fail)
+    assert not _run(required)["ready"]
+
+
+def test_enabled_callable_is_checked_when_the_step_runs():
+    calls = []
+    checks = []
+
+    async def step():
+        calls.append(1)
+
+    def enabled():
+        checks.append(1)
+        return False
+
+    warmup = Warmup()
+    warmup.register("embedding_model", step, enabled=enabled)
+    assert warmup.report()["components"]["embedding_model"]["state"] == "pending"
+    assert checks == []  # Not evaluated at registration
+
+    report = _run(warmup)
+    assert report["components"]["embedding_model"]["state"] == "disabled"
+    assert checks == [1] and calls == []
+    assert report["ready"]
+
+
+def test_importing_the_app_does_not_load_the_models():
+    # A fresh interpreter: the test process may already have imported them
+    backend = os.path.dirname(os.path.abspath(__file__))
+    heavy = ("torch", "sentence_transformers", "transformers")
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, main; print([m for m in {heavy!r} if m in sys.modules])"],
+        cwd=backend,
+        # Production defaults: semantic cache and model warm-up enabled
+        env={**os.environ, "SEMANTIC_CACHE_ENABLED": "true", "WARMUP_LOAD_MODELS": "true"},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_failed_required_step_is_retried_until_ready():
+    attempts = []
+
+    async def flaky():
+        attempts.append(time.perf_counter())
+        if len(attempts) < 3:
+            raise RuntimeError("token endpoint unreachable")
+        return "connected"
+
+    async def scenario():
+        warmup = Warmup(retry_seconds=0.02, max_retry_seconds=0.05)
+        warmup.register("agent", flaky)
+        warmup.start()
+        await warmup.wait()
+        first = warmup.report()
+        for _ in range(100):
+            if warmup.is_ready():
+                break
+            await asyncio.sleep(0.01)
+        report = warmup.report()
+        await warmup.stop()
+        return first, report
+
+    first, report = asyncio.run(scenario())
+    assert not first["ready"]
+    assert first["components"]["agent"]["state"] == "failed"
+    assert report["ready"]
+    agent = report["components"]["agent"]
+    assert (agent["state"], agent["detail"], agent["attempts"]) == ("ready", "connected", 3)
+    # Backoff doubles: the second wait is longer than the first
+    assert attempts[2] - attempts[1] > attempts[1] - attempts[0]
+
+
+def test_failed_optional_step_is_not_retried():
+    attempts = []
+
+    async def fail():
+        attempts.append(1)
+        raise RuntimeError("offline")
+
+    async def scenario():
+        warmup = Warmup(retry_seconds=0.01)
+        warmup.register("tokenizer", fail, required=False)
+        warmup.start()
+        await warmup.wait()
+        await asyncio.sleep(0.05)
+        await warmup.stop()
+
+    asyncio.run(scenario())
+    assert attempts == [1]
@@ -128,7 +128,13 @@ def retrieve_context(query: str, n_results: int = 8) -> str:
             
             if results["documents"] and results["documents"][0]:
                 for doc, metadata in zip(results["documents"][0], results["metadatas"][0]):
-                    doc_id = f"{metadata.get('source', '')}_{metadata.get('chunk_index', 0)}"
+                    # Small chunks are matched, but their enclosing parent window is
+                    # what goes into the prompt (once, however many of its chunks hit)
+                    if "parent" in metadata:
+                        doc_id = f"{metadata.get('source', '')}_parent{metadata.get('parent_index', 0)}"
+                        doc = metadata["parent"]
+                    else:
+                        doc_id = f"{metadata.get('source', '')}_{metadata.get('chunk_index', 0)}"
                     
                     if doc_id not in seen_ids:
                         seen_ids.add(doc_id)
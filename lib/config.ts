@@ -10,5 +10,6 @@ export const API_ENDPOINTS = {
   chatVoiceTranscribe: `${API_BASE_URL}/api/chat/voice/transcribe`,
   chatVoiceSynthesize: `${API_BASE_URL}/api/chat/voice/synthesize`,
   faqSearch: `${API_BASE_URL}/api/faq/search`,
+  faqSuggest: `${API_BASE_URL}/api/faq/suggest`,
 } as const;
 